@@ -0,0 +1,137 @@
+"""
+Compara a identificação de tipo pelo índice de assinaturas com a tabela de
+lambdas montada a cada chamada (implementação anterior do resumo do upload).
+
+O corpus padrão tem cabeçalhos sintéticos de cada container suportado; com
+--corpus, os cabeçalhos são lidos dos arquivos de uma pasta.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_file_signatures [--corpus pasta] [--iterations 200000]
+"""
+import argparse
+import os
+import time
+
+from services.file_signatures import HEADER_SIZE, detect_container, matches_extension, read_header
+
+
+def ts_header(packet_size, offset):
+    packet = bytearray(packet_size)
+    packet[offset] = 0x47
+    return bytes(packet) * 3
+
+
+SAMPLE_HEADERS = {
+    'mp4': b'\x00\x00\x00\x20ftypisom\x00\x00\x02\x00isomiso2avc1mp41',
+    'mov': b'\x00\x00\x00\x14ftypqt  \x00\x00\x00\x00qt  ',
+    '3gp': b'\x00\x00\x00\x18ftyp3gp5\x00\x00\x00\x00',
+    'm4v': b'\x00\x00\x00\x1cftypM4V \x00\x00\x00\x01',
+    'avi': b'RIFF\x24\x00\x00\x00AVI LIST',
+    'wav': b'RIFF\x24\x00\x00\x00WAVEfmt ',
+    'mkv': b'\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x88matroska',
+    'webm': b'\x1a\x45\xdf\xa3\x9f\x42\x86\x81\x01\x42\x82\x84webm',
+    'flv': b'FLV\x01\x05\x00\x00\x00\x09',
+    'mpg': b'\x00\x00\x01\xba\x44\x00\x04\x00\x04\x01',
+    'm2v': b'\x00\x00\x01\xb3\x14\x00\xf0\x13',
+    'wmv': b'\x30\x26\xb2\x75\x8e\x66\xcf\x11\xa6\xd9\x00\xaa\x00\x62\xce\x6c',
+    'rm': b'.RMF\x00\x00\x00\x12\x00\x01',
+    'swf': b'CWS\x0a\x00\x00\x00\x00',
+    'ogv': b'OggS\x00\x02\x00\x00',
+    'ts': ts_header(188, 0),
+    'm2ts': ts_header(192, 4),
+    'pdf': b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n',
+    'png': b'\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR',
+    'jpg': b'\xff\xd8\xff\xe0\x00\x10JFIF\x00',
+    'mp3': b'ID3\x04\x00\x00\x00\x00\x00\x00',
+    'docx': b'PK\x03\x04\x14\x00\x06\x00\x08\x00\x00\x00!\x00[Content_Types].xmlword/',
+    'csv': b'nome,tamanho,tipo\n',
+}
+
+
+def legacy_check(header, file_ext):
+    """Reprodução da implementação anterior: tabela recriada a cada chamada, só a extensão informada"""
+    video_formats = {
+        '3g2': lambda h: h[4:8] in [b'ftyp3g2a', b'ftyp3g2b'],
+        '3gp': lambda h: h[4:8] in [b'ftyp3gp4', b'ftyp3gp5'],
+        'avi': lambda h: h[:4] == b'RIFF' and h[8:12] == b'AVI ',
+        'flv': lambda h: h[:4] == b'FLV\x01',
+        'm2v': lambda h: h[:4] == b'\x00\x00\x01\xBA',
+        'm4v': lambda h: h[4:8] == b'ftypM4V ',
+        'mkv': lambda h: h[:4] == b'\x1A\x45\xDF\xA3',
+        'mov': lambda h: h[4:8] in [b'ftyp', b'moov', b'mdat'],
+        'mpg': lambda h: h[:4] == b'\x00\x00\x01\xBA',
+        'mpeg': lambda h: h[:4] == b'\x00\x00\x01\xBA',
+        'rm': lambda h: h[:4] == b'.RMF',
+        'rmvb': lambda h: h[:4] == b'.RMF',
+        'swf': lambda h: h[:3] == b'FWS' or h[:3] == b'CWS',
+        'vob': lambda h: h[:4] == b'\x00\x00\x01\xBA',
+        'webm': lambda h: h[:4] == b'\x1A\x45\xDF\xA3',
+        'wmv': lambda h: h[:4] == b'\x30\x26\xB2\x75',
+        'xvid': lambda h: h[:4] == b'XVID',
+        'aaf': lambda h: True,
+        'avchd': lambda h: True,
+        'cavs': lambda h: True,
+        'divx': lambda h: True,
+        'dv': lambda h: True,
+        'f4v': lambda h: True,
+        'hevc': lambda h: True,
+        'm2ts': lambda h: True,
+        'mts': lambda h: True,
+        'mxf': lambda h: True,
+        'ogv': lambda h: True,
+        'tod': lambda h: True,
+        'ts': lambda h: True,
+        'wtv': lambda h: True
+    }
+    check = video_formats.get(file_ext)
+    return bool(check and check(header[:12]))
+
+
+def load_corpus(folder):
+    corpus = {}
+    for name in sorted(os.listdir(folder)):
+        path = os.path.join(folder, name)
+        if os.path.isfile(path):
+            corpus[name] = (os.path.splitext(name)[1][1:].lower(), read_header(path, HEADER_SIZE))
+    return corpus
+
+
+def timed(label, func, items, iterations):
+    rounds = max(1, iterations // len(items))
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for file_ext, header in items:
+            func(header, file_ext)
+    elapsed = time.perf_counter() - start
+    per_call = elapsed / (rounds * len(items)) * 1e9
+    print(f"{label:<22} {per_call:8.0f} ns/arquivo")
+    return per_call
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--corpus', help='Pasta com arquivos de exemplo (extensão = tipo esperado)')
+    parser.add_argument('--iterations', type=int, default=200000)
+    args = parser.parse_args()
+
+    if args.corpus:
+        corpus = load_corpus(args.corpus)
+    else:
+        corpus = {f"amostra.{ext}": (ext, header) for ext, header in SAMPLE_HEADERS.items()}
+
+    print(f"{'arquivo':<24} {'detectado':<12} {'confere':<8} anterior")
+    for name, (file_ext, header) in corpus.items():
+        container = detect_container(header)
+        print(f"{name:<24} {str(container):<12} {str(matches_extension(container, file_ext)):<8} "
+              f"{legacy_check(header, file_ext)}")
+    print()
+
+    items = list(corpus.values())
+    legacy = timed('tabela por chamada', legacy_check, items, args.iterations)
+    indexed = timed('índice de assinaturas', lambda header, file_ext: matches_extension(
+        detect_container(header), file_ext), items, args.iterations)
+    print(f"Razão: {legacy / indexed:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
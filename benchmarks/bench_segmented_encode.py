@@ -0,0 +1,60 @@
+"""
+Compara o tempo de parede da compressão MP4 em processo único com a
+codificação segmentada em paralelo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_segmented_encode video.mp4 [--crf 28] [--repeat 1]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from config.ffmpeg_profiles import COMPRESSION_PROFILES
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from converters.segmented_encoder import SegmentedEncoder
+
+
+def timed(label, func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        success, result = func()
+        elapsed = time.perf_counter() - start
+        if not success:
+            raise SystemExit(f"{label} falhou: {result}")
+        size = os.path.getsize(result) / (1024 * 1024)
+        os.remove(result)
+        best = elapsed if best is None else min(best, elapsed)
+    print(f"{label:<15} {best:8.2f}s  ({size:.2f} MB)")
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('input')
+    parser.add_argument('--crf', type=int, default=28)
+    parser.add_argument('--repeat', type=int, default=1)
+    args = parser.parse_args()
+
+    profile = COMPRESSION_PROFILES['mp4']
+    pipeline = FFmpegPipeline()
+    # min_duration=0 força o modo segmentado mesmo em amostras curtas
+    encoder = SegmentedEncoder(pipeline, min_duration=0)
+
+    duration = pipeline.runner.probe(args.input)['duration']
+    segments, segment_time = encoder.plan(duration)
+    print(f"Duração: {duration:.1f}s | núcleos livres: {encoder.free_cores()} | "
+          f"segmentos: {segments} x {segment_time}s")
+
+    with tempfile.TemporaryDirectory() as output_dir:
+        single = timed('processo único', lambda: pipeline.run(
+            args.input, profile, 'bench_single.mp4', output_dir, crf=args.crf), args.repeat)
+        segmented = timed('segmentado', lambda: encoder.run(
+            args.input, profile, 'bench_segmented.mp4', output_dir, crf=args.crf), args.repeat)
+
+    print(f"Ganho: {single / segmented:.2f}x")
+
+
+if __name__ == '__main__':
+    main()
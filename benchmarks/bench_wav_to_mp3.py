@@ -0,0 +1,106 @@
+"""
+Mede a vazão (arquivos por segundo) da conversão WAV -> MP3 em clipes curtos
+
+Compara o caminho genérico (um FFmpeg completo por arquivo, com sondagem da
+entrada) com o caminho rápido do MP3Encoder: PCM lido por mmap e entregue a
+um FFmpeg pré-iniciado e, se instalado, ao lameenc em processo.
+
+Uso (a partir da raiz do projeto):
+    python -m benchmarks.bench_wav_to_mp3 [--clips 1000] [--seconds 2] [--workers 2] [--bitrate 192]
+"""
+import argparse
+import array
+import math
+import os
+import tempfile
+import time
+import wave
+from concurrent.futures import ThreadPoolExecutor
+
+from config.config import Config
+from config.ffmpeg_profiles import CONVERSION_PROFILES
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from converters.mp3_encoder import MP3Encoder, lameenc
+
+
+def make_clips(folder, count, seconds, sample_rate=44100):
+    """Gera clipes estéreo 16 bits com um tom diferente em cada"""
+    paths = []
+    frames = int(seconds * sample_rate)
+    for index in range(count):
+        frequency = 220 + index % 660
+        samples = array.array('h', (
+            int(12000 * math.sin(2 * math.pi * frequency * (i // 2) / sample_rate)) for i in range(frames * 2)
+        ))
+        path = os.path.join(folder, f"clip_{index:04d}.wav")
+        with wave.open(path, 'wb') as output:
+            output.setnchannels(2)
+            output.setsampwidth(2)
+            output.setframerate(sample_rate)
+            output.writeframes(samples.tobytes())
+        paths.append(path)
+    return paths
+
+
+def throughput(label, convert, paths, output_dir, workers):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        outputs = list(executor.map(lambda path: convert(path, output_dir), paths))
+    elapsed = time.perf_counter() - start
+
+    size = sum(os.path.getsize(output) for output in outputs) / len(outputs) / 1024
+    for output in outputs:
+        os.remove(output)
+    print(f"{label:<28} {len(paths) / elapsed:8.1f} arquivos/s  ({elapsed:.1f}s, {size:.0f} KB/arquivo)")
+    return len(paths) / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--clips', type=int, default=1000)
+    parser.add_argument('--seconds', type=float, default=2)
+    parser.add_argument('--workers', type=int, default=Config.JOB_WORKERS)
+    parser.add_argument('--bitrate', type=int, default=192)
+    args = parser.parse_args()
+
+    pipeline = FFmpegPipeline()
+    profile = dict(CONVERSION_PROFILES['wav'], audio_bitrate=f"{args.bitrate}k")
+    mode = {'bitrate': args.bitrate}
+
+    def generic(path, output_dir):
+        success, result = pipeline.run(path, profile, os.path.basename(path) + '.mp3', output_dir)
+        if not success:
+            raise SystemExit(f"FFmpeg falhou: {result}")
+        return result
+
+    def fast(encoder):
+        def convert(path, output_dir):
+            output = os.path.join(output_dir, os.path.basename(path) + '.mp3')
+            encoder.encode(path, output, mode)
+            return output
+        return convert
+
+    with tempfile.TemporaryDirectory() as folder:
+        print(f"Gerando {args.clips} clipes de {args.seconds}s...")
+        paths = make_clips(folder, args.clips, args.seconds)
+        output_dir = os.path.join(folder, 'out')
+        os.mkdir(output_dir)
+
+        scheduler = pipeline.runner.scheduler
+        base = throughput('FFmpeg por arquivo', generic, paths, output_dir, args.workers)
+
+        warm = MP3Encoder(pipeline.runner.ffmpeg_path, scheduler, warm_processes=args.workers, use_lame=False)
+        rate = throughput('mmap + FFmpeg pré-iniciado', fast(warm), paths, output_dir, args.workers)
+        warm.pool.close()
+        print(f"{'':<28} {rate / base:8.2f}x")
+
+        if lameenc is not None:
+            lame = MP3Encoder(pipeline.runner.ffmpeg_path, scheduler, warm_processes=0, use_lame=True)
+            rate = throughput('mmap + lameenc', fast(lame), paths, output_dir, args.workers)
+            print(f"{'':<28} {rate / base:8.2f}x")
+        else:
+            print("lameenc não instalado: motor em processo não medido")
+
+
+if __name__ == '__main__':
+    main()
@@ -1,20 +1,100 @@
+import multiprocessing
 import os
 import subprocess
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Tuple
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 from PIL import Image
 import io
 import platform
+import threading
 from shutil import which
 from PyPDF2 import PdfReader, PdfWriter
+from PyPDF2.generic import NameObject, NumberObject
+from compressors.pdf_strategy import PDFStrategyPlanner, deflate_streams
 import uuid
 from datetime import datetime
 
+# Modo PIL para cada espaço de cor aceito na recompressão
+COLORSPACE_MODES = {
+    '/DeviceRGB': 'RGB',
+    '/DeviceGray': 'L'
+}
+
+
+def _limit_worker_memory(max_bytes: Optional[int]):
+    """Limita o espaço de endereçamento do worker (Linux/macOS) para imagens gigantes não estourarem a RAM"""
+    if not max_bytes:
+        return
+    try:
+        import resource
+        resource.setrlimit(resource.RLIMIT_AS, (max_bytes, max_bytes))
+    except (ImportError, ValueError, OSError):
+        pass
+
+
+def _worker_context():
+    """
+    Contexto explícito dos workers: max_tasks_per_child não aceita fork (o app
+    tem threads), e o forkserver reimporta o módulo principal uma única vez,
+    no servidor, em vez de uma vez por worker como o spawn
+    """
+    methods = multiprocessing.get_all_start_methods()
+    return multiprocessing.get_context('forkserver' if 'forkserver' in methods else 'spawn')
+
+
+def _recompress_image(task: Dict[str, Any]) -> Optional[Tuple[bytes, str, int, int]]:
+    """
+    Recomprime uma imagem em JPEG, reduzindo a resolução se necessário (executado nos workers do pool)
+
+    Returns:
+        Tuple (bytes JPEG, modo PIL, largura, altura) ou None para manter a imagem original
+    """
+    try:
+        if task['filter'] == '/DCTDecode':
+            img = Image.open(io.BytesIO(task['data']))
+            if task.get('max_side'):
+                # Decodifica direto em escala reduzida quando possível
+                img.draft(img.mode, (task['max_side'], task['max_side']))
+        else:
+            img = Image.frombytes(task['mode'], (task['width'], task['height']), task['data'])
+
+        if img.mode not in ('RGB', 'L'):
+            img = img.convert('RGB')
+
+        if task.get('max_side') and max(img.size) > task['max_side']:
+            img.thumbnail((task['max_side'], task['max_side']), Image.LANCZOS)
+
+        output = io.BytesIO()
+        img.save(output, format='JPEG', quality=task['quality'], optimize=True)
+        return output.getvalue(), img.mode, img.width, img.height
+    except Exception:
+        return None  # Mantém o original se a compressão falhar (inclusive MemoryError)
+
+
 class PDFCompressor:
-    def __init__(self):
+    # Resolução alvo (DPI) por nível de qualidade, considerando a imagem ocupando a página inteira
+    TARGET_DPI = {25: 100, 50: 150, 75: 200}
+
+    # Bytes por pixel de um JPEG típico em cada qualidade; JPEGs já abaixo disso não são recomprimidos
+    JPEG_BYTES_PER_PIXEL = {25: 0.06, 50: 0.10, 75: 0.16}
+
+    def __init__(self, workers: Optional[int] = None, batch_bytes: int = 64 * 1024 * 1024,
+                 tasks_per_child: int = 50, worker_memory: Optional[int] = None, min_image_pixels: int = 64 * 64):
         self.supported_formats = ['pdf']
         self.ghostscript_path = self._find_ghostscript()
 
+        # Pool de processos para recompressão de imagens (criado sob demanda)
+        self.workers = workers or os.cpu_count() or 1
+        self.batch_bytes = batch_bytes
+        self.tasks_per_child = tasks_per_child
+        self.worker_memory = worker_memory
+        self.min_image_pixels = min_image_pixels
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+        self.planner = PDFStrategyPlanner(self.JPEG_BYTES_PER_PIXEL)
+
     def _generate_unique_filename(self, original_name):
         """Gera um nome de arquivo único com timestamp e UUID"""
         base, ext = os.path.splitext(original_name)
@@ -40,9 +120,9 @@ class PDFCompressor:
         
         return which('gs')
 
-    def compress(self, input_path: str, output_path: str, quality: int = 50) -> Tuple[bool, str]:
+    def compress(self, input_path: str, output_path: str, quality: int = 50) -> Tuple[bool, str, Dict[str, Any]]:
         """
-        Compactar um arquivo PDF usando múltiplas técnicas
+        Compactar um arquivo PDF com um único motor, escolhido após inspecionar o documento
 
         Argumentos:
         input_path: Caminho para o arquivo PDF de entrada
@@ -50,46 +130,249 @@ class PDFCompressor:
         quality: Nível de qualidade da compactação (1-100)
 
         Retorna:
-        Tupla (sucesso: bool, mensagem: str)
+        Tupla (sucesso: bool, mensagem: str, info: dict com o plano escolhido e estatísticas)
         """
+        info: Dict[str, Any] = {'engine': 'pypdf2'}
         try:
-            # First try with PyPDF2
             reader = PdfReader(input_path)
-            writer = PdfWriter()
+            plan = self.planner.plan(
+                reader, os.path.getsize(input_path), quality,
+                self._iter_images(reader, quality), bool(self.ghostscript_path)
+            )
+            info['strategy'] = plan
+
+            if plan['strategy'] == 'ghostscript':
+                info['engine'] = 'ghostscript'
+                self._compress_with_ghostscript(input_path, output_path, quality)
+                return True, output_path, info
 
+            writer = PdfWriter()
             for page in reader.pages:
                 writer.add_page(page)
 
-            # Set compression options
-            for page in writer.pages:
-                for img in page.images:
-                    img.replace(self._compress_image(img.data, quality))
+            if plan['strategy'] == 'images':
+                # Recomprime as imagens em paralelo, em lotes limitados por tamanho
+                info['images'] = self._recompress_images(writer, quality)
+
+            info['deflated_bytes'] = deflate_streams(writer.pages)
 
             with open(output_path, "wb") as f:
                 writer.write(f)
 
-            # If still large, use ghostscript
-            if os.path.getsize(output_path) > 50 * 1024 * 1024:  # > 50MB
-                self._compress_with_ghostscript(input_path, output_path, quality)
-
-            return True, output_path
+            return True, output_path, info
         except Exception as e:
+            if info['engine'] == 'ghostscript':
+                return False, f"PDF compression failed: {str(e)}", info
             try:
                 # Fallback to ghostscript if PyPDF2 fails
                 self._compress_with_ghostscript(input_path, output_path, quality)
-                return True, output_path
+                info['engine'] = 'ghostscript'
+                info['fallback'] = str(e)
+                return True, output_path, info
             except Exception as gs_error:
-                return False, f"PDF compression failed: {str(gs_error)}"
+                return False, f"PDF compression failed: {str(gs_error)}", info
 
-    def _compress_image(self, image_data: bytes, quality: int) -> bytes:
-        """Compress an image from a PDF with PIL"""
-        try:
-            img = Image.open(io.BytesIO(image_data))
-            output = io.BytesIO()
-            img.save(output, format='JPEG', quality=quality)
-            return output.getvalue()
-        except:
-            return image_data  # Return original if compression fails
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Pool compartilhado; os workers são reciclados a cada tasks_per_child imagens"""
+        with self._executor_lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=_worker_context(),
+                    max_tasks_per_child=self.tasks_per_child,
+                    initializer=_limit_worker_memory,
+                    initargs=(self.worker_memory,)
+                )
+            return self._executor
+
+    def _iter_images(self, document, quality: int) -> Iterator[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]:
+        """
+        Percorre as imagens das páginas (sem repetir imagens compartilhadas)
+
+        Yields:
+            Tuple (xobject, estatísticas, tarefa para o pool ou None se a imagem for mantida)
+        """
+        seen = set()
+        for page_number, page in enumerate(document.pages, start=1):
+            resources = page.get('/Resources')
+            if not resources or '/XObject' not in resources.get_object():
+                continue
+
+            # Maior lado da página em pixels na resolução alvo
+            box = page.mediabox
+            page_side = max(float(box.width), float(box.height)) / 72
+            max_side = int(page_side * self.TARGET_DPI.get(quality, 150))
+
+            x_objects = resources.get_object()['/XObject'].get_object()
+            for name in x_objects:
+                reference = x_objects.raw_get(name)
+                key = (reference.idnum, reference.generation) if hasattr(reference, 'idnum') else id(reference)
+                if key in seen:
+                    continue
+                seen.add(key)
+
+                xobj = x_objects[name].get_object()
+                if xobj.get('/Subtype') != '/Image':
+                    continue
+
+                stats, task = self._analyze_image(xobj, quality, max_side)
+                stats['page'] = page_number
+                stats['name'] = str(name)
+                yield xobj, stats, task
+
+    def _analyze_image(self, xobj, quality: int, max_side: int) -> Tuple[Dict[str, Any], Optional[Dict[str, Any]]]:
+        """Coleta filtro, dimensões, profundidade e bytes/pixel e decide se vale recomprimir"""
+        image_filter = xobj.get('/Filter')
+        if isinstance(image_filter, list):
+            image_filter = image_filter[0] if len(image_filter) == 1 else '/' + '+'.join(f[1:] for f in image_filter)
+
+        width = int(xobj.get('/Width', 0))
+        height = int(xobj.get('/Height', 0))
+        bits = int(xobj.get('/BitsPerComponent', 1 if xobj.get('/ImageMask') else 0))
+        original_bytes = len(xobj._data)
+        pixels = width * height
+
+        stats = {
+            'filter': str(image_filter),
+            'width': width,
+            'height': height,
+            'bits': bits,
+            'bytes_per_pixel': round(original_bytes / pixels, 4) if pixels else None,
+            'original_bytes': original_bytes,
+            'new_bytes': original_bytes
+        }
+
+        def skip(reason):
+            stats['action'] = reason
+            return stats, None
+
+        if xobj.get('/ImageMask') or bits == 1:
+            return skip('skipped_mask')
+        if pixels < self.min_image_pixels:
+            return skip('skipped_small')
+        if not self._default_decode(xobj.get('/Decode')) or isinstance(xobj.get('/Mask'), list):
+            # /Decode invertido e máscara por cor se referem às amostras originais
+            return skip('skipped_unsupported')
+
+        needs_downsample = max(width, height) > max_side
+        if (image_filter == '/DCTDecode' and not needs_downsample
+                and stats['bytes_per_pixel'] <= self.JPEG_BYTES_PER_PIXEL.get(quality, 0.10)):
+            return skip('skipped_already_compressed')
+
+        task = {
+            'filter': image_filter,
+            'width': width,
+            'height': height,
+            'quality': quality,
+            'max_side': max_side if needs_downsample else None
+        }
+
+        if image_filter == '/DCTDecode':
+            return stats, task
+
+        mode = COLORSPACE_MODES.get(xobj.get('/ColorSpace'))
+        if image_filter != '/FlateDecode' or not mode or bits != 8:
+            return skip('skipped_unsupported')  # Paleta, JBIG2, CCITT, 16 bits etc.
+
+        # Os bytes só são extraídos na hora de montar o lote (a análise não decodifica nada)
+        task['mode'] = mode
+        return stats, task
+
+    def _default_decode(self, decode) -> bool:
+        """/Decode ausente ou identidade ([0 1] por componente)"""
+        if decode is None:
+            return True
+        values = [float(value) for value in decode]
+        return values == [0.0, 1.0] * (len(values) // 2)
+
+    def _load_image_data(self, xobj, task: Dict[str, Any]) -> bytes:
+        """JPEG vai como está; Flate vai decodificado em pixels para o worker"""
+        return xobj._data if task['filter'] == '/DCTDecode' else xobj.get_data()
+
+    def _replace_image(self, xobj, data: bytes, mode: str, width: int, height: int):
+        """Substitui o stream da imagem pelo JPEG recomprimido"""
+        colorspace = NameObject('/DeviceRGB' if mode == 'RGB' else '/DeviceGray')
+        if xobj.get('/ColorSpace') != colorspace:
+            # Ex.: CMYK/ICCBased convertido em RGB: chaves do espaço de cor antigo não valem mais
+            for key in ('/Decode', '/Intent'):
+                if key in xobj:
+                    del xobj[key]
+        xobj._data = data
+        xobj[NameObject('/Filter')] = NameObject('/DCTDecode')
+        xobj[NameObject('/ColorSpace')] = colorspace
+        xobj[NameObject('/BitsPerComponent')] = NumberObject(8)
+        xobj[NameObject('/Width')] = NumberObject(width)
+        xobj[NameObject('/Height')] = NumberObject(height)
+        if '/DecodeParms' in xobj:
+            del xobj['/DecodeParms']
+        if hasattr(xobj, 'decoded_self'):
+            xobj.decoded_self = None
+
+    def _recompress_images(self, writer: PdfWriter, quality: int) -> Dict[str, Any]:
+        """
+        Envia as imagens ao pool em lotes limitados por bytes e grava os resultados na ordem
+
+        Returns:
+            Estatísticas por imagem e totais
+        """
+        images: List[Dict[str, Any]] = []
+        batch: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]] = []
+        batch_size = 0
+
+        for xobj, stats, task in self._iter_images(writer, quality):
+            images.append(stats)
+            if task is None:
+                continue
+
+            task['data'] = self._load_image_data(xobj, task)
+            batch.append((xobj, stats, task))
+            batch_size += len(task['data'])
+            if batch_size >= self.batch_bytes:
+                self._process_batch(batch)
+                batch, batch_size = [], 0
+
+        if batch:
+            self._process_batch(batch)
+
+        original = sum(image['original_bytes'] for image in images)
+        compressed = sum(image['new_bytes'] for image in images)
+        actions: Dict[str, int] = {}
+        for image in images:
+            actions[image['action']] = actions.get(image['action'], 0) + 1
+
+        return {
+            'count': len(images),
+            'original_bytes': original,
+            'new_bytes': compressed,
+            'actions': actions,
+            'details': images
+        }
+
+    def _process_batch(self, batch: List[Tuple[Any, Dict[str, Any], Dict[str, Any]]]):
+        tasks = [task for _, _, task in batch]
+
+        # Poucas imagens não compensam o custo de enviar ao pool
+        if len(tasks) < 2 or self.workers < 2:
+            results = map(_recompress_image, tasks)
+        else:
+            results = self._get_executor().map(_recompress_image, tasks)
+
+        for (xobj, stats, task), result in zip(batch, results):
+            if not result:
+                stats['action'] = 'failed_kept_original'
+                continue
+
+            data, mode, width, height = result
+            # Só substitui se o resultado for menor que o stream original
+            if len(data) >= stats['original_bytes']:
+                stats['action'] = 'kept_original_smaller'
+                continue
+
+            self._replace_image(xobj, data, mode, width, height)
+            stats['action'] = 'downsampled' if task['max_side'] else 'recompressed'
+            stats['new_bytes'] = len(data)
+            stats['new_width'] = width
+            stats['new_height'] = height
 
     def _compress_with_ghostscript(self, input_path: str, output_path: str, quality: int):
         """Use Ghostscript for PDF compression"""
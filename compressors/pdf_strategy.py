@@ -0,0 +1,238 @@
+import zlib
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from PyPDF2.generic import NameObject, StreamObject
+
+# Chaves do FontDescriptor que guardam o programa da fonte embutida
+FONT_FILE_KEYS = ('/FontFile', '/FontFile2', '/FontFile3')
+
+
+def iter_page_streams(pages) -> Iterator[Tuple[str, StreamObject]]:
+    """
+    Percorre os streams referenciados pelas páginas, sem repetir objetos compartilhados
+
+    Yields:
+        Tuple (tipo: 'content' | 'form' | 'font', stream)
+    """
+    seen = set()
+
+    def visit(kind, obj):
+        obj = obj.get_object() if obj is not None else None
+        if not isinstance(obj, StreamObject) or id(obj) in seen:
+            return None
+        seen.add(id(obj))
+        return kind, obj
+
+    for page in pages:
+        contents = page.get('/Contents')
+        contents = contents.get_object() if contents is not None else None
+        for stream in (contents if isinstance(contents, list) else [contents]):
+            item = visit('content', stream)
+            if item:
+                yield item
+
+        resources = page.get('/Resources')
+        resources = resources.get_object() if resources is not None else {}
+
+        x_objects = resources.get('/XObject')
+        for name in (x_objects.get_object() if x_objects is not None else {}):
+            xobj = x_objects.get_object()[name].get_object()
+            if xobj.get('/Subtype') == '/Form':
+                item = visit('form', xobj)
+                if item:
+                    yield item
+
+        fonts = resources.get('/Font')
+        for name in (fonts.get_object() if fonts is not None else {}):
+            font = fonts.get_object()[name].get_object()
+            # Fontes Type0 guardam o descritor na fonte descendente
+            descendants = font.get('/DescendantFonts')
+            if descendants is not None:
+                font = descendants.get_object()[0].get_object()
+            descriptor = font.get('/FontDescriptor')
+            if descriptor is None:
+                continue
+            descriptor = descriptor.get_object()
+            for key in FONT_FILE_KEYS:
+                item = visit('font', descriptor.get(key))
+                if item:
+                    yield item
+
+
+def deflate_streams(pages, min_bytes: int = 64) -> int:
+    """
+    Aplica FlateDecode, sem perdas, aos streams das páginas que estão sem compressão
+
+    Returns:
+        Quantidade de bytes economizados
+    """
+    saved = 0
+    for _, stream in iter_page_streams(pages):
+        if '/Filter' in stream or len(stream._data) < min_bytes:
+            continue
+        data = zlib.compress(stream._data, 9)
+        if len(data) >= len(stream._data):
+            continue
+        saved += len(stream._data) - len(data)
+        stream._data = data
+        stream[NameObject('/Filter')] = NameObject('/FlateDecode')
+        if hasattr(stream, 'decoded_self'):
+            stream.decoded_self = None
+    return saved
+
+
+class PDFStrategyPlanner:
+    """
+    Inspeciona o PDF uma única vez e escolhe um só motor de compressão
+
+    Estratégias:
+        rewrite: reescrita sem perdas (deflate dos streams e descarte de objetos órfãos)
+        images: rewrite + recompressão das imagens no pool de processos
+        ghostscript: reescrita completa pelo Ghostscript (imagens, fontes e conteúdo)
+
+    A escolha é pelo ganho estimado por segundo de CPU. Os coeficientes abaixo
+    são estimativas iniciais; o plano completo vai em compression_info para
+    permitir ajustá-los com dados reais.
+    """
+
+    # Fração esperada de redução dos streams sem compressão após o deflate
+    DEFLATE_GAIN = 0.7
+
+    # Fração esperada de redução das fontes embutidas com o subsetting do Ghostscript
+    GS_FONT_GAIN = 0.4
+
+    # Fração esperada de redução das imagens que o pool não trata (paleta, 16 bits etc.)
+    GS_UNSUPPORTED_IMAGE_GAIN = 0.3
+
+    # Vazões aproximadas por núcleo
+    REWRITE_BYTES_PER_SECOND = 40 * 1024 * 1024
+    IMAGE_PIXELS_PER_SECOND = 25_000_000
+    GS_BYTES_PER_SECOND = 6 * 1024 * 1024
+    GS_PIXELS_PER_SECOND = 15_000_000
+    GS_SECONDS_PER_PAGE = 0.02
+
+    # Abaixo deste ganho (fração do arquivo) não vale nada além do rewrite
+    MIN_GAIN_RATIO = 0.01
+
+    # Um motor mais eficiente só é escolhido se entregar ao menos esta fração do maior ganho
+    MIN_GAIN_SHARE = 0.75
+
+    def __init__(self, jpeg_bytes_per_pixel: Dict[int, float]):
+        self.jpeg_bytes_per_pixel = jpeg_bytes_per_pixel
+
+    def inspect(self, reader, file_size: int, quality: int,
+                images: Iterable[Tuple[Any, Dict[str, Any], Optional[Dict[str, Any]]]]) -> Dict[str, Any]:
+        """
+        Mede o documento: páginas, participação das imagens, fontes e compressão existente
+
+        Args:
+            images: Saída de PDFCompressor._iter_images (xobject, estatísticas, tarefa)
+        """
+        bpp = self.jpeg_bytes_per_pixel.get(quality, 0.10)
+        metrics = {
+            'file_bytes': file_size,
+            'pages': len(reader.pages),
+            'object_streams': bool(getattr(reader, 'xref_objStm', None)),
+            'image_count': 0,
+            'image_bytes': 0,
+            'image_pixels': 0,
+            'candidate_images': 0,
+            'candidate_pixels': 0,
+            'candidate_gain_bytes': 0,
+            'unsupported_image_bytes': 0,
+            'font_count': 0,
+            'font_bytes': 0,
+            'uncompressed_stream_bytes': 0
+        }
+
+        for _, stats, task in images:
+            pixels = stats['width'] * stats['height']
+            metrics['image_count'] += 1
+            metrics['image_bytes'] += stats['original_bytes']
+            metrics['image_pixels'] += pixels
+
+            if task is None:
+                if stats['action'] == 'skipped_unsupported':
+                    metrics['unsupported_image_bytes'] += stats['original_bytes']
+                continue
+
+            # Tamanho esperado do JPEG na resolução final
+            new_pixels = pixels
+            if task['max_side']:
+                scale = task['max_side'] / max(stats['width'], stats['height'])
+                new_pixels = int(pixels * scale * scale)
+            metrics['candidate_images'] += 1
+            metrics['candidate_pixels'] += pixels
+            metrics['candidate_gain_bytes'] += max(0, stats['original_bytes'] - int(new_pixels * bpp))
+
+        for kind, stream in iter_page_streams(reader.pages):
+            if kind == 'font':
+                metrics['font_count'] += 1
+                metrics['font_bytes'] += len(stream._data)
+            if '/Filter' not in stream:
+                metrics['uncompressed_stream_bytes'] += len(stream._data)
+
+        metrics['image_share'] = round(metrics['image_bytes'] / file_size, 3) if file_size else 0
+        metrics['font_share'] = round(metrics['font_bytes'] / file_size, 3) if file_size else 0
+        return metrics
+
+    def estimate(self, metrics: Dict[str, Any], ghostscript: bool) -> Dict[str, Dict[str, float]]:
+        """Ganho esperado (bytes) e custo (segundos de CPU) de cada motor disponível"""
+        deflate_gain = metrics['uncompressed_stream_bytes'] * self.DEFLATE_GAIN
+        rewrite_cost = metrics['file_bytes'] / self.REWRITE_BYTES_PER_SECOND
+
+        candidates = {
+            'rewrite': (deflate_gain, rewrite_cost),
+            'images': (
+                deflate_gain + metrics['candidate_gain_bytes'],
+                rewrite_cost + metrics['candidate_pixels'] / self.IMAGE_PIXELS_PER_SECOND
+            )
+        }
+
+        if ghostscript:
+            candidates['ghostscript'] = (
+                deflate_gain + metrics['candidate_gain_bytes']
+                + metrics['unsupported_image_bytes'] * self.GS_UNSUPPORTED_IMAGE_GAIN
+                + metrics['font_bytes'] * self.GS_FONT_GAIN,
+                metrics['file_bytes'] / self.GS_BYTES_PER_SECOND
+                + metrics['image_pixels'] / self.GS_PIXELS_PER_SECOND
+                + metrics['pages'] * self.GS_SECONDS_PER_PAGE
+            )
+
+        return {
+            name: {
+                'gain_bytes': int(gain),
+                'cpu_seconds': round(cost, 3),
+                'gain_per_second': int(gain / max(cost, 0.001))
+            }
+            for name, (gain, cost) in candidates.items()
+        }
+
+    def plan(self, reader, file_size: int, quality: int, images, ghostscript: bool) -> Dict[str, Any]:
+        """
+        Escolhe o motor: entre os que entregam ao menos MIN_GAIN_SHARE do maior
+        ganho estimado, o de maior ganho por segundo de CPU
+
+        Returns:
+            Dict com strategy, reason, metrics e estimates
+        """
+        metrics = self.inspect(reader, file_size, quality, images)
+        estimates = self.estimate(metrics, ghostscript)
+
+        best_gain = max(estimate['gain_bytes'] for estimate in estimates.values())
+        if best_gain < file_size * self.MIN_GAIN_RATIO:
+            strategy, reason = 'rewrite', 'low_expected_gain'
+        else:
+            eligible = {
+                name: estimate for name, estimate in estimates.items()
+                if estimate['gain_bytes'] >= best_gain * self.MIN_GAIN_SHARE
+            }
+            strategy = max(eligible, key=lambda name: eligible[name]['gain_per_second'])
+            reason = 'best_gain_per_cpu_second'
+
+        return {
+            'strategy': strategy,
+            'reason': reason,
+            'quality': quality,
+            'metrics': metrics,
+            'estimates': estimates
+        }
@@ -8,11 +8,16 @@ class Config:
     
     # Upload e download
     UPLOAD_FOLDER = BASE_DIR /'uploads'
+    PARTIAL_UPLOAD_FOLDER = UPLOAD_FOLDER / '.partial'  # Uploads em partes ainda não finalizados
     DOWNLOAD_CONVERT_FOLDER = BASE_DIR / 'converted' / 'downloads'
     DOWNLOAD_COMPRESS_FOLDER = BASE_DIR / 'compressed' / 'downloads'  # Corrigido o nome da pasta
+    RESULT_CACHE_FOLDER = BASE_DIR / 'cache' / 'results'  # Resultados reaproveitáveis por conteúdo
+    HLS_FOLDER = BASE_DIR / 'converted' / 'hls'  # Uma pasta por streaming (playlists e segmentos)
     
     # Limites
     MAX_CONTENT_LENGTH = 1 * 1024 * 1024 * 1024  # 1GB
+    UPLOAD_BUFFER_SIZE = 1 * 1024 * 1024  # Buffer de escrita dos uploads em partes
+    RESULT_CACHE_MAX_BYTES = 10 * 1024 * 1024 * 1024  # 10GB, evicção LRU acima disso
     
     # Extensões permitidas
     ALLOWED_EXTENSIONS = {
@@ -38,13 +43,94 @@ class Config:
         'bitrate': '192k'
     }
 
+    # WAV -> MP3 em alto volume (leitura por mmap, encoder pré-iniciado ou lameenc)
+    MP3_WARM_PROCESSES = 2  # FFmpeg pré-iniciados por formato de PCM/bitrate
+    MP3_WARM_MAX_IDLE = 4  # Total de FFmpeg parados somando todos os formatos (LRU por formato)
+    MP3_CHUNK_FRAMES = 65536  # Quadros de PCM entregues ao encoder por vez
+    MP3_USE_LAME = True  # Usa o lameenc em processo quando instalado (CBR)
+
+    # Compressão de MP4 para um tamanho alvo (duas passadas)
+    TARGET_SIZE_MIN_VIDEO_KBPS = 150  # Abaixo disso o alvo é recusado
+    TARGET_SIZE_MIN_AUDIO_KBPS = 64  # O áudio cede até aqui quando o orçamento é apertado
+    TARGET_SIZE_OVERHEAD = 0.02  # Fração do alvo reservada ao container (MP4)
+
+    # Streaming HLS (escada em config/ffmpeg_profiles.py)
+    HLS_SEGMENT_SECONDS = 4  # Duração dos segmentos; keyframes forçados nesse intervalo
+    HLS_PRESET = 'veryfast'  # Preset do x264 para todas as variantes
+
+    # Orçamento de CPU dos processos FFmpeg
+    FFMPEG_CORES = None  # None usa os núcleos disponíveis para o processo
+    FFMPEG_MAX_CONCURRENT = None  # Processos FFmpeg simultâneos; None usa metade dos núcleos
+    FFMPEG_NICE = 10  # Prioridade de CPU (0 desativa o nice)
+    FFMPEG_IONICE_CLASS = 2  # best-effort
+    FFMPEG_IONICE_LEVEL = 7  # Menor prioridade de I/O dentro da classe
+
+    # Consultas do ffprobe guardadas em memória (por caminho, tamanho e mtime)
+    MEDIA_PROBE_CACHE_ENTRIES = 256
+
+    # Codificação segmentada em paralelo para vídeos longos
+    SEGMENTED_ENCODE_MIN_DURATION = 120  # Segundos; abaixo disso usa um único processo
+    SEGMENTED_ENCODE_MIN_SEGMENT = 30  # Duração mínima de cada segmento em segundos
+    SEGMENTED_ENCODE_MAX_SEGMENTS = 16
+
+    # Recompressão de imagens de PDF em paralelo
+    PDF_IMAGE_WORKERS = None  # Processos do pool; None usa todos os núcleos
+    PDF_IMAGE_BATCH_BYTES = 64 * 1024 * 1024  # Bytes de imagem enviados ao pool por lote
+    PDF_IMAGE_TASKS_PER_CHILD = 50  # Recicla o worker após N imagens para liberar memória
+    PDF_IMAGE_WORKER_MEMORY = 1 * 1024 * 1024 * 1024  # Limite de memória por worker (1GB)
+
+    # Conversão de PDF em imagens (Ghostscript)
+    RASTER_WORKERS = None  # Processos Ghostscript por requisição; None usa todos os núcleos (sempre
+                           # limitado pelas vagas globais de FFMPEG_MAX_CONCURRENT)
+    RASTER_CHUNK_PAGES = 8  # Máximo de páginas por processo, para o ZIP começar a sair cedo
+    RASTER_DEFAULT_DPI = 150
+    RASTER_MAX_DPI = 600
+    RASTER_JPEG_QUALITY = 85
+
+    # Entrega dos downloads
+    # None envia pelo Python (com Range); 'x-accel' delega ao nginx e 'x-sendfile' ao Apache/lighttpd.
+    # No nginx: location /protected/ { internal; alias <BASE_DIR>/; } com
+    # /protected/compressed/ -> compressed/downloads/, /protected/converted/ -> converted/downloads/
+    # e /protected/hls/ -> converted/hls/
+    DOWNLOAD_OFFLOAD = None
+    DOWNLOAD_ACCEL_PREFIX = '/protected'
+
+    # Retenção de arquivos (uma thread de varredura remove o que venceu)
+    RETENTION_OUTPUT_TTL = 30 * 60  # Resultados ficam disponíveis por 30 min após criados
+    RETENTION_UPLOAD_TTL = 2 * 60 * 60  # Uploads não processados
+    RETENTION_PARTIAL_TTL = 24 * 60 * 60  # Uploads em partes parados (sem novas partes)
+    RETENTION_DOWNLOAD_GRACE = 10 * 60  # Prazo extra após cada download, para retomadas
+    RETENTION_MIN_DOWNLOAD_RATE = 256 * 1024  # Bytes/s assumidos para estimar a duração do envio
+    RETENTION_SWEEP_INTERVAL = 60  # Intervalo máximo entre varreduras (segundos)
+    RETENTION_SCAN_INTERVAL = 60 * 60  # Releitura das pastas para adotar arquivos não controlados
+    RETENTION_BATCH_SIZE = 200  # Arquivos removidos por lote
+
+    # Cota de disco das pastas de upload e resultados
+    DISK_QUOTA_BYTES = 50 * 1024 * 1024 * 1024  # 50GB somando uploads, partes e resultados
+    DISK_MIN_FREE_BYTES = 2 * 1024 * 1024 * 1024  # Margem livre mantida no disco
+    DISK_USAGE_CACHE_SECONDS = 5  # Intervalo mínimo entre recontagens das pastas
+    DISK_RETRY_AFTER = 30  # Retry-After (segundos) quando o espaço está só reservado (429)
+    DISK_MAX_RETRY_AFTER = 60 * 60  # Limite do Retry-After quando o disco está cheio (503)
+
+    # Fila de processamento assíncrono
+    JOB_WORKERS = 2  # Número de conversões/compressões simultâneas
+    JOB_QUEUE_LIMIT = 20  # Máximo de jobs aguardando ou em execução
+    JOB_RETENTION_SECONDS = 60 * 60  # Tempo que o status de um job finalizado fica disponível
+    JOB_BATCH_QUEUE_LIMIT = 1000  # Máximo de itens de lote aguardando ou em execução
+
+    # Processamento em lote (vários arquivos, uma ação)
+    BATCH_MAX_ITEMS = 500  # Arquivos por lote
+
     @classmethod
     def create_folders(cls):
         """Cria todos os diretórios necessários se não existirem"""
         folders = [
             cls.UPLOAD_FOLDER,
+            cls.PARTIAL_UPLOAD_FOLDER,
             cls.DOWNLOAD_CONVERT_FOLDER,
-            cls.DOWNLOAD_COMPRESS_FOLDER
+            cls.DOWNLOAD_COMPRESS_FOLDER,
+            cls.RESULT_CACHE_FOLDER,
+            cls.HLS_FOLDER
         ]
         
         for folder in folders:
@@ -0,0 +1,146 @@
+# Perfis declarativos do FFmpeg usados pelo FFmpegPipeline
+#
+# Chaves suportadas:
+#   extension        - extensão do arquivo de saída
+#   video_codec      - codec de vídeo ('copy' para stream copy, None para descartar o vídeo)
+#   audio_codec      - codec de áudio ('copy' para stream copy, None para descartar o áudio)
+#   preset, crf, tune, video_params (-x264-params), audio_bitrate
+#   video_bitrate    - bitrate médio do vídeo (-b:v), usado no lugar do crf (ex.: duas passadas)
+#   audio_quality    - qualidade VBR do encoder de áudio (-q:a), no lugar de audio_bitrate
+#   video_tag        - tag do stream de vídeo (-tag:v), ex.: 'hvc1' para HEVC copiado
+#   faststart        - move o moov atom para o início (streaming)
+#   threads          - teto de threads do FFmpeg; o orçamento real vem do FFmpegScheduler
+#   segmented        - vídeos longos são divididos e codificados em paralelo (SegmentedEncoder)
+#   smart_copy       - consulta o ffprobe e copia (remux) os streams já compatíveis com MP4,
+#                      usando video_codec/audio_codec só para os que precisam de re-encode
+
+# Codecs que podem ir para um container MP4 sem transcodificação
+MP4_COMPATIBLE_CODECS = {
+    'video': ['h264', 'hevc', 'mpeg4'],
+    'audio': ['aac', 'mp3', 'ac3']
+}
+
+# Containers que o FFmpeg lê sequencialmente: a conversão pode receber o upload
+# direto no stdin (-f <demuxer> -i pipe:0), sem gravar a entrada em disco
+STREAMABLE_INPUT_FORMATS = {
+    'ts': 'mpegts',
+    'mts': 'mpegts',
+    'm2ts': 'mpegts',
+    'mpg': 'mpeg',
+    'mpeg': 'mpeg',
+    'vob': 'mpeg',
+    'webm': 'matroska',
+    'mkv': 'matroska',
+    'wav': 'wav'
+}
+
+# Conversões, indexadas pela extensão de entrada ('generic' para as demais)
+CONVERSION_PROFILES = {
+    'mkv': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'preset': 'fast',
+        'crf': 23,
+        'audio_codec': 'aac',
+        'faststart': True,
+        'smart_copy': True
+    },
+    'avi': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'audio_codec': 'aac',
+        'smart_copy': True
+    },
+    'wmv': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'preset': 'fast',
+        'audio_codec': 'aac',
+        'faststart': True,
+        'smart_copy': True
+    },
+    'asf': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'audio_codec': 'aac',
+        'smart_copy': True
+    },
+    'mov': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'preset': 'fast',
+        'crf': 23,
+        'audio_codec': 'aac',
+        'faststart': True,
+        'smart_copy': True
+    },
+    'webm': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'preset': 'medium',
+        'crf': 23,
+        'audio_codec': 'aac',
+        'audio_bitrate': '128k',
+        'smart_copy': True
+    },
+    'wav': {
+        'extension': 'mp3',
+        'video_codec': None,
+        'audio_codec': 'libmp3lame',
+        'audio_bitrate': '192k'
+    },
+    'generic': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'preset': 'slow',
+        'crf': 26,
+        'audio_codec': 'aac',
+        'audio_bitrate': '128k',
+        'faststart': True,
+        'smart_copy': True
+    }
+}
+
+# Modos do MP3 pelo sufixo da ação (convert_to_mp3_<modo>): bitrate = CBR em kbps,
+# vbr = qualidade VBR do LAME (0 = melhor, 9 = menor arquivo)
+MP3_ENCODING_MODES = {
+    'fast': {'bitrate': 128},
+    'hq': {'vbr': 0},
+    'vbr2': {'vbr': 2},
+    'vbr4': {'vbr': 4},
+    'cbr128': {'bitrate': 128},
+    'cbr192': {'bitrate': 192},
+    'cbr256': {'bitrate': 256},
+    'cbr320': {'bitrate': 320}
+}
+
+# Escada de qualidades do streaming HLS, da maior para a menor (bitrates em kbps).
+# Variantes acima da altura da fonte são descartadas (sem upscale)
+HLS_LADDER = [
+    {'name': '1080p', 'height': 1080, 'video_bitrate': 5000, 'maxrate': 5350, 'bufsize': 7500, 'audio_bitrate': 192},
+    {'name': '720p', 'height': 720, 'video_bitrate': 2800, 'maxrate': 2996, 'bufsize': 4200, 'audio_bitrate': 128},
+    {'name': '480p', 'height': 480, 'video_bitrate': 1400, 'maxrate': 1498, 'bufsize': 2100, 'audio_bitrate': 128},
+    {'name': '360p', 'height': 360, 'video_bitrate': 800, 'maxrate': 856, 'bufsize': 1200, 'audio_bitrate': 96}
+]
+
+# Tipo de segmento do HLS pelo sufixo da ação (convert_to_hls_<tipo>) -> -hls_segment_type
+HLS_SEGMENT_TYPES = {
+    'fmp4': 'fmp4',  # CMAF: init.mp4 + .m4s
+    'ts': 'mpegts'   # Players antigos
+}
+
+# Compressões, indexadas pela extensão de entrada
+COMPRESSION_PROFILES = {
+    'mp4': {
+        'extension': 'mp4',
+        'video_codec': 'libx264',
+        'crf': 28,
+        'preset': 'medium',  # Mais equilibrado que 'fast'
+        'tune': 'film',      # Otimizado para conteúdo comum
+        'video_params': 'nal-hrd=cbr:force-cfr=1',
+        'audio_codec': 'aac',
+        'audio_bitrate': '128k',  # Taxa de bits fixa para áudio
+        'faststart': True,
+        'segmented': True
+    }
+}
@@ -0,0 +1,182 @@
+import os
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from config.ffmpeg_profiles import MP4_COMPATIBLE_CODECS
+from services.ffmpeg_runner import ffmpeg_runner, FFmpegError
+from services.media_probe import media_probe
+
+
+class FFmpegPipeline:
+    """Executa conversões e compressões do FFmpeg a partir de perfis declarativos"""
+
+    def __init__(self, runner=ffmpeg_runner, probe=media_probe):
+        self.runner = runner
+        self.probe = probe
+
+    def _generate_unique_filename(self, original_name: str) -> str:
+        """Gera um nome de arquivo único com timestamp e UUID"""
+        base, ext = os.path.splitext(original_name)
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        unique_id = str(uuid.uuid4())[:8]  # Pega os primeiros 8 caracteres do UUID
+        return f"{base}_{timestamp}_{unique_id}{ext}"
+
+    def plan_stream_copy(self, probe: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Decide, por tipo de stream, o que pode ser copiado para MP4 sem transcodificação
+
+        Todos os streams de vídeo (e todos os de áudio) precisam ter codec
+        compatível para que aquele tipo seja copiado.
+        """
+        plan = {}
+        if not probe:
+            return plan
+
+        video_streams = self.probe.streams(probe, 'video')
+        audio_streams = self.probe.streams(probe, 'audio')
+
+        video_codecs = {stream.get('codec_name') for stream in video_streams}
+        audio_codecs = {stream.get('codec_name') for stream in audio_streams}
+
+        if video_streams and video_codecs <= set(MP4_COMPATIBLE_CODECS['video']):
+            plan['video_codec'] = 'copy'
+            if 'hevc' in video_codecs:
+                plan['video_tag'] = 'hvc1'  # Tag exigida pelos players da Apple
+        if audio_streams and audio_codecs <= set(MP4_COMPATIBLE_CODECS['audio']):
+            plan['audio_codec'] = 'copy'
+
+        return plan
+
+    def resolve_profile(self, input_path: str, profile: Dict[str, Any], **overrides) -> Dict[str, Any]:
+        """Aplica o remux por stream (smart_copy) e os overrides da requisição"""
+        resolved = dict(profile)
+
+        # Sem arquivo (entrada por pipe) não há o que consultar: valem os codecs do perfil
+        if profile.get('smart_copy') and input_path:
+            resolved.update(self.plan_stream_copy(self.probe.probe(input_path)))
+
+        resolved.update({key: value for key, value in overrides.items() if value is not None})
+        return resolved
+
+    def build_command(self, input_path: str, output_path: str, profile: Dict[str, Any],
+                      input_format: Optional[str] = None) -> List[str]:
+        """Monta o argv do FFmpeg a partir de um perfil já resolvido"""
+        command = [self.runner.ffmpeg_path]
+        if input_format:
+            command += ['-f', input_format]  # Pipe não tem extensão nem permite sondar por seek
+        command += ['-i', input_path]
+
+        video_codec = profile.get('video_codec')
+        if video_codec is None:
+            command += ['-vn']
+        else:
+            command += ['-c:v', video_codec]
+            if profile.get('video_tag'):
+                command += ['-tag:v', profile['video_tag']]
+            if video_codec != 'copy':
+                if profile.get('preset'):
+                    command += ['-preset', profile['preset']]
+                if profile.get('crf') is not None:
+                    command += ['-crf', str(profile['crf'])]
+                if profile.get('video_bitrate'):
+                    command += ['-b:v', profile['video_bitrate']]
+                if profile.get('tune'):
+                    command += ['-tune', profile['tune']]
+                if profile.get('video_params'):
+                    command += ['-x264-params', profile['video_params']]
+
+        audio_codec = profile.get('audio_codec')
+        if audio_codec is None:
+            command += ['-an']
+        else:
+            command += ['-c:a', audio_codec]
+            if audio_codec != 'copy' and profile.get('audio_quality') is not None:
+                command += ['-q:a', str(profile['audio_quality'])]
+            elif audio_codec != 'copy' and profile.get('audio_bitrate'):
+                command += ['-b:a', profile['audio_bitrate']]
+
+        if profile.get('faststart'):
+            command += ['-movflags', '+faststart']  # Para streaming
+
+        if profile.get('threads'):
+            command += ['-threads', str(profile['threads'])]
+
+        command += ['-y', output_path]
+        return command
+
+    def run(self, input_path: str, profile: Dict[str, Any], output_name: str, output_dir: str,
+            progress_callback=None, **overrides) -> Tuple[bool, str]:
+        """
+        Executa um perfil do FFmpeg
+
+        Args:
+            input_path: Caminho do arquivo de entrada
+            profile: Perfil de CONVERSION_PROFILES ou COMPRESSION_PROFILES
+            output_name: Nome base do arquivo de saída
+            output_dir: Pasta de destino
+            progress_callback: Função chamada com o progresso do FFmpeg
+            overrides: Parâmetros da requisição (ex.: crf)
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str)
+        """
+        input_path = str(input_path)
+        output_path = os.path.join(str(output_dir), self._generate_unique_filename(output_name))
+
+        try:
+            resolved = self.resolve_profile(input_path, profile, **overrides)
+            command = self.build_command(input_path, output_path, resolved)
+            self.runner.run(command, input_path, progress_callback)
+
+            if not os.path.exists(output_path):
+                raise RuntimeError("Arquivo de saída não foi criado")
+
+            return True, output_path
+
+        except FFmpegError as e:
+            self._remove_partial(output_path)
+            return False, str(e)
+        except Exception as e:
+            self._remove_partial(output_path)
+            return False, f"Erro inesperado: {str(e)}"
+
+    def run_stream(self, stream, input_format: str, profile: Dict[str, Any], output_name: str, output_dir: str,
+                   progress_callback=None, input_size: Optional[int] = None, **overrides) -> Tuple[bool, str]:
+        """
+        Executa um perfil lendo a entrada de um fluxo (ex.: corpo da requisição) pelo stdin
+
+        A transcodificação acompanha a chegada dos dados e a entrada nunca é
+        gravada em disco. Só serve para containers lidos sequencialmente
+        (STREAMABLE_INPUT_FORMATS); o smart_copy não se aplica.
+
+        Args:
+            stream: Objeto com read(n) devolvendo bytes
+            input_format: Demuxer do FFmpeg (-f)
+            input_size: Bytes esperados; entrada menor é tratada como interrompida
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str)
+        """
+        output_path = os.path.join(str(output_dir), self._generate_unique_filename(output_name))
+
+        try:
+            resolved = self.resolve_profile(None, profile, **overrides)
+            command = self.build_command('pipe:0', output_path, resolved, input_format=input_format)
+            self.runner.run(command, None, progress_callback, stdin=stream, stdin_size=input_size)
+
+            if not os.path.exists(output_path):
+                raise RuntimeError("Arquivo de saída não foi criado")
+
+            return True, output_path
+
+        except FFmpegError as e:
+            self._remove_partial(output_path)
+            return False, str(e)
+        except Exception as e:
+            self._remove_partial(output_path)
+            return False, f"Erro inesperado: {str(e)}"
+
+    def _remove_partial(self, output_path: str):
+        """Remove o arquivo de saída incompleto após uma falha"""
+        if os.path.exists(output_path):
+            os.remove(output_path)
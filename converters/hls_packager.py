@@ -0,0 +1,165 @@
+import os
+import shutil
+from typing import Any, Dict, List, Optional, Tuple
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from services.ffmpeg_runner import FFmpegError
+
+# Playlist principal de cada streaming (as das variantes usam o nome da variante)
+MASTER_PLAYLIST = 'master.m3u8'
+
+
+class HLSPackager:
+    """
+    Gera um streaming HLS com várias resoluções/bitrates numa única passada
+
+    O vídeo é decodificado uma vez e o filtro split entrega os mesmos quadros
+    a um scale + encoder por variante. O muxer HLS grava os segmentos e
+    atualiza as playlists (tipo EVENT) enquanto a codificação avança, então o
+    player pode começar assim que o primeiro segmento de cada variante existe.
+    Os keyframes são forçados no mesmo instante em todas as variantes para que
+    os segmentos fiquem alinhados e a troca de qualidade seja limpa.
+    """
+
+    def __init__(self, pipeline: FFmpegPipeline, ladder: List[Dict[str, Any]], segment_seconds: float = 4,
+                 preset: str = 'veryfast'):
+        self.pipeline = pipeline
+        self.runner = pipeline.runner
+        self.probe = pipeline.probe
+        self.ladder = ladder
+        self.segment_seconds = segment_seconds
+        self.preset = preset
+
+    def plan(self, input_path: str) -> List[Dict[str, Any]]:
+        """Variantes para a fonte: sem upscale; fonte menor que toda a escada vira uma variante na altura dela"""
+        videos = self.probe.streams(self.probe.probe(input_path), 'video')
+        if not videos:
+            return []
+
+        height = videos[0].get('height')
+        if not height:
+            return list(self.ladder)
+
+        rungs = [rung for rung in self.ladder if rung['height'] <= height]
+        if not rungs:
+            height -= height % 2  # libx264 exige dimensões pares
+            rungs = [dict(self.ladder[-1], name=f"{height}p", height=height)]
+        return rungs
+
+    def estimate_size(self, input_path: str) -> Optional[int]:
+        """Bytes esperados pelo maxrate de cada variante (None sem duração conhecida)"""
+        duration = self.probe.duration(self.probe.probe(input_path))
+        rungs = self.plan(input_path)
+        if not duration or not rungs:
+            return None
+        kbps = sum(rung['maxrate'] + rung['audio_bitrate'] for rung in rungs)
+        return int(duration * kbps * 1000 / 8 * 1.05)  # +5% de overhead do container
+
+    def build_command(self, input_path: str, stream_dir: str, rungs: List[Dict[str, Any]], has_audio: bool,
+                      segment_type: str) -> List[str]:
+        """Monta o argv do FFmpeg: um decode, split em N ramos, um encoder e uma playlist por variante"""
+        count = len(rungs)
+        graph = [f"[0:v:0]split={count}" + ''.join(f"[s{index}]" for index in range(count))]
+        graph += [f"[s{index}]scale=-2:{rung['height']}[v{index}]" for index, rung in enumerate(rungs)]
+
+        command = [self.runner.ffmpeg_path, '-i', input_path, '-filter_complex', ';'.join(graph)]
+        for index in range(count):
+            command += ['-map', f"[v{index}]"]
+        if has_audio:
+            # Cada variante leva o próprio áudio (a playlist da variante precisa ser tocável sozinha)
+            command += ['-map', '0:a:0'] * count
+
+        command += [
+            '-c:v', 'libx264', '-preset', self.preset, '-pix_fmt', 'yuv420p',
+            '-sc_threshold', '0', '-force_key_frames', f"expr:gte(t,n_forced*{self.segment_seconds})"
+        ]
+        for index, rung in enumerate(rungs):
+            command += [
+                f'-b:v:{index}', f"{rung['video_bitrate']}k",
+                f'-maxrate:v:{index}', f"{rung['maxrate']}k",
+                f'-bufsize:v:{index}', f"{rung['bufsize']}k"
+            ]
+        if has_audio:
+            command += ['-c:a', 'aac', '-ac', '2']
+            for index, rung in enumerate(rungs):
+                command += [f'-b:a:{index}', f"{rung['audio_bitrate']}k"]
+
+        stream_map = ' '.join(
+            f"v:{index},a:{index},name:{rung['name']}" if has_audio else f"v:{index},name:{rung['name']}"
+            for index, rung in enumerate(rungs)
+        )
+        extension = 'm4s' if segment_type == 'fmp4' else 'ts'
+
+        command += [
+            '-f', 'hls',
+            '-hls_time', str(self.segment_seconds),
+            '-hls_playlist_type', 'event',
+            '-hls_flags', 'independent_segments',
+            '-hls_segment_type', segment_type,
+            '-hls_segment_filename', os.path.join(stream_dir, f"%v_%05d.{extension}"),
+            '-master_pl_name', MASTER_PLAYLIST,
+            '-var_stream_map', stream_map
+        ]
+        if segment_type == 'fmp4':
+            command += ['-hls_fmp4_init_filename', '%v_init.mp4']
+
+        command += ['-y', os.path.join(stream_dir, '%v.m3u8')]
+        return command
+
+    def run(self, input_path: str, stream_dir: str, segment_type: str = 'fmp4',
+            progress_callback=None) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Gera o streaming na pasta stream_dir (criada aqui e removida em caso de falha)
+
+        O progresso recebe 'ready': True a partir do momento em que a playlist
+        principal e as de todas as variantes existem (reprodução já possível).
+
+        Returns:
+            Tuple (success: bool, master_path: str | error_message: str, hls_info: dict)
+        """
+        input_path = str(input_path)
+        stream_dir = str(stream_dir)
+        master_path = os.path.join(stream_dir, MASTER_PLAYLIST)
+
+        try:
+            rungs = self.plan(input_path)
+            if not rungs:
+                return False, "O arquivo não tem stream de vídeo", {}
+            has_audio = bool(self.probe.streams(self.probe.probe(input_path), 'audio'))
+
+            os.makedirs(stream_dir, exist_ok=True)
+            command = self.build_command(input_path, stream_dir, rungs, has_audio, segment_type)
+            playlists = [master_path] + [os.path.join(stream_dir, f"{rung['name']}.m3u8") for rung in rungs]
+            self.runner.run(command, input_path, self._progress(playlists, progress_callback))
+
+            if not os.path.exists(master_path):
+                raise RuntimeError("Playlist principal não foi criada")
+
+            return True, master_path, {
+                'segment_type': segment_type,
+                'segment_seconds': self.segment_seconds,
+                'variants': [
+                    {'name': rung['name'], 'height': rung['height'],
+                     'bandwidth': (rung['video_bitrate'] + (rung['audio_bitrate'] if has_audio else 0)) * 1000}
+                    for rung in rungs
+                ]
+            }
+
+        except FFmpegError as e:
+            shutil.rmtree(stream_dir, ignore_errors=True)
+            return False, str(e), {}
+        except Exception as e:
+            shutil.rmtree(stream_dir, ignore_errors=True)
+            return False, f"Erro inesperado: {str(e)}", {}
+
+    def _progress(self, playlists: List[str], callback):
+        if not callback:
+            return None
+        state = {'ready': False}
+
+        def update(progress: Dict[str, Any]):
+            if not state['ready']:
+                state['ready'] = all(os.path.exists(path) for path in playlists)
+            progress['ready'] = state['ready']
+            callback(progress)
+
+        return update
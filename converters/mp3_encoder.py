@@ -0,0 +1,266 @@
+import atexit
+import os
+import shutil
+import subprocess
+import threading
+from collections import OrderedDict
+from contextlib import closing
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from converters.wav_reader import WavReader
+from services.ffmpeg_scheduler import FFmpegScheduler
+
+try:
+    import lameenc  # Encoder LAME em processo (opcional)
+except ImportError:
+    lameenc = None
+
+
+class MP3EncodeError(RuntimeError):
+    """Falha ao codificar o MP3"""
+
+
+class _WarmProcessPool:
+    """
+    Processos FFmpeg já iniciados, à espera do PCM no stdin
+
+    A inicialização do FFmpeg (carregar bibliotecas, montar o grafo) domina o
+    tempo em clipes curtos; com um processo pronto por formato, ela acontece
+    enquanto o arquivo anterior ainda está sendo codificado. O total de
+    processos parados é limitado a max_idle somando todos os formatos: os
+    formatos usados há mais tempo perdem os seus primeiro.
+    """
+
+    def __init__(self, size: int, max_idle: Optional[int] = None):
+        self.size = size
+        self.max_idle = size if max_idle is None else max_idle
+        self.idle: 'OrderedDict[Tuple, List[subprocess.Popen]]' = OrderedDict()
+        self.lock = threading.Lock()
+        atexit.register(self.close)
+
+    def _spawn(self, argv: List[str]) -> subprocess.Popen:
+        return subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+
+    def take(self, key: Tuple, argv: List[str]) -> subprocess.Popen:
+        """Um processo pronto para key (ou um novo), repondo o estoque para o próximo arquivo"""
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            self.idle.move_to_end(key)
+            # Descarta os que morreram parados (ex.: FFmpeg encerrado externamente)
+            idle[:] = [process for process in idle if process.poll() is None]
+            process = idle.pop() if idle else None
+
+        if process is None:
+            process = self._spawn(argv)
+
+        size = min(self.size, self.max_idle)
+        with self.lock:
+            missing = size - len(self.idle.get(key, []))
+        replacements = [self._spawn(argv) for _ in range(max(0, missing))]
+
+        extra = []
+        with self.lock:
+            idle = self.idle.setdefault(key, [])
+            for replacement in replacements:
+                # Outra thread pode ter reposto ao mesmo tempo
+                (idle if len(idle) < size else extra).append(replacement)
+            extra += self._evict(key)
+        for replacement in extra:
+            replacement.kill()
+            replacement.wait()
+
+        return process
+
+    def _evict(self, key: Tuple) -> List[subprocess.Popen]:
+        """Tira do estoque o excesso sobre max_idle, começando pelos formatos usados há mais tempo (com o lock)"""
+        excess = sum(len(idle) for idle in self.idle.values()) - self.max_idle
+        evicted = []
+        for other in [other for other in self.idle if other != key] + [key]:
+            if excess <= 0:
+                break
+            idle = self.idle[other]
+            count = min(excess, len(idle))
+            evicted += idle[len(idle) - count:]
+            del idle[len(idle) - count:]
+            excess -= count
+            if not idle:
+                del self.idle[other]
+        return evicted
+
+    def close(self):
+        with self.lock:
+            processes = [process for idle in self.idle.values() for process in idle]
+            self.idle = OrderedDict()
+        for process in processes:
+            process.kill()
+            process.wait()
+
+
+class MP3Encoder:
+    """
+    Codificação WAV -> MP3 de alto volume
+
+    O PCM é lido por mmap (WavReader) e entregue sem passar pelo demuxer do
+    FFmpeg (-f s16le etc., sem sondagem da entrada). Motores, em ordem:
+      - lameenc em processo, se instalado (CBR, PCM inteiro);
+      - FFmpeg pré-iniciado (pool) escrevendo no stdout, para CBR;
+      - FFmpeg por arquivo gravando direto na saída, para VBR: o cabeçalho
+        Xing com a tabela de busca precisa de seek no arquivo de saída.
+    """
+
+    def __init__(self, ffmpeg_path: str = 'ffmpeg', scheduler: Optional[FFmpegScheduler] = None,
+                 warm_processes: int = 2, chunk_frames: int = 65536, use_lame: bool = True,
+                 max_warm_processes: Optional[int] = None):
+        self.ffmpeg_path = ffmpeg_path
+        self.scheduler = scheduler
+        self.chunk_frames = chunk_frames
+        self.use_lame = use_lame and lameenc is not None
+        self.pool = _WarmProcessPool(warm_processes, max_warm_processes)
+
+    def encode(self, wav_path: str, output_path: str, mode: Dict[str, Any],
+               progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Dict[str, Any]:
+        """
+        Args:
+            mode: {'bitrate': kbps} para CBR ou {'vbr': 0-9} (0 = melhor qualidade)
+
+        Returns:
+            Dict com engine, duration, sample_rate e channels
+
+        Raises:
+            WavFormatError: WAV não suportado pelo leitor (quem chama pode usar o FFmpeg completo)
+            MP3EncodeError: falha do encoder
+        """
+        with WavReader(wav_path) as reader:
+            progress = _Progress(reader.frames, self.chunk_frames, progress_callback)
+
+            if self.use_lame and 'bitrate' in mode and reader.is_integer_pcm and reader.channels <= 2:
+                engine, encode = 'lameenc', self._encode_lame
+            elif 'bitrate' in mode:
+                engine, encode = 'ffmpeg-warm', self._encode_warm
+            else:
+                engine, encode = 'ffmpeg', self._encode_file
+
+            try:
+                self._run(lambda: encode(reader, output_path, mode, progress))
+            except BaseException:
+                if os.path.exists(output_path):
+                    os.remove(output_path)
+                raise
+
+            progress.finish()
+            return {
+                'engine': engine,
+                'duration': round(reader.duration, 3),
+                'sample_rate': reader.sample_rate,
+                'channels': reader.channels
+            }
+
+    def _run(self, encode: Callable[[], None]):
+        """Respeita o limite global de processos de codificação simultâneos"""
+        if not self.scheduler:
+            encode()
+            return
+        with self.scheduler.slot(1):
+            encode()
+
+    def _encode_lame(self, reader: WavReader, output_path: str, mode: Dict[str, Any], progress: '_Progress'):
+        encoder = lameenc.Encoder()
+        encoder.set_bit_rate(int(mode['bitrate']))
+        encoder.set_in_sample_rate(reader.sample_rate)
+        encoder.set_channels(reader.channels)
+        encoder.set_quality(2)  # 2 = alta qualidade, 7 = rápido
+
+        with open(output_path, 'wb') as output:
+            with closing(reader.pcm16_chunks(self.chunk_frames)) as chunks:
+                for chunk in chunks:
+                    output.write(encoder.encode(chunk))
+                    progress.advance()
+            output.write(encoder.flush())
+
+    def _input_args(self, reader: WavReader) -> List[str]:
+        return ['-f', reader.ffmpeg_format, '-ar', str(reader.sample_rate), '-ac', str(reader.channels),
+                '-i', 'pipe:0']
+
+    def _command(self, arguments: List[str]) -> List[str]:
+        argv = [self.ffmpeg_path, '-hide_banner', '-v', 'error'] + arguments
+        # Mesma prioridade (nice/ionice) dos demais processos FFmpeg; o LAME usa uma thread
+        return self.scheduler.apply(argv, 1) if self.scheduler else argv
+
+    def _encode_warm(self, reader: WavReader, output_path: str, mode: Dict[str, Any], progress: '_Progress'):
+        bitrate = f"{int(mode['bitrate'])}k"
+        key = (reader.ffmpeg_format, reader.sample_rate, reader.channels, bitrate)
+        # Saída no stdout: o destino não precisa ser conhecido quando o processo é iniciado
+        argv = self._command(self._input_args(reader) + [
+            '-c:a', 'libmp3lame', '-b:a', bitrate, '-write_xing', '0', '-f', 'mp3', 'pipe:1'
+        ])
+        process = self.pool.take(key, argv)
+
+        try:
+            with open(output_path, 'wb') as output:
+                self._feed(process, reader, progress, lambda: shutil.copyfileobj(process.stdout, output))
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+
+    def _encode_file(self, reader: WavReader, output_path: str, mode: Dict[str, Any], progress: '_Progress'):
+        argv = self._command(self._input_args(reader) + [
+            '-c:a', 'libmp3lame', '-q:a', str(int(mode['vbr'])), '-y', output_path
+        ])
+        process = subprocess.Popen(argv, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+        try:
+            self._feed(process, reader, progress, lambda: None)
+        except BaseException:
+            process.kill()
+            process.wait()
+            raise
+
+    def _feed(self, process: subprocess.Popen, reader: WavReader, progress: '_Progress', consume: Callable[[], None]):
+        """Escreve o PCM no stdin numa thread enquanto consume() lê a saída, e confere o resultado"""
+        errors = []
+
+        def write():
+            try:
+                with closing(reader.chunks(self.chunk_frames)) as chunks:
+                    for chunk in chunks:
+                        process.stdin.write(chunk)
+                        progress.advance()
+            except BrokenPipeError:
+                pass  # O FFmpeg encerrou; o erro vem pelo código de saída
+            except Exception as e:
+                errors.append(e)
+            finally:
+                try:
+                    process.stdin.close()
+                except OSError:
+                    pass
+
+        writer = threading.Thread(target=write, daemon=True)
+        writer.start()
+        consume()
+        writer.join()
+        stderr = process.stderr.read().decode('utf-8', 'replace').strip()
+        process.wait()
+
+        if errors:
+            raise MP3EncodeError(f"Falha ao ler o WAV: {errors[0]}")
+        if process.returncode != 0:
+            last_line = stderr.splitlines()[-1] if stderr else f"código de saída {process.returncode}"
+            raise MP3EncodeError(f"Erro FFmpeg: {last_line}")
+
+
+class _Progress:
+    """Percentual pelos blocos de PCM já entregues ao encoder"""
+
+    def __init__(self, frames: int, chunk_frames: int, callback):
+        self.total = max(1, -(-frames // chunk_frames))
+        self.done = 0
+        self.callback = callback
+
+    def advance(self):
+        self.done += 1
+        if self.callback:
+            self.callback({'percent': min(99.9, round(self.done / self.total * 100, 1)), 'eta': None, 'done': False})
+
+    def finish(self):
+        if self.callback:
+            self.callback({'percent': 100.0, 'eta': None, 'done': True})
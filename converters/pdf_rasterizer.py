@@ -0,0 +1,167 @@
+import math
+import os
+import shutil
+import subprocess
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import nullcontext
+from typing import Iterator, List, Optional, Tuple
+from services.ffmpeg_scheduler import FFmpegScheduler
+
+# Dispositivo do Ghostscript e extensão para cada formato de saída
+RASTER_DEVICES = {
+    'jpg': ('jpeg', 'jpg'),
+    'png': ('png16m', 'png')
+}
+
+# Bytes por pixel esperados no arquivo de cada formato (RGB comprimido), para a cota de disco
+RASTER_BYTES_PER_PIXEL = {
+    'jpg': 0.5,
+    'png': 2.0
+}
+
+# Página A4 em polegadas: a estimativa usa o tamanho de página mais comum
+PAGE_INCHES = (8.27, 11.69)
+
+
+class RasterizeError(RuntimeError):
+    """Falha ao renderizar páginas com o Ghostscript"""
+
+
+class PDFRasterizer:
+    """
+    Renderiza páginas de PDF em JPEG/PNG com o Ghostscript
+
+    As páginas são divididas em blocos contíguos renderizados por processos
+    Ghostscript em paralelo (um núcleo cada); os blocos são entregues na ordem
+    em que terminam, para que o resultado possa ser enviado antes do fim.
+    Com scheduler, cada processo ocupa uma vaga do limite global de processos
+    (o mesmo do FFmpeg), então requisições simultâneas esperam em vez de
+    somarem Ghostscripts.
+    """
+
+    def __init__(self, ghostscript_path: Optional[str], workers: Optional[int] = None, chunk_pages: int = 8,
+                 max_dpi: int = 600, jpeg_quality: int = 85, scheduler: Optional[FFmpegScheduler] = None):
+        self.ghostscript_path = ghostscript_path
+        self.scheduler = scheduler
+        self.workers = workers or os.cpu_count() or 1
+        if scheduler:
+            # Mais threads que vagas só ficariam esperando
+            self.workers = min(self.workers, scheduler.max_concurrent)
+        self.chunk_pages = chunk_pages
+        self.max_dpi = max_dpi
+        self.jpeg_quality = jpeg_quality
+
+    def plan_chunks(self, pages: List[int]) -> List[Tuple[int, int]]:
+        """
+        Agrupa as páginas (base 1, ordenadas) em intervalos contíguos que dividem
+        o trabalho entre os workers sem passar de chunk_pages por bloco
+        """
+        size = max(1, min(self.chunk_pages, math.ceil(len(pages) / self.workers)))
+        chunks = []
+        start = previous = None
+        count = 0
+        for page in pages:
+            if start is not None and (page != previous + 1 or count >= size):
+                chunks.append((start, previous))
+                start = None
+            if start is None:
+                start, count = page, 0
+            previous = page
+            count += 1
+        if start is not None:
+            chunks.append((start, previous))
+        return chunks
+
+    def check(self, image_format: str, dpi: int):
+        """Valida os parâmetros antes de começar (render só executa ao ser consumido)"""
+        if not self.ghostscript_path:
+            raise RasterizeError("Ghostscript não encontrado. Instale o Ghostscript para converter PDF em imagens.")
+        if image_format not in RASTER_DEVICES:
+            raise ValueError(f"Formato não suportado: {image_format}")
+        if not 1 <= dpi <= self.max_dpi:
+            raise ValueError(f"DPI deve estar entre 1 e {self.max_dpi}")
+
+    def estimate_size(self, pages: int, image_format: str, dpi: int) -> int:
+        """Bytes que as imagens temporárias podem ocupar (todas as páginas prontas antes de irem para o ZIP)"""
+        pixels = PAGE_INCHES[0] * dpi * PAGE_INCHES[1] * dpi
+        return int(pages * pixels * RASTER_BYTES_PER_PIXEL[image_format])
+
+    def render(self, filepath: str, pages: List[int], image_format: str = 'jpg', dpi: int = 150,
+               work_dir: Optional[str] = None) -> Iterator[Tuple[int, str]]:
+        """
+        Renderiza as páginas em paralelo
+
+        Yields:
+            Tuple (número da página, caminho da imagem), na ordem em que os blocos terminam.
+            O arquivo pode ser removido pelo consumidor assim que for usado.
+        """
+        self.check(image_format, dpi)
+
+        work_dir = tempfile.mkdtemp(prefix='raster_', dir=work_dir)
+        processes = set()
+        lock = threading.Lock()
+        cancelled = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        try:
+            futures = [
+                executor.submit(self._render_chunk, filepath, chunk, image_format, dpi, work_dir,
+                                processes, lock, cancelled)
+                for chunk in self.plan_chunks(sorted(set(pages)))
+            ]
+            for future in as_completed(futures):
+                for item in future.result():
+                    yield item
+        finally:
+            # Cliente desconectado ou erro: não deixa Ghostscript rodando à toa
+            executor.shutdown(wait=False, cancel_futures=True)
+            with lock:
+                cancelled.set()
+                for process in processes:
+                    process.kill()
+            executor.shutdown(wait=True)
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _render_chunk(self, filepath: str, chunk: Tuple[int, int], image_format: str, dpi: int,
+                      work_dir: str, processes: set, lock: threading.Lock,
+                      cancelled: threading.Event) -> List[Tuple[int, str]]:
+        first, last = chunk
+        device, extension = RASTER_DEVICES[image_format]
+        pattern = os.path.join(work_dir, f"chunk{first:05d}_%05d.{extension}")
+
+        command = [
+            self.ghostscript_path, '-dSAFER', '-dBATCH', '-dNOPAUSE', '-dQUIET',
+            f'-sDEVICE={device}', f'-r{dpi}',
+            '-dTextAlphaBits=4', '-dGraphicsAlphaBits=4',
+            f'-dFirstPage={first}', f'-dLastPage={last}',
+            f'-sOutputFile={pattern}'
+        ]
+        if device == 'jpeg':
+            command.append(f'-dJPEGQ={self.jpeg_quality}')
+        command.append(str(filepath))
+
+        # Um núcleo por processo; espera vaga no limite global de processos
+        with self.scheduler.slot(1) if self.scheduler else nullcontext():
+            with lock:
+                if cancelled.is_set():
+                    return []
+                process = subprocess.Popen(command, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+                processes.add(process)
+            try:
+                _, stderr = process.communicate()
+            finally:
+                with lock:
+                    processes.discard(process)
+
+        if process.returncode != 0:
+            message = stderr.decode('utf-8', 'replace').strip().splitlines()
+            raise RasterizeError(f"Erro Ghostscript: {message[-1] if message else process.returncode}")
+
+        # O Ghostscript numera a partir de 1 dentro do bloco
+        return [
+            (page, pattern % (index + 1))
+            for index, page in enumerate(range(first, last + 1))
+            if os.path.exists(pattern % (index + 1))
+        ]
@@ -0,0 +1,187 @@
+import math
+import os
+import shutil
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from services.ffmpeg_runner import FFmpegError
+
+
+class SegmentedEncoder:
+    """
+    Codifica vídeos longos em paralelo: divide nos keyframes, codifica os
+    segmentos simultaneamente e junta tudo com o concat demuxer
+    """
+
+    def __init__(self, pipeline: FFmpegPipeline, min_duration: float = 120, min_segment_seconds: float = 30,
+                 max_segments: int = 16):
+        self.pipeline = pipeline
+        self.runner = pipeline.runner
+        self.min_duration = min_duration
+        self.min_segment_seconds = min_segment_seconds
+        self.max_segments = max_segments
+
+    def free_cores(self) -> int:
+        """Núcleos não reservados por outros jobs FFmpeg (ou descontando a carga, sem scheduler)"""
+        if self.runner.scheduler:
+            return self.runner.scheduler.free_cores()
+        try:
+            cores = len(os.sched_getaffinity(0))
+        except AttributeError:
+            cores = os.cpu_count() or 1
+        try:
+            load = os.getloadavg()[0]
+        except (AttributeError, OSError):
+            load = 0
+        return max(1, int(cores - load))
+
+    def plan(self, duration: Optional[float]) -> Tuple[int, float]:
+        """
+        Escolhe a quantidade de segmentos pela duração e pelos núcleos livres
+
+        Returns:
+            Tuple (segmentos, duração de cada segmento em segundos)
+        """
+        if not duration or duration < self.min_duration:
+            return 1, duration or 0
+
+        by_duration = int(duration // self.min_segment_seconds)
+        segments = max(1, min(self.free_cores(), by_duration, self.max_segments))
+        return segments, math.ceil(duration / segments)
+
+    def run(self, input_path: str, profile: Dict[str, Any], output_name: str, output_dir: str,
+            progress_callback=None, **overrides) -> Tuple[bool, str]:
+        """
+        Mesma interface do FFmpegPipeline.run; usa o caminho de processo único
+        quando o vídeo é curto, não há núcleos livres ou a entrada só tem áudio
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str)
+        """
+        input_path = str(input_path)
+        duration = self.runner.probe(input_path)['duration']
+        segments, segment_time = self.plan(duration)
+        videos = self.pipeline.probe.streams(self.pipeline.probe.probe(input_path), 'video') if segments > 1 else []
+
+        if not videos:
+            return self.pipeline.run(input_path, profile, output_name, output_dir, progress_callback, **overrides)
+
+        output_path = os.path.join(str(output_dir), self.pipeline._generate_unique_filename(output_name))
+        work_dir = tempfile.mkdtemp(prefix='segments_', dir=str(output_dir))
+
+        try:
+            resolved = self.pipeline.resolve_profile(input_path, profile, **overrides)
+            parts = self._split(input_path, videos[0], segment_time, work_dir)
+            threads = max(1, self.free_cores() // len(parts))
+
+            progress = SegmentProgress(duration, len(parts) + 1, progress_callback)
+
+            with ThreadPoolExecutor(max_workers=len(parts) + 1) as executor:
+                audio_future = executor.submit(self._encode_audio, input_path, resolved, work_dir, progress)
+                encoded = list(executor.map(
+                    lambda item: self._encode_segment(item[1], item[0], resolved, threads, work_dir, progress),
+                    enumerate(parts)
+                ))
+                audio_path = audio_future.result()
+
+            self._concat(encoded, audio_path, resolved, work_dir, output_path)
+            progress.finish()
+            return True, output_path
+
+        except FFmpegError as e:
+            self.pipeline._remove_partial(output_path)
+            return False, str(e)
+        except Exception as e:
+            self.pipeline._remove_partial(output_path)
+            return False, f"Erro inesperado: {str(e)}"
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _split(self, input_path: str, video: Dict[str, Any], segment_time: float, work_dir: str) -> List[str]:
+        """Divide só o vídeo em segmentos sem re-encode (cortes caem nos keyframes)"""
+        pattern = os.path.join(work_dir, 'source_%03d.mkv')
+        # Mapeia pelo índice sondado: 0:v:0 pode ser a capa (attached_pic) em vez do vídeo
+        self.runner.run([
+            self.runner.ffmpeg_path, '-i', input_path,
+            '-map', f"0:{video.get('index', 'v:0')}", '-c', 'copy',
+            '-f', 'segment', '-segment_time', str(segment_time), '-reset_timestamps', '1',
+            '-y', pattern
+        ])
+        return sorted(
+            os.path.join(work_dir, name) for name in os.listdir(work_dir) if name.startswith('source_')
+        )
+
+    def _encode_segment(self, segment_path: str, index: int, profile: Dict[str, Any], threads: int,
+                        work_dir: str, progress: 'SegmentProgress') -> str:
+        output_path = os.path.join(work_dir, f"encoded_{index:03d}.mkv")
+        segment_profile = dict(profile, audio_codec=None, faststart=False, threads=threads)
+        command = self.pipeline.build_command(segment_path, output_path, segment_profile)
+        self.runner.run(command, segment_path, progress.callback_for(index))
+        return output_path
+
+    def _encode_audio(self, input_path: str, profile: Dict[str, Any], work_dir: str,
+                      progress: 'SegmentProgress') -> Optional[str]:
+        """Codifica o áudio inteiro de uma vez para não gerar falhas nas emendas"""
+        if not self.pipeline.probe.streams(self.pipeline.probe.probe(input_path), 'audio'):
+            return None
+
+        output_path = os.path.join(work_dir, 'audio.mka')
+        audio_profile = dict(profile, video_codec=None, faststart=False, threads=1)
+        command = self.pipeline.build_command(input_path, output_path, audio_profile)
+        self.runner.run(command, input_path, progress.callback_for('audio'))
+        return output_path
+
+    def _concat(self, encoded: List[str], audio_path: Optional[str], profile: Dict[str, Any],
+                work_dir: str, output_path: str):
+        """Junta os segmentos com o concat demuxer e adiciona o áudio"""
+        list_path = os.path.join(work_dir, 'segments.txt')
+        with open(list_path, 'w', encoding='utf-8') as f:
+            for path in encoded:
+                escaped = path.replace("'", "'\\''")
+                f.write(f"file '{escaped}'\n")
+
+        command = [self.runner.ffmpeg_path, '-f', 'concat', '-safe', '0', '-i', list_path]
+        if audio_path:
+            command += ['-i', audio_path, '-map', '0:v', '-map', '1:a']
+        command += ['-c', 'copy']
+        if profile.get('faststart'):
+            command += ['-movflags', '+faststart']
+        command += ['-y', output_path]
+
+        self.runner.run(command)
+
+
+class SegmentProgress:
+    """Soma o progresso dos segmentos codificados em paralelo num único percentual"""
+
+    def __init__(self, duration: float, tasks: int, callback=None):
+        self.duration = duration
+        self.tasks = tasks
+        self.callback = callback
+        self.percents: Dict[Any, float] = {}
+        self.lock = threading.Lock()
+
+    def callback_for(self, key):
+        if not self.callback:
+            return None
+
+        def update(progress: Dict[str, Any]):
+            with self.lock:
+                self.percents[key] = progress.get('percent') or 0
+                # O concat final é rápido; reserva 1% para ele
+                percent = min(99.0, sum(self.percents.values()) / self.tasks)
+            self.callback({
+                'percent': round(percent, 1),
+                'eta': None,
+                'duration': self.duration,
+                'segments': self.tasks - 1,
+                'done': False
+            })
+
+        return update
+
+    def finish(self):
+        if self.callback:
+            self.callback({'percent': 100.0, 'eta': None, 'duration': self.duration, 'segments': self.tasks - 1, 'done': True})
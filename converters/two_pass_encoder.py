@@ -0,0 +1,150 @@
+import os
+import shutil
+import tempfile
+from typing import Any, Dict, Optional, Tuple
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from services.ffmpeg_runner import FFmpegError
+
+
+class TargetSizeError(ValueError):
+    """Tamanho alvo impossível para o vídeo (ou duração desconhecida)"""
+
+
+class TwoPassEncoder:
+    """
+    Compressão para um tamanho (ou bitrate) alvo em duas passadas
+
+    O bitrate sai da duração sondada: (alvo - overhead do container) / duração,
+    menos o áudio. A primeira passada só analisa o vídeo (o x264 usa um modo
+    rápido nela) e grava as estatísticas; a segunda distribui os bits por
+    elas e acerta o tamanho numa única codificação final, sem tentativas
+    com CRFs diferentes.
+    """
+
+    # Peso da primeira passada no progresso (ela é bem mais rápida que a segunda)
+    FIRST_PASS_WEIGHT = 0.3
+
+    def __init__(self, pipeline: FFmpegPipeline, min_video_kbps: int = 150, min_audio_kbps: int = 64,
+                 overhead: float = 0.02):
+        self.pipeline = pipeline
+        self.runner = pipeline.runner
+        self.probe = pipeline.probe
+        self.min_video_kbps = min_video_kbps
+        self.min_audio_kbps = min_audio_kbps
+        self.overhead = overhead
+
+    def plan(self, input_path: str, profile: Dict[str, Any], target_bytes: Optional[int] = None,
+             target_kbps: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Calcula os bitrates para o alvo (tamanho em bytes ou bitrate total em kbps)
+
+        Returns:
+            Dict com duration, video_kbps, audio_kbps, target_size e predicted_size (bytes)
+
+        Raises:
+            TargetSizeError: sem duração ou alvo abaixo do mínimo de qualidade
+        """
+        data = self.probe.probe(input_path)
+        duration = self.probe.duration(data)
+        if not duration:
+            raise TargetSizeError("Duração do vídeo desconhecida")
+
+        if target_kbps:
+            target_bytes = int(target_kbps * 1000 / 8 * duration)
+        if not target_bytes or target_bytes <= 0:
+            raise TargetSizeError("Informe o tamanho alvo")
+
+        total_kbps = target_bytes * (1 - self.overhead) * 8 / 1000 / duration
+
+        audio_kbps = 0
+        if self.probe.streams(data, 'audio'):
+            # Orçamento apertado: o áudio cede até o mínimo para sobrar bits ao vídeo
+            profile_audio = int(str(profile.get('audio_bitrate') or '128k').rstrip('k'))
+            audio_kbps = min(profile_audio, max(self.min_audio_kbps, int(total_kbps // 8)))
+
+        video_kbps = int(total_kbps - audio_kbps)
+        if video_kbps < self.min_video_kbps:
+            minimum = (self.min_video_kbps + audio_kbps) * 1000 / 8 * duration / (1 - self.overhead)
+            raise TargetSizeError(f"Alvo pequeno demais para {duration:.0f}s de vídeo "
+                                  f"(mínimo de {minimum / (1024 * 1024):.1f} MB)")
+
+        # Bitrate acima do da fonte não melhora nada, só gasta espaço
+        source_kbps = self._source_video_kbps(data, audio_kbps)
+        if source_kbps and video_kbps > source_kbps:
+            video_kbps = max(self.min_video_kbps, source_kbps)
+
+        return {
+            'duration': duration,
+            'video_kbps': video_kbps,
+            'audio_kbps': audio_kbps,
+            'target_size': target_bytes,
+            'predicted_size': int((video_kbps + audio_kbps) * 1000 / 8 * duration * (1 + self.overhead))
+        }
+
+    def _source_video_kbps(self, data: Optional[Dict[str, Any]], audio_kbps: int) -> Optional[int]:
+        videos = self.probe.streams(data, 'video')
+        try:
+            if videos and videos[0].get('bit_rate'):
+                return int(int(videos[0]['bit_rate']) / 1000)
+            return int(int(data['format']['bit_rate']) / 1000) - audio_kbps
+        except (KeyError, TypeError, ValueError):
+            return None
+
+    def run(self, input_path: str, profile: Dict[str, Any], plan: Dict[str, Any], output_name: str,
+            output_dir: str, progress_callback=None) -> Tuple[bool, str]:
+        """
+        Executa as duas passadas com os bitrates do plan
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str)
+        """
+        input_path = str(input_path)
+        output_path = os.path.join(str(output_dir), self.pipeline._generate_unique_filename(output_name))
+        work_dir = tempfile.mkdtemp(prefix='twopass_', dir=str(output_dir))
+        passlog = os.path.join(work_dir, 'passlog')
+
+        # CRF e parâmetros de CBR do perfil não se aplicam ao controle por bitrate médio
+        resolved = dict(profile, crf=None, video_params=None, video_bitrate=f"{plan['video_kbps']}k",
+                        audio_bitrate=f"{plan['audio_kbps']}k")
+
+        try:
+            first = self.pipeline.build_command(input_path, os.devnull, dict(resolved, audio_codec=None,
+                                                                            faststart=False))
+            first[-2:-2] = ['-pass', '1', '-passlogfile', passlog, '-f', 'null']
+            self.runner.run(first, input_path, self._progress(progress_callback, 0, self.FIRST_PASS_WEIGHT))
+
+            second = self.pipeline.build_command(input_path, output_path, resolved)
+            second[-2:-2] = ['-pass', '2', '-passlogfile', passlog]
+            self.runner.run(second, input_path,
+                            self._progress(progress_callback, self.FIRST_PASS_WEIGHT, 1 - self.FIRST_PASS_WEIGHT))
+
+            if not os.path.exists(output_path):
+                raise RuntimeError("Arquivo de saída não foi criado")
+
+            return True, output_path
+
+        except FFmpegError as e:
+            self.pipeline._remove_partial(output_path)
+            return False, str(e)
+        except Exception as e:
+            self.pipeline._remove_partial(output_path)
+            return False, f"Erro inesperado: {str(e)}"
+        finally:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    def _progress(self, callback, start: float, weight: float):
+        """Converte o progresso de uma passada em fração do total (o ETA só vale na segunda)"""
+        if not callback:
+            return None
+        last_pass = start > 0
+
+        def report(progress: Dict[str, Any]):
+            percent = progress.get('percent')
+            done = bool(progress.get('done')) and last_pass
+            if percent is not None and not done:
+                percent = round(min(99.9, start * 100 + percent * weight), 1)
+            update = dict(progress, percent=percent, eta=progress.get('eta') if last_pass else None, done=done)
+            update['pass'] = 2 if last_pass else 1
+            callback(update)
+
+        return report
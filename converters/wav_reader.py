@@ -0,0 +1,143 @@
+import mmap
+import struct
+from typing import Iterator, Optional
+
+# Códigos de formato do chunk fmt
+WAVE_FORMAT_PCM = 0x0001
+WAVE_FORMAT_IEEE_FLOAT = 0x0003
+WAVE_FORMAT_EXTENSIBLE = 0xFFFE
+
+# (formato, bits por amostra) -> formato de PCM bruto do FFmpeg (-f)
+FFMPEG_PCM_FORMATS = {
+    (WAVE_FORMAT_PCM, 8): 'u8',
+    (WAVE_FORMAT_PCM, 16): 's16le',
+    (WAVE_FORMAT_PCM, 24): 's24le',
+    (WAVE_FORMAT_PCM, 32): 's32le',
+    (WAVE_FORMAT_IEEE_FLOAT, 32): 'f32le',
+    (WAVE_FORMAT_IEEE_FLOAT, 64): 'f64le',
+}
+
+
+class WavFormatError(ValueError):
+    """WAV que o leitor não entende (RF64, ADPCM, cabeçalho corrompido...)"""
+
+
+class WavReader:
+    """
+    Lê o PCM de um WAV mapeando o arquivo em memória
+
+    Só o cabeçalho é interpretado; as amostras saem como fatias do mmap
+    (sem cópia), e o sistema operacional carrega as páginas sob demanda.
+    """
+
+    def __init__(self, path: str):
+        # Iteradores abertos sobre o mmap: precisam ser fechados antes dele
+        self.iterators = []
+        self.file = open(path, 'rb')
+        try:
+            self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self.file.close()
+            raise WavFormatError("Arquivo vazio")
+
+        try:
+            self._parse()
+        except Exception:
+            self.close()
+            raise
+
+    def _parse(self):
+        if len(self.map) < 12 or self.map[:4] != b'RIFF' or self.map[8:12] != b'WAVE':
+            raise WavFormatError("Não é um arquivo RIFF/WAVE")
+
+        fmt = None
+        self.data_offset: Optional[int] = None
+        position = 12
+        while position + 8 <= len(self.map):
+            chunk_id = self.map[position:position + 4]
+            chunk_size, = struct.unpack_from('<I', self.map, position + 4)
+            body = position + 8
+
+            if chunk_id == b'fmt ':
+                if chunk_size < 16:
+                    raise WavFormatError("Chunk fmt incompleto")
+                fmt = struct.unpack_from('<HHIIHH', self.map, body)
+                format_tag = fmt[0]
+                if format_tag == WAVE_FORMAT_EXTENSIBLE and chunk_size >= 40:
+                    # Subformato: os dois primeiros bytes do GUID repetem o código do formato
+                    format_tag, = struct.unpack_from('<H', self.map, body + 24)
+                self.format_tag = format_tag
+            elif chunk_id == b'data':
+                self.data_offset = body
+                # Gravadores em streaming deixam o tamanho em 0 ou 0xFFFFFFFF: vale até o fim do arquivo
+                available = len(self.map) - body
+                self.data_size = available if chunk_size in (0, 0xFFFFFFFF) else min(chunk_size, available)
+                break
+
+            position = body + chunk_size + (chunk_size & 1)  # Chunks são alinhados em 2 bytes
+
+        if fmt is None or self.data_offset is None:
+            raise WavFormatError("WAV sem chunk fmt ou data")
+
+        _, self.channels, self.sample_rate, _, self.block_align, self.bits_per_sample = fmt
+        if (self.format_tag, self.bits_per_sample) not in FFMPEG_PCM_FORMATS:
+            raise WavFormatError(f"Formato de áudio não suportado: {self.format_tag} / {self.bits_per_sample} bits")
+        if not self.channels or not self.sample_rate or self.block_align != self.channels * self.bits_per_sample // 8:
+            raise WavFormatError("Cabeçalho fmt inconsistente")
+
+        self.frames = self.data_size // self.block_align
+
+    @property
+    def duration(self) -> float:
+        return self.frames / self.sample_rate
+
+    @property
+    def ffmpeg_format(self) -> str:
+        return FFMPEG_PCM_FORMATS[(self.format_tag, self.bits_per_sample)]
+
+    @property
+    def is_integer_pcm(self) -> bool:
+        return self.format_tag == WAVE_FORMAT_PCM and self.bits_per_sample >= 16
+
+    def chunks(self, frames_per_chunk: int = 65536) -> Iterator[memoryview]:
+        """Fatias do PCM como está no arquivo; cada uma só vale até o próximo item"""
+        iterator = self._chunks(frames_per_chunk)
+        self.iterators.append(iterator)
+        return iterator
+
+    def _chunks(self, frames_per_chunk: int) -> Iterator[memoryview]:
+        step = frames_per_chunk * self.block_align
+        end = self.data_offset + self.frames * self.block_align
+        with memoryview(self.map) as view:
+            for start in range(self.data_offset, end, step):
+                with view[start:min(start + step, end)] as chunk:
+                    yield chunk
+
+    def pcm16_chunks(self, frames_per_chunk: int = 65536) -> Iterator[bytes]:
+        """PCM inteiro convertido para 16 bits (mantendo os bytes mais significativos)"""
+        if not self.is_integer_pcm:
+            raise WavFormatError("Conversão para 16 bits só para PCM inteiro")
+
+        width = self.bits_per_sample // 8
+        for chunk in self.chunks(frames_per_chunk):
+            if width == 2:
+                yield bytes(chunk)
+                continue
+            # Little-endian: os dois últimos bytes de cada amostra são os mais significativos
+            samples = len(chunk) // width
+            converted = bytearray(samples * 2)
+            converted[0::2] = chunk[width - 2::width]
+            converted[1::2] = chunk[width - 1::width]
+            yield bytes(converted)
+
+    def close(self):
+        for iterator in self.iterators:
+            iterator.close()
+        self.map.close()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,53 +1,159 @@
 import os
+import re
+import zipfile
+from typing import Callable, Dict, Any, List, Optional, Tuple
 from PyPDF2 import PdfReader, PdfWriter
-from werkzeug.utils import secure_filename
+
+# Item de intervalo: "7", "1-3", "10-" (até o fim) ou "-5" (do início)
+RANGE_ITEM = re.compile(r'^(\d*)\s*-\s*(\d*)$|^(\d+)$')
+
+
+class PageRangeError(ValueError):
+    """Especificação de páginas inválida para o documento"""
+
+
+def parse_page_ranges(spec: str, total_pages: int) -> List[Tuple[int, int]]:
+    """
+    Converte uma especificação como "1-3,7,10-" em partes
+
+    Cada item separado por vírgula vira uma parte.
+
+    Returns:
+        Lista de (primeira, última) páginas de cada parte, base 1 e inclusivas
+    """
+    parts = []
+    for item in (spec or '').split(','):
+        item = item.strip()
+        if not item:
+            continue
+
+        match = RANGE_ITEM.match(item)
+        if not match:
+            raise PageRangeError(f"Intervalo inválido: {item}")
+
+        if match.group(3):
+            first = last = int(match.group(3))
+        else:
+            first = int(match.group(1)) if match.group(1) else 1
+            last = int(match.group(2)) if match.group(2) else total_pages
+
+        if first < 1 or last > total_pages or first > last:
+            raise PageRangeError(f"Intervalo fora do documento ({total_pages} páginas): {item}")
+
+        parts.append((first, last))
+
+    if not parts:
+        raise PageRangeError("Nenhum intervalo de páginas informado")
+    return parts
+
+
+def every_n_pages(every: int, total_pages: int) -> List[Tuple[int, int]]:
+    """Partes de N páginas consecutivas (a última pode ser menor)"""
+    if every < 1:
+        raise PageRangeError("A quantidade de páginas por parte deve ser maior que zero")
+    return [(first, min(first + every - 1, total_pages)) for first in range(1, total_pages + 1, every)]
+
 
 class PDFtoSplitter:
+    """
+    Divide PDFs em várias partes gravando uma parte por vez
+
+    Cada parte tem o próprio PdfWriter, descartado logo após a gravação, e o
+    cache de objetos do leitor é limpo entre as partes: só os objetos da parte
+    atual ficam em memória, mesmo em documentos com milhares de páginas.
+    """
+
     def __init__(self, upload_folder='uploads', output_folder='outputs'):
         self.upload_folder = upload_folder
         self.output_folder = output_folder
-        
-        
+
+    def count_pages(self, filepath: str) -> int:
+        return len(PdfReader(filepath).pages)
+
+    def split(self, filepath: str, parts: List[Tuple[int, int]], output_path: str,
+              progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[bool, str]:
+        """
+        Grava as partes em output_path: um PDF se houver uma única parte, senão um ZIP
+
+        Args:
+            parts: Lista de (primeira, última) páginas, base 1 e inclusivas
+            progress_callback: Recebe dicts com percent e done a cada parte gravada
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str)
+        """
+        try:
+            reader = PdfReader(filepath)
+            name_part = os.path.splitext(os.path.basename(filepath))[0]
+            total = sum(last - first + 1 for first, last in parts)
+            written = 0
+
+            if len(parts) == 1:
+                self._write_part(reader, parts[0], output_path)
+                self._report(progress_callback, total, total)
+                return True, output_path
+
+            # PDFs já são comprimidos: o ZIP só armazena as partes
+            with zipfile.ZipFile(output_path, 'w', zipfile.ZIP_STORED, allowZip64=True) as archive:
+                for index, (first, last) in enumerate(parts, start=1):
+                    part_name = f"{name_part}_part{index}_p{first}-{last}.pdf"
+                    part_path = f"{output_path}.part{index}"
+                    try:
+                        self._write_part(reader, (first, last), part_path)
+                        archive.write(part_path, part_name)
+                    finally:
+                        if os.path.exists(part_path):
+                            os.remove(part_path)
+
+                    written += last - first + 1
+                    self._report(progress_callback, written, total)
+
+            return True, output_path
+
+        except Exception as e:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return False, str(e)
+
+    def _write_part(self, reader: PdfReader, part: Tuple[int, int], part_path: str):
+        first, last = part
+        writer = PdfWriter()
+        for index in range(first - 1, last):
+            writer.add_page(reader.pages[index])
+
+        with open(part_path, 'wb') as f:
+            writer.write(f)
+
+        # Libera os objetos desta parte antes de montar a próxima
+        del writer
+        reader.resolved_objects.clear()
+
+    def _report(self, progress_callback, written: int, total: int):
+        if progress_callback:
+            done = written >= total
+            progress_callback({
+                'percent': 100.0 if done else round(written / total * 100, 1),
+                'eta': None,
+                'done': done
+            })
+
     def splitter(self, filepath, split_page):
         """Divide o PDF na página especificada"""
         try:
-            # Lê o PDF original
-            reader = PdfReader(filepath)
-            total_pages = len(reader.pages)
-            
-            if split_page < 1 or split_page > total_pages:
+            total_pages = self.count_pages(filepath)
+
+            if split_page < 1 or split_page >= total_pages:
                 return None, None, "Página de divisão inválida"
-            
-            # Cria dois escritores para as duas partes
-            writer_part1 = PdfWriter()
-            writer_part2 = PdfWriter()
-            
-            # Divide o PDF
-            for i in range(total_pages):
-                if i < split_page:
-                    writer_part1.add_page(reader.pages[i])
-                else:
-                    writer_part2.add_page(reader.pages[i])
-            
-            # Gera nomes de arquivo para as partes
-            base_name = os.path.basename(filepath)
-            name_part, ext = os.path.splitext(base_name)
-            
-            part1_name = f"{name_part}_part1{ext}"
-            part2_name = f"{name_part}_part2{ext}"
-            
-            part1_path = os.path.join(self.output_folder, part1_name)
-            part2_path = os.path.join(self.output_folder, part2_name)
-            
-            # Salva os arquivos divididos
-            with open(part1_path, 'wb') as f:
-                writer_part1.write(f)
-            
-            with open(part2_path, 'wb') as f:
-                writer_part2.write(f)
-            
+
+            reader = PdfReader(filepath)
+            name_part, ext = os.path.splitext(os.path.basename(filepath))
+            part1_path = os.path.join(self.output_folder, f"{name_part}_part1{ext}")
+            part2_path = os.path.join(self.output_folder, f"{name_part}_part2{ext}")
+
+            self._write_part(reader, (1, split_page), part1_path)
+            self._write_part(reader, (split_page + 1, total_pages), part2_path)
+
             return part1_path, part2_path, None
-        
+
         except Exception as e:
             return None, None, str(e)
-    
\ No newline at end of file
@@ -1,39 +1,148 @@
 import os
-from flask import Flask, render_template, request, redirect, send_from_directory, jsonify
+import json
+from flask import Flask, Response, render_template, request, redirect, jsonify
+from werkzeug.exceptions import HTTPException
 from werkzeug.utils import secure_filename
-from models import  get_file_summary, handle_file_action
+from models import  get_file_summary, handle_file_action, rasterize_pdf, estimate_output_size, release_cache_space, \
+    is_streamable, convert_stream
+from converters.pdf_rasterizer import RasterizeError
 from config.config import Config
-import time
-import threading
+from services.job_queue import JobQueue
+from services.batch_manager import BatchManager
+from services.zip_stream import ZipStream
+from services.chunked_upload import ChunkedUploadManager, ChunkedUploadError
+from services.content_hash import upload_digests, UploadDigestStore
+from services.download_server import DownloadServer
+from services.retention import RetentionManager
+from services.disk_quota import DiskQuota, DiskQuotaError
 
 
 # Configurações
 app = Flask(__name__)
 
-# Inicializar configurações
-Config.create_folders()
+# Serviços do app, montados por create_app(). Nada é iniciado na importação: os
+# workers do pool de imagens de PDF (forkserver/spawn) reimportam este módulo como
+# __mp_main__ e não podem ter fila, índice de digests nem varredura de retenção próprios
+job_queue = None
+batches = None
+chunked_uploads = None
+retention = None
+disk_quota = None
+downloads = None
+
+# Pastas de saída, pelo subcaminho interno usado no offload
+DOWNLOAD_FOLDERS = {
+    'compressed': Config.DOWNLOAD_COMPRESS_FOLDER,
+    'converted': Config.DOWNLOAD_CONVERT_FOLDER
+}
+
+def create_app():
+    """Cria as pastas e inicia os serviços (uma vez por processo); devolve o app"""
+    global job_queue, batches, chunked_uploads, retention, disk_quota, downloads
+    if job_queue is not None:
+        return app
+
+    # Inicializar configurações
+    Config.create_folders()
+
+    # Fila de jobs para conversões e compressões
+    job_queue = JobQueue(
+        max_workers=Config.JOB_WORKERS,
+        max_pending=Config.JOB_QUEUE_LIMIT,
+        retention=Config.JOB_RETENTION_SECONDS,
+        max_batch_pending=Config.JOB_BATCH_QUEUE_LIMIT
+    )
+
+    # Lotes: vários arquivos com a mesma ação, processados pela mesma fila
+    batches = BatchManager(job_queue, retention=Config.JOB_RETENTION_SECONDS)
+
+    # Digests dos uploads já existentes, para deduplicação após reinício
+    upload_digests.load_index(Config.UPLOAD_FOLDER)
+
+    # Uploads em partes (retomáveis)
+    chunked_uploads = ChunkedUploadManager(
+        Config.UPLOAD_FOLDER,
+        Config.PARTIAL_UPLOAD_FOLDER,
+        max_size=Config.MAX_CONTENT_LENGTH,
+        digests=upload_digests,
+        buffer_size=Config.UPLOAD_BUFFER_SIZE
+    )
+
+    # Remoção de uploads e resultados vencidos, inclusive os deixados antes de um reinício
+    retention = RetentionManager(
+        sweep_interval=Config.RETENTION_SWEEP_INTERVAL,
+        scan_interval=Config.RETENTION_SCAN_INTERVAL,
+        batch_size=Config.RETENTION_BATCH_SIZE,
+        download_grace=Config.RETENTION_DOWNLOAD_GRACE
+    )
+    retention.add_folder(Config.UPLOAD_FOLDER, Config.RETENTION_UPLOAD_TTL,
+                         skip_suffixes=(UploadDigestStore.SUFFIX,), on_delete=upload_digests.discard)
+    retention.add_folder(Config.PARTIAL_UPLOAD_FOLDER, Config.RETENTION_PARTIAL_TTL,
+                         skip_suffixes=('.json',), on_delete=lambda path: chunked_uploads.abandon(path.stem))
+    retention.add_folder(Config.DOWNLOAD_CONVERT_FOLDER, Config.RETENTION_OUTPUT_TTL)
+    retention.add_folder(Config.DOWNLOAD_COMPRESS_FOLDER, Config.RETENTION_OUTPUT_TTL)
+    retention.add_folder(Config.HLS_FOLDER, Config.RETENTION_OUTPUT_TTL, directories=True)
+    retention.start()
+
+    # Cota de disco: uploads e jobs reservam espaço antes de começar. Sem espaço, remove
+    # primeiro o que já venceu, depois reduz o cache de resultados, e só então recusa
+    disk_quota = DiskQuota(
+        [Config.UPLOAD_FOLDER, Config.DOWNLOAD_CONVERT_FOLDER, Config.DOWNLOAD_COMPRESS_FOLDER, Config.HLS_FOLDER],
+        max_bytes=Config.DISK_QUOTA_BYTES,
+        min_free_bytes=Config.DISK_MIN_FREE_BYTES,
+        usage_ttl=Config.DISK_USAGE_CACHE_SECONDS,
+        retry_after=Config.DISK_RETRY_AFTER,
+        max_retry_after=Config.DISK_MAX_RETRY_AFTER,
+        next_expiry=retention.next_due
+    )
+    disk_quota.add_evictor(lambda nbytes: retention.sweep_all())
+    disk_quota.add_evictor(release_cache_space)
+
+    # Entrega dos downloads (Range, respostas condicionais e offload opcional para o proxy)
+    downloads = DownloadServer(Config.DOWNLOAD_OFFLOAD, Config.DOWNLOAD_ACCEL_PREFIX)
+
+    return app
+
+# Campos opcionais do formulário repassados às ações (ex.: intervalos de páginas na divisão de PDF)
+ACTION_OPTION_FIELDS = ('ranges', 'every', 'target_mb', 'target_kbps')
+
+# Campos com vários valores (ex.: lista ordenada de PDFs para juntar)
+ACTION_LIST_FIELDS = ('files',)
 
 
 def allowed_file(filename):
     return '.' in filename and \
            filename.rsplit('.', 1)[1].lower() in Config.ALLOWED_EXTENSIONS
 
-def agendar_remocao(filepath, delay=10):
-    def remover():
-        time.sleep(delay)
-        try:
-            os.remove(filepath)
-            app.logger.info(f"Arquivo {filepath} removido após {delay}s.")
-        except Exception as e:
-            app.logger.error(f"Erro ao remover {filepath}: {str(e)}")
-    threading.Thread(target=remover).start()
-
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def disk_quota_error(error):
+    """Converte um DiskQuotaError em resposta JSON com Retry-After"""
+    response = jsonify({
+        'status': 'error',
+        'message': 'Servidor sem espaço' if error.status_code == 503 else 'Servidor ocupado',
+        'details': error.message
+    })
+    response.status_code = error.status_code
+    response.headers['Retry-After'] = str(error.retry_after)
+    return response
+
 @app.route('/upload', methods=['POST'])
 def upload_file():
+    # Reserva pelo Content-Length antes de ler o corpo (o multipart é gravado em disco ao ser lido)
+    try:
+        reservation = disk_quota.reserve(request.content_length or 0)
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    try:
+        return save_upload()
+    finally:
+        disk_quota.release(reservation)
+
+def save_upload():
     if 'file' not in request.files:
         return redirect(request.url)
     
@@ -53,9 +162,8 @@ def upload_file():
                 'message': f'O arquivo excede o tamanho máximo permitido de 1GB.'
             }), 400
         
-        filename = secure_filename(file.filename)
-        filepath = Config.UPLOAD_FOLDER / filename
-        file.save(filepath)
+        filepath, duplicate = store_upload(file)
+        filename = filepath.name
         
         # Processa o arquivo e obtém o resumo
         summary = get_file_summary(filepath)
@@ -63,11 +171,249 @@ def upload_file():
         return jsonify({
             'status': 'success',
             'filename': filename,
+            'duplicate': duplicate,
             'summary': summary
         })
     
     return jsonify({'status': 'error', 'message': 'Tipo de arquivo não permitido'})
 
+def store_upload(file):
+    """Grava o upload e passa a controlar o vencimento; devolve (caminho, duplicado)"""
+    filepath = Config.UPLOAD_FOLDER / secure_filename(file.filename)
+
+    # Grava e calcula o hash na mesma passada; uploads idênticos viram hard link
+    digest = upload_digests.save_stream(file.stream, filepath)
+    duplicate = upload_digests.dedupe(filepath, digest)
+    track_upload(filepath, duplicate)
+    return filepath, duplicate
+
+def track_upload(filepath, duplicate):
+    """
+    Controla o vencimento de um upload recém-gravado
+
+    Um duplicado é hard link do upload anterior e herda o mtime dele; o prazo
+    conta a partir de agora, sem mexer no mtime (que estenderia o original)
+    """
+    retention.track(filepath, Config.RETENTION_UPLOAD_TTL if duplicate else None)
+
+def chunked_upload_error(error):
+    """Converte um ChunkedUploadError em resposta JSON"""
+    response = {
+        'status': 'error',
+        'message': error.message
+    }
+    if error.offset is not None:
+        response['offset'] = error.offset
+    return jsonify(response), error.status_code
+
+@app.route('/uploads', methods=['POST'])
+def init_chunked_upload():
+    data = request.get_json(silent=True) or request.form
+    filename = data.get('filename', '')
+
+    if not allowed_file(filename):
+        return jsonify({'status': 'error', 'message': 'Tipo de arquivo não permitido'}), 400
+
+    try:
+        size = int(data.get('size', -1))
+        # O arquivo cresce a cada parte; aqui só confere que o tamanho declarado cabe agora
+        disk_quota.check(size)
+        upload = chunked_uploads.init(filename, size)
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Tamanho de arquivo inválido'}), 400
+    except ChunkedUploadError as e:
+        return chunked_upload_error(e)
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    retention.track(Config.PARTIAL_UPLOAD_FOLDER / f"{upload['upload_id']}.part")
+    upload['status'] = 'success'
+    upload['chunk_url'] = f"/uploads/{upload['upload_id']}"
+    return jsonify(upload), 201
+
+@app.route('/uploads/<upload_id>', methods=['GET'])
+def chunked_upload_status(upload_id):
+    try:
+        upload = chunked_uploads.status(upload_id)
+    except ChunkedUploadError as e:
+        return chunked_upload_error(e)
+
+    upload['status'] = 'success'
+    return jsonify(upload)
+
+@app.route('/uploads/<upload_id>', methods=['PUT'])
+def upload_chunk(upload_id):
+    try:
+        offset = int(request.args.get('offset', request.headers.get('Upload-Offset', 0)))
+    except ValueError:
+        return jsonify({'status': 'error', 'message': 'Offset inválido'}), 400
+
+    try:
+        reservation = disk_quota.reserve(request.content_length or 0)
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    try:
+        upload = chunked_uploads.write_chunk(upload_id, offset, request.content_length, request.stream)
+    except ChunkedUploadError as e:
+        return chunked_upload_error(e)
+    finally:
+        disk_quota.release(reservation)
+
+    upload['status'] = 'success'
+    return jsonify(upload)
+
+@app.route('/uploads/<upload_id>/finalize', methods=['POST'])
+def finalize_chunked_upload(upload_id):
+    try:
+        upload = chunked_uploads.finalize(upload_id)
+    except ChunkedUploadError as e:
+        return chunked_upload_error(e)
+
+    track_upload(upload['filepath'], upload['duplicate'])
+
+    # Processa o arquivo e obtém o resumo
+    summary = get_file_summary(upload['filepath'])
+
+    return jsonify({
+        'status': 'success',
+        'filename': upload['filepath'].name,
+        'duplicate': upload['duplicate'],
+        'summary': summary
+    })
+
+@app.route('/stream/convert/<filename>', methods=['PUT', 'POST'])
+def stream_convert(filename):
+    """
+    Conversão com o corpo da requisição (arquivo bruto) indo direto para o stdin
+    do FFmpeg: a transcodificação acompanha o envio e a entrada não é gravada.
+    Opcional e só para containers lidos sequencialmente (TS, MPEG-PS, WebM, MKV, WAV)
+    """
+    filename = secure_filename(filename)
+    if not allowed_file(filename) or not is_streamable(filename):
+        return jsonify({'status': 'error', 'message': 'Tipo de arquivo não suportado por streaming'}), 400
+
+    size = request.content_length
+    if size is None:
+        return jsonify({'status': 'error', 'message': 'Content-Length obrigatório'}), 411
+    if size > Config.MAX_CONTENT_LENGTH:
+        limit_gb = Config.MAX_CONTENT_LENGTH / (1024 * 1024 * 1024)
+        return jsonify({
+            'status': 'warning',
+            'message': f'O arquivo excede o tamanho máximo permitido de {limit_gb:g}GB.'
+        }), 413
+
+    try:
+        reservation = disk_quota.reserve(estimate_output_size(filename, 'convert', input_size=size))
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    try:
+        result = convert_stream(request.stream, filename, Config.DOWNLOAD_CONVERT_FOLDER, size)
+    finally:
+        disk_quota.release(reservation)
+
+    app.logger.info(f"Conversão por streaming de {filename}. Resultado: {result}")
+
+    if result['status'] != 'success':
+        return jsonify({
+            'status': 'error',
+            'message': result['message'],
+            'details': result.get('details', '')
+        }), 422
+
+    retention.track(Config.DOWNLOAD_CONVERT_FOLDER / os.path.basename(result['download_url']))
+    return jsonify({
+        'status': 'success',
+        'message': result['message'],
+        'download_url': result['download_url'],
+        'cached': False
+    })
+
+def action_sources(filepath, action, options=None):
+    """Uploads lidos pela ação: o arquivo principal e, na junção, os demais PDFs de options['files']"""
+    sources = [filepath]
+    if action.split('_')[0] == 'merge':
+        for name in (options or {}).get('files') or []:
+            path = Config.UPLOAD_FOLDER / secure_filename(name)
+            if path not in sources:
+                sources.append(path)
+    return sources
+
+def run_action(filepath, filename, action, options=None, progress_callback=None, reservation=None, sources=None):
+    """Executa a ação no worker da fila e normaliza o resultado"""
+    download_folder = Config.DOWNLOAD_COMPRESS_FOLDER if "compress" in action else Config.DOWNLOAD_CONVERT_FOLDER
+    try:
+        result = handle_file_action(filepath, action, download_folder, progress_callback, options)
+    finally:
+        # Os uploads e o espaço da saída ficaram reservados desde o enfileiramento
+        for path in sources or [filepath]:
+            retention.release(path)
+        disk_quota.release(reservation)
+
+    if result['status'] == 'success' and result.get('download_url'):
+        retention.track(download_folder / os.path.basename(result['download_url']))
+    if result['status'] == 'success' and result.get('manifest_url'):
+        # O streaming inteiro vale pelo prazo de saída a partir do fim da codificação
+        retention.track(hls_stream_folder(result['manifest_url']), Config.RETENTION_OUTPUT_TTL)
+
+    # Log para depuração
+    app.logger.info(f"Ação '{action}' executada em {filename}. Resultado: {result}")
+
+    if result['status'] == 'success':
+        response_data = {
+            'status': 'success',
+            'message': result['message'],
+            'download_url': result.get('download_url'),
+            'cached': result.get('cached', False)
+        }
+        if 'compression_info' in result:
+            response_data['compression_info'] = result['compression_info']
+        if 'merge_info' in result:
+            response_data['merge_info'] = result['merge_info']
+        if 'audio_info' in result:
+            response_data['audio_info'] = result['audio_info']
+        if 'manifest_url' in result:
+            response_data['manifest_url'] = result['manifest_url']
+            response_data['hls_info'] = result['hls_info']
+        return response_data
+
+    return {
+        'status': 'error',
+        'message': result['message'],
+        'details': result.get('details', '')
+    }
+
+def action_options(form):
+    """Parâmetros extras da ação a partir do formulário"""
+    options = {field: form[field] for field in ACTION_OPTION_FIELDS if form.get(field)}
+    options.update({field: form.getlist(field) for field in ACTION_LIST_FIELDS if form.getlist(field)})
+    return options
+
+def find_download(filename):
+    """(subcaminho interno, caminho) do resultado ou None se não existir"""
+    filename = secure_filename(filename)
+
+    # Nomes de saída são únicos (timestamp + UUID): basta achar a pasta que contém o arquivo
+    for location, folder in DOWNLOAD_FOLDERS.items():
+        filepath = folder / filename
+        if filename and os.path.isfile(filepath):
+            return location, filepath
+    return None
+
+def hls_stream_folder(manifest_url):
+    """Pasta do streaming a partir da URL da playlist (/hls/<stream_id>/master.m3u8)"""
+    return Config.HLS_FOLDER / secure_filename(manifest_url.rstrip('/').split('/')[-2])
+
+def job_payload(job):
+    """Monta a resposta pública de um job"""
+    return {
+        'job_id': job['job_id'],
+        'state': job['state'],
+        'progress': job['progress'],
+        'result': job['result']
+    }
+
 @app.route('/process', methods=['POST'])
 def process_action():
     try:
@@ -90,29 +436,39 @@ def process_action():
                 'details': f'O arquivo {filename} não existe na pasta de uploads'
             })
         
-        # Processa a ação selecionada
-        if "compress" in action:
-            result = handle_file_action(filepath, action, Config.DOWNLOAD_COMPRESS_FOLDER)
-        else:
-            result = handle_file_action(filepath, action, Config.DOWNLOAD_CONVERT_FOLDER)
-        
-        # Log para depuração
-        app.logger.info(f"Ação '{action}' executada em {filename}. Resultado: {result}")
-        
-        if result['status'] == 'success':
-            response_data = {
-                'status': 'success',
-                'message': result['message'],
-                'download_url': result.get('download_url')
-            }
-             
-            return jsonify(response_data)
-        else:
+        options = action_options(request.form)
+
+        # Só enfileira se houver espaço para a saída estimada (e os intermediários)
+        try:
+            reservation = disk_quota.reserve(estimate_output_size(filepath, action, options))
+        except DiskQuotaError as e:
+            return disk_quota_error(e)
+
+        # Enfileira a ação selecionada para não bloquear o worker HTTP; os uploads
+        # lidos pela ação não vencem enquanto o job estiver pendente
+        sources = action_sources(filepath, action, options)
+        for path in sources:
+            retention.acquire(path)
+        job_id = job_queue.submit(run_action, filepath, filename, action, options, reservation=reservation,
+                                  sources=sources)
+
+        if job_id is None:
+            for path in sources:
+                retention.release(path)
+            disk_quota.release(reservation)
             return jsonify({
                 'status': 'error',
-                'message': result['message'],
-                'details': result.get('details', '')
-            })
+                'message': 'Servidor ocupado',
+                'details': 'Muitos arquivos em processamento, tente novamente em instantes'
+            }), 503
+
+        return jsonify({
+            'status': 'queued',
+            'message': 'Arquivo na fila de processamento',
+            'job_id': job_id,
+            'status_url': f"/jobs/{job_id}",
+            'events_url': f"/jobs/{job_id}/events"
+        }), 202
             
     except Exception as e:
         app.logger.error(f"Erro no processamento: {str(e)}")
@@ -123,58 +479,335 @@ def process_action():
             'error_type': type(e).__name__
         })
 
+def batch_item_error(message, details=''):
+    return {'status': 'error', 'message': message, 'details': details}
+
+@app.route('/batches', methods=['POST'])
+def create_batch():
+    """
+    Recebe vários arquivos (campo 'file' repetido) e/ou nomes já enviados
+    (campo 'filename' repetido) e enfileira a mesma ação para cada um
+    """
+    action = request.form.get('action')
+    if not action:
+        return jsonify({'status': 'error', 'message': 'Ação não fornecida'}), 400
+    if action.split('_')[0] == 'merge':
+        # A junção já recebe vários arquivos e gera um único resultado
+        return jsonify({'status': 'error', 'message': 'Use /process para juntar PDFs'}), 400
+
+    try:
+        reservation = disk_quota.reserve(request.content_length or 0)
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    items = []
+    try:
+        uploads = [file for file in request.files.getlist('file') if file.filename]
+        names = request.form.getlist('filename')
+
+        if not uploads and not names:
+            return jsonify({'status': 'error', 'message': 'Nenhum arquivo enviado'}), 400
+        if len(uploads) + len(names) > Config.BATCH_MAX_ITEMS:
+            return jsonify({
+                'status': 'error',
+                'message': f'O lote aceita no máximo {Config.BATCH_MAX_ITEMS} arquivos'
+            }), 400
+
+        # Sem resumo por arquivo: só grava, o status de cada item vem do lote
+        for file in uploads:
+            item = {'name': file.filename, 'filepath': None, 'job_id': None, 'result': None}
+            if allowed_file(file.filename):
+                item['filepath'] = store_upload(file)[0]
+            else:
+                item['result'] = batch_item_error('Tipo de arquivo não permitido')
+            items.append(item)
+
+        for name in names:
+            item = {'name': name, 'filepath': None, 'job_id': None, 'result': None}
+            filepath = Config.UPLOAD_FOLDER / secure_filename(name)
+            if secure_filename(name) and os.path.isfile(filepath):
+                item['filepath'] = filepath
+            else:
+                item['result'] = batch_item_error('Arquivo não encontrado')
+            items.append(item)
+    finally:
+        disk_quota.release(reservation)
+
+    options = action_options(request.form)
+    calls = []
+    queued = []
+    seen = set()
+    for item in items:
+        filepath = item['filepath']
+        if filepath is None:
+            continue
+        if filepath in seen:
+            # O primeiro job remove o original ao terminar
+            item['result'] = batch_item_error('Arquivo repetido no lote')
+            continue
+        seen.add(filepath)
+
+        try:
+            item_reservation = disk_quota.reserve(estimate_output_size(filepath, action, options))
+        except DiskQuotaError as e:
+            item['result'] = dict(batch_item_error('Sem espaço para processar', e.message), retry_after=e.retry_after)
+            continue
+
+        retention.acquire(filepath)
+        calls.append(((filepath, filepath.name, action, options), {'reservation': item_reservation}))
+        queued.append(item)
+
+    job_ids = job_queue.submit_many(run_action, calls) if calls else []
+    if job_ids is None:
+        for (args, kwargs) in calls:
+            retention.release(args[0])
+            disk_quota.release(kwargs['reservation'])
+        response = jsonify({
+            'status': 'error',
+            'message': 'Servidor ocupado',
+            'details': 'Muitos itens de lote em processamento, tente novamente em instantes'
+        })
+        response.status_code = 503
+        response.headers['Retry-After'] = str(Config.DISK_RETRY_AFTER)
+        return response
+
+    for item, job_id in zip(queued, job_ids):
+        item['job_id'] = job_id
+
+    batch_id = batches.create(action, [
+        {'name': item['name'], 'job_id': item['job_id'], 'result': item['result']} for item in items
+    ])
+
+    return jsonify({
+        'status': 'queued',
+        'message': f'{len(job_ids)} de {len(items)} arquivos na fila de processamento',
+        'batch_id': batch_id,
+        'status_url': f"/batches/{batch_id}",
+        'download_url': f"/batches/{batch_id}/download",
+        'items': batches.get(batch_id)['items']
+    }), 202
+
+@app.route('/batches/<batch_id>')
+def batch_status(batch_id):
+    batch = batches.get(batch_id)
+    if batch is None:
+        return jsonify({'status': 'error', 'message': 'Lote não encontrado'}), 404
+    return jsonify(batch)
+
+def batch_arcname(name, filepath, used):
+    """Nome no ZIP: nome enviado com a extensão do resultado, sem repetir"""
+    base = os.path.splitext(secure_filename(name))[0] or 'arquivo'
+    extension = os.path.splitext(filepath)[1]
+    arcname = f"{base}{extension}"
+    counter = 1
+    while arcname in used:
+        counter += 1
+        arcname = f"{base}_{counter}{extension}"
+    used.add(arcname)
+    return arcname
+
+@app.route('/batches/<batch_id>/download')
+def download_batch(batch_id):
+    """Envia o ZIP dos resultados à medida que os itens terminam, com status.json ao final"""
+    if batches.get(batch_id) is None:
+        return jsonify({'status': 'error', 'message': 'Lote não encontrado'}), 404
+
+    def stream():
+        archive = ZipStream()
+        used = set()
+        report = []
+
+        for index, item, result in batches.iter_finished(batch_id):
+            entry = {
+                'index': index,
+                'name': item['name'],
+                'status': result.get('status'),
+                'message': result.get('message')
+            }
+            found = find_download(os.path.basename(result.get('download_url') or '')) \
+                if result.get('status') == 'success' else None
+
+            if found is not None:
+                filepath = found[1]
+                # Não vence enquanto está sendo copiado para o ZIP
+                retention.acquire(filepath)
+                try:
+                    if os.path.isfile(filepath):
+                        entry['file'] = batch_arcname(item['name'], filepath, used)
+                        yield from archive.add_file(str(filepath), entry['file'])
+                    else:
+                        entry.update(status='error', message='Resultado expirado')
+                finally:
+                    retention.release(filepath)
+            elif result.get('manifest_url'):
+                entry['manifest_url'] = result['manifest_url']  # Streaming: servido por /hls/, fora do ZIP
+            elif result.get('status') == 'success':
+                entry.update(status='error', message='Resultado expirado')
+            elif result.get('details'):
+                entry['details'] = result['details']
+
+            report.append(entry)
+
+        report.sort(key=lambda entry: entry['index'])
+        yield archive.add_bytes(json.dumps(report, ensure_ascii=False, indent=2).encode('utf-8'), 'status.json')
+        yield archive.close()
+
+    return Response(stream(), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="lote_{batch_id[:8]}.zip"',
+        'X-Accel-Buffering': 'no'
+    })
+
+@app.route('/rasterize/<filename>')
+def rasterize(filename):
+    """Converte o PDF em imagens, enviando o ZIP enquanto as páginas são renderizadas"""
+    filepath = Config.UPLOAD_FOLDER / secure_filename(filename)
+
+    if not os.path.exists(filepath):
+        return jsonify({'status': 'error', 'message': 'Arquivo não encontrado'}), 404
+
+    try:
+        zip_name, stream, work_size = rasterize_pdf(
+            filepath,
+            request.args.get('format', 'jpg').lower(),
+            int(request.args.get('dpi', Config.RASTER_DEFAULT_DPI)),
+            request.args.get('pages', '')
+        )
+    except ValueError as e:
+        return jsonify({'status': 'error', 'message': 'Parâmetros inválidos', 'details': str(e)}), 400
+    except RasterizeError as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 503
+
+    # As imagens passam pela pasta de resultados antes de entrar no ZIP
+    try:
+        reservation = disk_quota.reserve(work_size)
+    except DiskQuotaError as e:
+        return disk_quota_error(e)
+
+    # O PDF não vence enquanto as páginas são renderizadas
+    retention.acquire(filepath)
+
+    def release():
+        stream.close()  # Encerra o Ghostscript se o envio parou antes do fim
+        retention.release(filepath)
+        disk_quota.release(reservation)
+
+    # Renderiza até a primeira página antes de enviar os cabeçalhos: uma falha
+    # logo no início ainda pode ser respondida com erro em vez de um ZIP vazio
+    try:
+        first = next(stream)
+    except RasterizeError as e:
+        release()
+        return jsonify({'status': 'error', 'message': 'Falha ao converter o PDF em imagens', 'details': str(e)}), 500
+
+    def body():
+        yield first
+        yield from stream
+
+    response = Response(body(), mimetype='application/zip', headers={
+        'Content-Disposition': f'attachment; filename="{zip_name}"'
+    })
+    # Chamado ao fim do envio ou na desconexão, mesmo que o ZIP nem tenha começado
+    response.call_on_close(release)
+    return response
+
+@app.route('/jobs/<job_id>')
+def job_status(job_id):
+    job = job_queue.get(job_id)
+
+    if job is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job não encontrado'
+        }), 404
+
+    return jsonify(job_payload(job))
+
+@app.route('/jobs/<job_id>/events')
+def job_events(job_id):
+    if job_queue.get(job_id) is None:
+        return jsonify({
+            'status': 'error',
+            'message': 'Job não encontrado'
+        }), 404
+
+    def stream():
+        version = -1
+        while True:
+            job = job_queue.wait_for_update(job_id, version)
+            if job is None:
+                break
+
+            if job['version'] == version:
+                # Mantém a conexão viva através do proxy
+                yield ": keep-alive\n\n"
+                continue
+
+            version = job['version']
+            yield f"data: {json.dumps(job_payload(job))}\n\n"
+
+            if job['state'] == 'done':
+                break
+
+    return Response(
+        stream(),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
 @app.route('/downloads/<filename>')
 def download_file(filename):
     try:
-        filepath = ""
-        
-        if "compressed" in filename:
-            # Verifica se o arquivo existe
-            filepath = Config.DOWNLOAD_COMPRESS_FOLDER / filename
-
-            if not os.path.exists(filepath):
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Arquivo não encontrado'
-                }), 404
-
-            # Agendar remoção após envio
-            agendar_remocao(filepath)
-                        
-            return send_from_directory(
-                
-                Config.DOWNLOAD_COMPRESS_FOLDER,
-                filename,
-                as_attachment=True,
-                mimetype='video/mp4'
-            )
-        
-        else:
-            # Verifica se o arquivo existe
-            
-            filepath = Config.DOWNLOAD_CONVERT_FOLDER / filename
-            
-            if not os.path.exists(filepath):
-                return jsonify({
-                    'status': 'error',
-                    'message': 'Arquivo não encontrado'
-                }), 404
-            
-            # Agendar remoção após envio
-            agendar_remocao(filepath)
-                        
-            return send_from_directory(
-                Config.DOWNLOAD_CONVERT_FOLDER,
-                filename,
-                as_attachment=True,
-                mimetype='video/mp4'
-            )
+        found = find_download(filename)
+        if found is None:
+            return jsonify({
+                'status': 'error',
+                'message': 'Arquivo não encontrado'
+            }), 404
+        location, filepath = found
+
+        # Cada requisição (inclusive as de Range, nas retomadas) estende o prazo pelo tempo
+        # estimado de envio mais a carência. Um envio em andamento não é interrompido pela
+        # remoção: o descritor aberto (aqui ou no proxy) mantém o conteúdo acessível
+        transfer_time = os.path.getsize(filepath) / Config.RETENTION_MIN_DOWNLOAD_RATE
+        retention.touch(filepath, Config.RETENTION_DOWNLOAD_GRACE + transfer_time)
+
+        return downloads.send(filepath, location)
 
+    except HTTPException:
+        raise  # 416 para Range fora do arquivo
     except Exception as e:
         return jsonify({
             'status': 'error',
             'message': str(e)
         }), 500
 
+@app.route('/hls/<stream_id>/<filename>')
+def hls_file(stream_id, filename):
+    """
+    Playlists e segmentos de um streaming HLS, entregues inline ao player
+
+    Funciona já durante a codificação: as playlists são do tipo EVENT e
+    crescem a cada segmento, por isso não são guardadas em cache pelo cliente.
+    """
+    stream_id = secure_filename(stream_id)
+    filename = secure_filename(filename)
+    filepath = Config.HLS_FOLDER / stream_id / filename
+    if not stream_id or not filename or not os.path.isfile(filepath):
+        return jsonify({
+            'status': 'error',
+            'message': 'Arquivo não encontrado'
+        }), 404
+
+    # Qualquer requisição do player estende o prazo do streaming inteiro
+    retention.touch(Config.HLS_FOLDER / stream_id)
+
+    response = downloads.send(filepath, f"hls/{stream_id}", as_attachment=False)
+    if filename.endswith('.m3u8'):
+        response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+# Servidores WSGI: gunicorn 'main:create_app()'
 if __name__ == '__main__':
-    app.run(host='0.0.0.0', port=5000, debug=True)
\ No newline at end of file
+    # Sem o reloader: ele reexecuta o módulo num processo filho e o pai ficaria com
+    # uma segunda varredura de retenção que não enxerga os arquivos em uso
+    create_app().run(host='0.0.0.0', port=5000, debug=True, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,238 @@
+import hashlib
+import io
+import os
+from typing import Any, BinaryIO, Callable, Dict, List, Optional, Tuple
+from PyPDF2 import PdfReader
+from PyPDF2.generic import (
+    ArrayObject, DecodedStreamObject, DictionaryObject, EncodedStreamObject, IndirectObject,
+    NameObject, NullObject, NumberObject, StreamObject
+)
+
+# Chaves da página que não são copiadas: a árvore de páginas e a estrutura lógica são do documento de origem
+EXCLUDED_PAGE_KEYS = ('/Parent', '/StructParents', '/B')
+
+# Números reservados para o catálogo e a raiz da árvore de páginas do resultado
+CATALOG_NUMBER = 1
+PAGES_NUMBER = 2
+
+
+class PDFtoMerger:
+    """
+    Junta vários PDFs gravando o resultado objeto a objeto
+
+    Só um documento de origem fica aberto por vez. Cada objeto é renumerado e
+    gravado no arquivo de saída assim que é alcançado a partir das páginas, sem
+    montar o documento inteiro em memória como o PdfWriter faz. Streams
+    idênticos (fontes, imagens, perfis ICC) são gravados uma única vez, mesmo
+    vindo de documentos diferentes.
+    """
+
+    def __init__(self, upload_folder='uploads', output_folder='outputs'):
+        self.upload_folder = upload_folder
+        self.output_folder = output_folder
+
+    def merge(self, filepaths: List[str], output_path: str,
+              progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None) -> Tuple[bool, str, Dict[str, Any]]:
+        """
+        Junta os PDFs na ordem informada
+
+        Returns:
+            Tuple (success: bool, output_path: str | error_message: str, info: dict com páginas e deduplicação)
+        """
+        try:
+            with open(output_path, 'wb') as f:
+                writer = _StreamingPDFWriter(f)
+                for index, filepath in enumerate(filepaths):
+                    writer.append(filepath, lambda page, pages: self._report(
+                        progress_callback, index + page / pages, len(filepaths)))
+                writer.close()
+            return True, output_path, writer.info
+        except Exception as e:
+            if os.path.exists(output_path):
+                os.remove(output_path)
+            return False, str(e), {}
+
+    def _report(self, progress_callback, done: float, total: int):
+        if progress_callback:
+            finished = done >= total
+            progress_callback({
+                'percent': 100.0 if finished else round(done / total * 100, 1),
+                'eta': None,
+                'done': finished
+            })
+
+
+class _StreamingPDFWriter:
+    """Escritor incremental: objetos vão para o disco na ordem em que são resolvidos"""
+
+    def __init__(self, stream: BinaryIO):
+        self.stream = stream
+        self.offsets: Dict[int, int] = {}
+        self.next_number = PAGES_NUMBER + 1
+        # Números reservados para streams que acabaram deduplicados, reaproveitados antes de novos
+        self.free_numbers: List[int] = []
+        self.kids: List[int] = []
+        # Digest do stream -> número já gravado (vale entre documentos)
+        self.stream_digests: Dict[bytes, int] = {}
+        self.info = {'files': 0, 'pages': 0, 'deduplicated_streams': 0, 'deduplicated_bytes': 0}
+
+        # Cabeçalho com bytes binários para os leitores tratarem o arquivo como binário
+        self.stream.write(b'%PDF-1.7\n%\xe2\xe3\xcf\xd3\n')
+
+    def append(self, filepath: str, on_page: Callable[[int, int], None]):
+        """Copia todas as páginas de um documento e descarta o leitor em seguida"""
+        reader = PdfReader(filepath)
+        if reader.is_encrypted and not reader.decrypt(''):
+            raise ValueError(f"PDF protegido por senha: {os.path.basename(filepath)}")
+
+        # Referências do documento de origem -> números no resultado (válido só para este documento)
+        self.source_numbers: Dict[Tuple[int, int], int] = {}
+        self.pending: List[Tuple[Any, int]] = []
+        # Streams em cópia e os que foram referenciados por um ciclo durante a cópia
+        self.resolving = set()
+        self.escaped = set()
+
+        # Páginas ganham número antes de tudo: anotações e destinos que apontam
+        # para outras páginas resolvem para a página copiada, não para uma duplicata
+        pages = reader.pages
+        page_numbers = []
+        for page in pages:
+            number = self._allocate()
+            reference = page.indirect_reference
+            if reference is not None:
+                self.source_numbers[(reference.idnum, reference.generation)] = number
+            page_numbers.append(number)
+
+        for index, (page, number) in enumerate(zip(pages, page_numbers), start=1):
+            copy = DictionaryObject()
+            for key, value in page.items():
+                if key not in EXCLUDED_PAGE_KEYS:
+                    copy[NameObject(key)] = self._copy(value)
+            copy[NameObject('/Parent')] = IndirectObject(PAGES_NUMBER, 0, None)
+            self._write_object(number, copy)
+            self._drain_pending()
+            self.kids.append(number)
+
+            # Os objetos já gravados não são mais necessários no cache do leitor
+            reader.resolved_objects.clear()
+            on_page(index, len(pages))
+
+        self.info['files'] += 1
+        self.info['pages'] += len(pages)
+        self.source_numbers = {}
+
+    def close(self):
+        """Grava catálogo, árvore de páginas, tabela xref e trailer"""
+        pages = DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(IndirectObject(kid, 0, None) for kid in self.kids),
+            NameObject('/Count'): NumberObject(len(self.kids))
+        })
+        self._write_object(PAGES_NUMBER, pages)
+
+        catalog = DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(PAGES_NUMBER, 0, None)
+        })
+        self._write_object(CATALOG_NUMBER, catalog)
+
+        size = self.next_number
+        xref_offset = self.stream.tell()
+        self.stream.write(f"xref\n0 {size}\n".encode())
+        self.stream.write(b"0000000000 65535 f \n")
+        for number in range(1, size):
+            offset = self.offsets.get(number)
+            if offset is None:
+                self.stream.write(b"0000000000 65535 f \n")
+            else:
+                self.stream.write(f"{offset:010d} 00000 n \n".encode())
+
+        self.stream.write(
+            f"trailer\n<< /Size {size} /Root {CATALOG_NUMBER} 0 R >>\nstartxref\n{xref_offset}\n%%EOF\n".encode()
+        )
+
+    def _allocate(self) -> int:
+        if self.free_numbers:
+            return self.free_numbers.pop()
+        number = self.next_number
+        self.next_number += 1
+        return number
+
+    def _write_object(self, number: int, obj):
+        self.offsets[number] = self.stream.tell()
+        self.stream.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(self.stream, None)
+        self.stream.write(b"\nendobj\n")
+
+    def _resolve(self, reference: IndirectObject) -> int:
+        """Número do objeto referenciado no resultado, gravando streams e enfileirando os demais"""
+        key = (reference.idnum, reference.generation)
+        number = self.source_numbers.get(key)
+        if number is not None:
+            if key in self.resolving:
+                self.escaped.add(key)
+            return number
+
+        obj = reference.get_object()
+        if not isinstance(obj, StreamObject):
+            # Dicionários e arrays podem ter ciclos: reservam o número e são gravados depois
+            number = self._allocate()
+            self.source_numbers[key] = number
+            self.pending.append((obj, number))
+            return number
+
+        # Reserva o número antes de descer nos filhos para que um ciclo não vire recursão infinita
+        number = self._allocate()
+        self.source_numbers[key] = number
+        self.resolving.add(key)
+        copy = self._copy_stream(obj)
+        self.resolving.discard(key)
+
+        digest = self._stream_digest(copy)
+        existing = self.stream_digests.get(digest)
+        if existing is not None and key not in self.escaped:
+            # Stream idêntico já gravado: o número reservado volta para reaproveitamento
+            self.free_numbers.append(number)
+            self.source_numbers[key] = existing
+            self.info['deduplicated_streams'] += 1
+            self.info['deduplicated_bytes'] += len(copy._data)
+            return existing
+
+        self.stream_digests[digest] = number
+        self._write_object(number, copy)
+        return number
+
+    def _drain_pending(self):
+        while self.pending:
+            obj, number = self.pending.pop()
+            self._write_object(number, NullObject() if obj is None else self._copy(obj))
+
+    def _copy(self, value):
+        """Copia um objeto direto trocando as referências pelos números do resultado"""
+        if isinstance(value, IndirectObject):
+            return IndirectObject(self._resolve(value), 0, None)
+        if isinstance(value, StreamObject):
+            return self._copy_stream(value)
+        if isinstance(value, DictionaryObject):
+            copy = DictionaryObject()
+            for key, item in value.items():
+                copy[NameObject(key)] = self._copy(item)
+            return copy
+        if isinstance(value, ArrayObject):
+            return ArrayObject(self._copy(item) for item in value)
+        return value
+
+    def _copy_stream(self, stream: StreamObject) -> StreamObject:
+        copy = EncodedStreamObject() if '/Filter' in stream else DecodedStreamObject()
+        for key, item in stream.items():
+            if key != '/Length':
+                copy[NameObject(key)] = self._copy(item)
+        copy._data = stream._data
+        return copy
+
+    def _stream_digest(self, stream: StreamObject) -> bytes:
+        header = io.BytesIO()
+        DictionaryObject(stream).write_to_stream(header, None)
+        digest = hashlib.blake2b(header.getvalue(), digest_size=16)
+        digest.update(stream._data)
+        return digest.digest()
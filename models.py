@@ -1,49 +1,110 @@
 import os
+import threading
 import time
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, Any, Optional
+from typing import Callable, Dict, Any, Iterator, Optional, Tuple
 import uuid
-from converters.mkv_to_mp4 import MKVtoMP4Converter
-from converters.avi_to_mp4 import AVIToMP4Converter
-from converters.wmv_to_mp4 import WMVtoMP4Converter
-from converters.asf_to_mp4 import ASFtoMP4Converter
-from converters.mov_to_mp4 import MOVtoMP4Converter
-from converters.webm_to_mp4 import WEBMtoMP4Converter
-from converters.generic_to_mp4 import GenericToMP4Converter
-from converters.wav_to_mp3 import WAVtoMP3Converter
-from compressors.mp4_compressor import MP4Compressor
+from werkzeug.utils import secure_filename
+from converters.ffmpeg_pipeline import FFmpegPipeline
+from converters.segmented_encoder import SegmentedEncoder
+from converters.hls_packager import HLSPackager, MASTER_PLAYLIST
+from converters.two_pass_encoder import TwoPassEncoder, TargetSizeError
+from converters.pdf_rasterizer import PDFRasterizer, RasterizeError, RASTER_DEVICES
 from compressors.pdf_compressor import PDFCompressor
+from dividers.pdf_to_split import PDFtoSplitter, parse_page_ranges, every_n_pages
+from mergers.pdf_to_merge import PDFtoMerger
+from converters.mp3_encoder import MP3Encoder, MP3EncodeError
+from converters.wav_reader import WavFormatError
+from config.ffmpeg_profiles import CONVERSION_PROFILES, COMPRESSION_PROFILES, STREAMABLE_INPUT_FORMATS, \
+    MP3_ENCODING_MODES, HLS_LADDER, HLS_SEGMENT_TYPES
+from config.config import Config
+from services.result_cache import ResultCache
+from services.content_hash import upload_digests
+from services.zip_stream import ZipStream
+from services.media_probe import media_probe
+from services.file_signatures import VIDEO_EXTENSIONS, detect_container, matches_extension, read_header
+
+# Extensões aceitas que não são mídia (não passam pelo ffprobe)
+NON_MEDIA_EXTENSIONS = {'pdf', 'png', 'jpg', 'jpeg', 'csv', 'xlsx', 'docx'}
 
 class FileProcessor:
     """Classe principal para processamento de arquivos com suporte a múltiplos formatos e operações"""
+
+    # Bytes em disco, em múltiplos da entrada, que cada tipo de ação pode ocupar até terminar
+    # (saída mais intermediários); usado para reservar espaço antes de enfileirar
+    OUTPUT_SIZE_FACTORS = {
+        'convert': 1.5,  # Mudança de codec pode aumentar o arquivo
+        'compress': 1.0,
+        'split': 1.1,  # Partes repetem recursos compartilhados (fontes, imagens)
+        'merge': 1.0
+    }
+    # Codificação segmentada: segmentos copiados da entrada + segmentos codificados + resultado
+    SEGMENTED_SIZE_FACTOR = 3.0
     
     def __init__(self):
-        # Inicializa todos os processadores
-        self.converters = {
-            'mkv' : MKVtoMP4Converter(),
-            'avi' : AVIToMP4Converter(),
-            'wmv' : WMVtoMP4Converter(),
-            'asf' : ASFtoMP4Converter(),
-            'mov' : MOVtoMP4Converter(),
-            'webm': WEBMtoMP4Converter(),
-            'wav' : WAVtoMP3Converter()
-        }
-
-        # Conversor genérico para outros formatos
-        self.generic_converter = GenericToMP4Converter()
+        # Conversões e compressões de mídia usam perfis do FFmpeg (config/ffmpeg_profiles.py)
+        self.ffmpeg_pipeline = FFmpegPipeline()
+        self.segmented_encoder = SegmentedEncoder(
+            self.ffmpeg_pipeline,
+            min_duration=Config.SEGMENTED_ENCODE_MIN_DURATION,
+            min_segment_seconds=Config.SEGMENTED_ENCODE_MIN_SEGMENT,
+            max_segments=Config.SEGMENTED_ENCODE_MAX_SEGMENTS
+        )
+        # Compressão para tamanho/bitrate alvo: bitrate pela duração, duas passadas
+        self.two_pass_encoder = TwoPassEncoder(
+            self.ffmpeg_pipeline,
+            min_video_kbps=Config.TARGET_SIZE_MIN_VIDEO_KBPS,
+            min_audio_kbps=Config.TARGET_SIZE_MIN_AUDIO_KBPS,
+            overhead=Config.TARGET_SIZE_OVERHEAD
+        )
+        
+        # Streaming HLS com várias qualidades a partir de uma única decodificação
+        self.hls_packager = HLSPackager(
+            self.ffmpeg_pipeline,
+            HLS_LADDER,
+            segment_seconds=Config.HLS_SEGMENT_SECONDS,
+            preset=Config.HLS_PRESET
+        )
+        
+        self.mp3_encoder = MP3Encoder(
+            self.ffmpeg_pipeline.runner.ffmpeg_path,
+            scheduler=self.ffmpeg_pipeline.runner.scheduler,
+            warm_processes=Config.MP3_WARM_PROCESSES,
+            max_warm_processes=Config.MP3_WARM_MAX_IDLE,
+            chunk_frames=Config.MP3_CHUNK_FRAMES,
+            use_lame=Config.MP3_USE_LAME
+        )
         
         self.compressors = {
-            'mp4': MP4Compressor(),
-            'pdf': PDFCompressor()
+            'pdf': PDFCompressor(
+                workers=Config.PDF_IMAGE_WORKERS,
+                batch_bytes=Config.PDF_IMAGE_BATCH_BYTES,
+                tasks_per_child=Config.PDF_IMAGE_TASKS_PER_CHILD,
+                worker_memory=Config.PDF_IMAGE_WORKER_MEMORY
+            )
         }
+
+        self.pdf_splitter = PDFtoSplitter(Config.UPLOAD_FOLDER, Config.DOWNLOAD_CONVERT_FOLDER)
+        self.pdf_merger = PDFtoMerger(Config.UPLOAD_FOLDER, Config.DOWNLOAD_CONVERT_FOLDER)
+        self.pdf_rasterizer = PDFRasterizer(
+            self.compressors['pdf'].ghostscript_path,
+            workers=Config.RASTER_WORKERS,
+            chunk_pages=Config.RASTER_CHUNK_PAGES,
+            max_dpi=Config.RASTER_MAX_DPI,
+            jpeg_quality=Config.RASTER_JPEG_QUALITY,
+            scheduler=self.ffmpeg_pipeline.runner.scheduler
+        )
+
+        # Cache de resultados por conteúdo + ação + parâmetros
+        self.result_cache = ResultCache(Config.RESULT_CACHE_FOLDER, Config.RESULT_CACHE_MAX_BYTES)
         
-        # Mapeamento de ações para métodos
+        # Mapeamento de ações para métodos (chave = prefixo da ação antes do primeiro _)
         self.action_handlers = {
             'convert': self._handle_conversion,
             'compress': self._handle_compression,
-            'split_pdf': self._handle_pdf_split,
-            'merge_pdf': self._handle_pdf_merge
+            'split': self._handle_pdf_split,
+            'merge': self._handle_pdf_merge
             # Adicione novos handlers aqui
         }
 
@@ -66,13 +127,22 @@ class FileProcessor:
                 'created': datetime.fromtimestamp(stats.st_ctime).strftime('%Y-%m-%d %H:%M:%S'),
                 'modified': datetime.fromtimestamp(stats.st_mtime).strftime('%Y-%m-%d %H:%M:%S'),
                 'type': file_ext,
+                'blake2b': upload_digests.get(filepath),
                 'convertible': False,
                 'compressible': False,
                 'pdf_operations': []
             }
             
+            # Container real pela assinatura do cabeçalho, independente da extensão
+            container = detect_container(read_header(filepath))
+            summary['container'] = container
+
+            # Metadados reais (duração, codecs, resolução); a consulta fica em cache para os conversores
+            if file_ext not in NON_MEDIA_EXTENSIONS:
+                summary['media'] = media_probe.summary(media_probe.probe(filepath))
+
             # Verifica operações disponíveis por tipo de arquivo
-            self._check_video_operations(filepath, file_ext, summary)
+            self._check_video_operations(file_ext, container, summary)
             self._check_pdf_operations(file_ext, summary)
             
             return summary
@@ -82,54 +152,18 @@ class FileProcessor:
                 'error_type': type(e).__name__
             }
     
-    def _check_video_operations(self, filepath: str, file_ext: str, summary: Dict[str, Any]):
+    def _check_video_operations(self, file_ext: str, container: Optional[str], summary: Dict[str, Any]):
         """Verifica operações disponíveis para arquivos de vídeo"""
-        video_formats = {
-            # Formatos com assinaturas conhecidas
-            '3g2': lambda h: h[4:8] in [b'ftyp3g2a', b'ftyp3g2b'],
-            '3gp': lambda h: h[4:8] in [b'ftyp3gp4', b'ftyp3gp5'],
-            'avi': lambda h: h[:4] == b'RIFF' and h[8:12] == b'AVI ',
-            'flv': lambda h: h[:4] == b'FLV\x01',
-            'm2v': lambda h: h[:4] == b'\x00\x00\x01\xBA',
-            'm4v': lambda h: h[4:8] == b'ftypM4V ',
-            'mkv': lambda h: h[:4] == b'\x1A\x45\xDF\xA3',
-            'mov': lambda h: h[4:8] in [b'ftyp', b'moov', b'mdat'],
-            'mpg': lambda h: h[:4] == b'\x00\x00\x01\xBA',
-            'mpeg': lambda h: h[:4] == b'\x00\x00\x01\xBA',
-            'rm': lambda h: h[:4] == b'.RMF',
-            'rmvb': lambda h: h[:4] == b'.RMF',
-            'swf': lambda h: h[:3] == b'FWS' or h[:3] == b'CWS',
-            'vob': lambda h: h[:4] == b'\x00\x00\x01\xBA',
-            'webm': lambda h: h[:4] == b'\x1A\x45\xDF\xA3',
-            'wmv': lambda h: h[:4] == b'\x30\x26\xB2\x75',
-            'xvid': lambda h: h[:4] == b'XVID',
-            
-            # Formatos que podem não ter assinatura clara ou são containers
-            'aaf': lambda h: True,
-            'avchd': lambda h: True,
-            'cavs': lambda h: True,
-            'divx': lambda h: True,
-            'dv': lambda h: True,
-            'f4v': lambda h: True,
-            'hevc': lambda h: True,
-            'm2ts': lambda h: True,
-            'mts': lambda h: True,
-            'mxf': lambda h: True,
-            'ogv': lambda h: True,
-            'tod': lambda h: True,
-            'ts': lambda h: True,
-            'wtv': lambda h: True
-        }
+        if file_ext in VIDEO_EXTENSIONS and file_ext != 'mp4':  # MP4 já é o formato de saída
+            # Sem assinatura conhecida, aceita se o ffprobe encontrou vídeo
+            media = summary.get('media')
+            if matches_extension(container, file_ext) or (container is None and media and media['video']):
+                summary['convertible'] = True
+                summary['conversion_options'] = ['MP4']
         
-        if file_ext.lower() in video_formats:
-            try:
-                with open(filepath, 'rb') as f:
-                    header = f.read(12)
-                    if video_formats[file_ext.lower()](header):
-                        summary['convertible'] = True
-                        summary['conversion_options'] = ['MP4']
-            except Exception as e:
-                print(f"Erro ao verificar arquivo {file_ext}: {str(e)}")
+        # Streaming HLS para qualquer vídeo, inclusive MP4
+        if summary['convertible'] or file_ext == 'mp4':
+            summary['streaming_options'] = ['HLS (fMP4)', 'HLS (TS)']
         
         if file_ext.lower() == 'mp4':
             summary['compressible'] = True
@@ -151,8 +185,14 @@ class FileProcessor:
                 'PDF para JPG'
             ]
     
-    def handle_file_action(self, filepath: str, action: str, download_folder: str) -> Dict[str, Any]:
-        """Manipula as ações solicitadas no arquivo"""
+    def handle_file_action(self, filepath: str, action: str, download_folder: str,
+                           progress_callback: Optional[Callable[[Dict[str, Any]], None]] = None,
+                           options: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Manipula as ações solicitadas no arquivo, reportando o progresso ao callback opcional
+
+        options traz os parâmetros extras do formulário (ex.: intervalos de páginas)
+        """
         try:
             # Extrai o tipo de ação (primeira parte antes do _)
             action_type = action.split('_')[0]
@@ -162,45 +202,228 @@ class FileProcessor:
             if not handler:
                 return {'status': 'error', 'message': f'Tipo de ação não suportado: {action_type}'}
             
-            return handler(filepath, action, download_folder)
+            return handler(filepath, action, download_folder, progress_callback, options or {})
         except Exception as e:
             return {'status': 'error', 'message': str(e)}
     
-    def _handle_conversion(self, filepath: str, action: str, download_folder: str) -> Dict[str, Any]:
+    def estimate_output_size(self, filepath: str, action: str, options: Optional[Dict[str, Any]] = None,
+                             input_size: Optional[int] = None) -> int:
+        """
+        Estimativa conservadora dos bytes que a ação vai gravar (para a cota de disco)
+
+        input_size substitui o tamanho do arquivo quando a entrada não está em disco (pipe)
+        """
+        action_type = action.split('_')[0]
+        file_ext = os.path.splitext(filepath)[1][1:].lower()
+        if input_size is None:
+            input_size = os.path.getsize(filepath)
+
+        if action_type == 'merge':
+            upload_folder = os.path.dirname(filepath)
+            for name in (options or {}).get('files') or []:
+                path = os.path.join(upload_folder, secure_filename(name))
+                if path != str(filepath) and os.path.exists(path):
+                    input_size += os.path.getsize(path)
+
+        if action.startswith('convert_to_hls'):
+            # Soma das variantes pelo maxrate; sem duração, cai no fator da conversão
+            estimate = self.hls_packager.estimate_size(filepath)
+            if estimate:
+                return estimate
+
+        if action == 'compress_mp4_target' and (options or {}).get('target_mb'):
+            # Saída do tamanho pedido; as estatísticas da primeira passada são pequenas
+            try:
+                target = int(float(options['target_mb']) * 1024 * 1024)
+                if target > 0:
+                    return target
+            except ValueError:
+                pass
+
+        factor = self.OUTPUT_SIZE_FACTORS.get(action_type, 1.0)
+        if action_type == 'compress' and COMPRESSION_PROFILES.get(file_ext, {}).get('segmented'):
+            factor = self.SEGMENTED_SIZE_FACTOR
+        return int(input_size * factor)
+
+    def release_cache_space(self, nbytes: int):
+        """Reduz o cache de resultados quando o disco está cheio"""
+        self.result_cache.release_space(nbytes)
+
+    def _handle_conversion(self, filepath: str, action: str, download_folder: str,
+                           progress_callback=None, options=None) -> Dict[str, Any]:
         """Lida com todas as operações de conversão"""
         file_ext = os.path.splitext(filepath)[1][1:].lower()
         
-        # Usa conversor especial se existir, senão usa o genérico
-        converter = self.converters.get(file_ext, self.generic_converter)
-
-        print(converter)
+        if action.startswith('convert_to_hls'):
+            return self._handle_hls(filepath, action, progress_callback)
+        
+        if file_ext == 'wav':
+            return self._handle_wav_to_mp3(filepath, action, download_folder, progress_callback)
         
-        if not converter:
-            return {'status': 'error', 'message': f'Conversão não suportada para .{file_ext}'}
+        # Usa perfil específico se existir, senão usa o genérico
+        profile = CONVERSION_PROFILES.get(file_ext, CONVERSION_PROFILES['generic'])
         
         base_name = os.path.splitext(os.path.basename(filepath))[0]
+        output_filename = f"{base_name}_converted.{profile['extension']}"
         
-        if file_ext == 'wav':
-            output_filename = f"{base_name}_converted.mp3"
-        else:
-            output_filename = f"{base_name}_converted.mp4"
+        cache_key, output_path = self._fetch_cached(filepath, 'convert', {'profile': profile},
+                                                    output_filename, download_folder)
+        cached = output_path is not None
         
-        output_path = converter.convert(str(filepath), str(output_filename), str(download_folder))
+        if not cached:
+            success, output_path = self.ffmpeg_pipeline.run(
+                filepath, profile, output_filename, download_folder, progress_callback
+            )
+            
+            if not success:
+                return {'status': 'error', 'message': 'Falha na conversão', 'details': output_path}
+            
+            self._store_cached(cache_key, output_path)
         
         self._cleanup_original(filepath)
         
         return {
             'status': 'success',
             'message': "Conversão concluída com sucesso!",
-            'download_url': f"/downloads/{os.path.basename(output_path)}"
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'cached': cached
         }
     
-    def _handle_compression(self, filepath: str, action: str, download_folder: str) -> Dict[str, Any]:
+    def _handle_hls(self, filepath: str, action: str, progress_callback=None) -> Dict[str, Any]:
+        """
+        Streaming HLS (convert_to_hls_fmp4 / convert_to_hls_ts) em Config.HLS_FOLDER
+
+        O resultado é uma pasta de playlists e segmentos, servida por /hls/;
+        fica fora do cache de resultados, que guarda um arquivo por entrada.
+        O manifest_url sai no progresso assim que a reprodução é possível.
+        """
+        parts = action.split('_')
+        segment_type = HLS_SEGMENT_TYPES.get(parts[3] if len(parts) > 3 else 'fmp4')
+        if segment_type is None:
+            return {'status': 'error', 'message': f'Tipo de segmento HLS não suportado: {action}'}
+
+        base_name = os.path.splitext(os.path.basename(filepath))[0]
+        stream_id = self._generate_unique_filename(f"{base_name}_hls")
+        manifest_url = f"/hls/{stream_id}/{MASTER_PLAYLIST}"
+
+        def report(progress: Dict[str, Any]):
+            if progress.pop('ready', False):
+                progress['manifest_url'] = manifest_url
+            progress_callback(progress)
+
+        success, master_path, hls_info = self.hls_packager.run(
+            filepath, Config.HLS_FOLDER / stream_id, segment_type, report if progress_callback else None
+        )
+
+        if not success:
+            return {'status': 'error', 'message': 'Falha na geração do streaming', 'details': master_path}
+
+        self._cleanup_original(filepath)
+
+        return {
+            'status': 'success',
+            'message': f"Streaming HLS gerado com {len(hls_info['variants'])} qualidade(s)!",
+            'manifest_url': manifest_url,
+            'hls_info': hls_info,
+            'cached': False
+        }
+
+    def _mp3_mode(self, action: str) -> Optional[Dict[str, Any]]:
+        """Modo do MP3 pelo sufixo da ação (convert_to_mp3_<modo>); sem sufixo usa o bitrate padrão"""
+        parts = action.split('_')
+        if len(parts) < 4:
+            return {'bitrate': int(Config.AUDIO_CONVERSION_SETTINGS['bitrate'].rstrip('k'))}
+        return MP3_ENCODING_MODES.get(parts[3])
+
+    def _handle_wav_to_mp3(self, filepath: str, action: str, download_folder: str,
+                           progress_callback=None) -> Dict[str, Any]:
+        """WAV -> MP3 pelo caminho rápido (mmap + encoder pré-iniciado), com o FFmpeg completo de reserva"""
+        mode = self._mp3_mode(action)
+        if mode is None:
+            return {'status': 'error', 'message': f'Modo de MP3 não suportado: {action}'}
+
+        base_name = os.path.splitext(os.path.basename(filepath))[0]
+        output_filename = f"{base_name}_converted.mp3"
+
+        cache_key, output_path = self._fetch_cached(filepath, 'convert', {'mp3_mode': mode},
+                                                    output_filename, download_folder)
+        cached = output_path is not None
+        audio_info = {}
+
+        if not cached:
+            output_path = os.path.join(download_folder, self._generate_unique_filename(output_filename))
+            try:
+                audio_info = self.mp3_encoder.encode(filepath, output_path, mode, progress_callback)
+            except WavFormatError:
+                # Variantes que o leitor não cobre (RF64, ADPCM...) passam pelo demuxer do FFmpeg
+                if 'vbr' in mode:
+                    profile = dict(CONVERSION_PROFILES['wav'], audio_bitrate=None, audio_quality=mode['vbr'])
+                else:
+                    profile = dict(CONVERSION_PROFILES['wav'], audio_bitrate=f"{mode['bitrate']}k")
+                success, output_path = self.ffmpeg_pipeline.run(
+                    filepath, profile, output_filename, download_folder, progress_callback
+                )
+                if not success:
+                    return {'status': 'error', 'message': 'Falha na conversão', 'details': output_path}
+                audio_info = {'engine': 'ffmpeg-pipeline'}
+            except MP3EncodeError as e:
+                return {'status': 'error', 'message': 'Falha na conversão', 'details': str(e)}
+
+            self._store_cached(cache_key, output_path)
+
+        self._cleanup_original(filepath)
+        audio_info['mode'] = mode
+
+        return {
+            'status': 'success',
+            'message': "Conversão concluída com sucesso!",
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'audio_info': audio_info,
+            'cached': cached
+        }
+
+    def is_streamable(self, filename: str) -> bool:
+        """Se a conversão pode ler o upload direto do corpo da requisição"""
+        return os.path.splitext(filename)[1][1:].lower() in STREAMABLE_INPUT_FORMATS
+
+    def convert_stream(self, stream, filename: str, download_folder: str, input_size: Optional[int] = None,
+                       progress_callback=None) -> Dict[str, Any]:
+        """
+        Conversão com a entrada chegando por um fluxo, sem gravar o upload
+
+        Sem conteúdo em disco não há hash prévio, então o cache de resultados
+        não é consultado nem alimentado.
+        """
+        file_ext = os.path.splitext(filename)[1][1:].lower()
+        input_format = STREAMABLE_INPUT_FORMATS.get(file_ext)
+        if not input_format:
+            return {'status': 'error', 'message': f'Conversão por streaming não suportada para .{file_ext}'}
+
+        profile = CONVERSION_PROFILES.get(file_ext, CONVERSION_PROFILES['generic'])
+        base_name = os.path.splitext(os.path.basename(filename))[0]
+        output_filename = f"{base_name}_converted.{profile['extension']}"
+
+        success, output_path = self.ffmpeg_pipeline.run_stream(
+            stream, input_format, profile, output_filename, download_folder, progress_callback, input_size
+        )
+
+        if not success:
+            return {'status': 'error', 'message': 'Falha na conversão', 'details': output_path}
+
+        return {
+            'status': 'success',
+            'message': "Conversão concluída com sucesso!",
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'cached': False
+        }
+
+    def _handle_compression(self, filepath: str, action: str, download_folder: str,
+                            progress_callback=None, options=None) -> Dict[str, Any]:
         """Lida com todas as operações de compressão"""
         file_ext = os.path.splitext(filepath)[1][1:].lower()
         compressor = self.compressors.get(file_ext)
         
-        if not compressor:
+        if not compressor and file_ext not in COMPRESSION_PROFILES:
             return {'status': 'error', 'message': f'Compressão não suportada para .{file_ext}'}
         
         base_name = os.path.splitext(os.path.basename(filepath))[0]
@@ -208,42 +431,294 @@ class FileProcessor:
         if file_ext == 'pdf':
             quality = self._get_pdf_quality(action)
             output_filename = f"{base_name}_compressed.pdf"
-            output_filename_new = self._generate_unique_filename(output_filename)
-            success, output_path = compressor.compress(filepath, os.path.join(download_folder, output_filename_new), quality)
+            cache_key, output_path = self._fetch_cached(filepath, 'compress', {'quality': quality},
+                                                        output_filename, download_folder)
+            cached = output_path is not None
+            pdf_info = {}
             
-            if not success:
-                return {'status': 'error', 'message': output_path}  # output_path contém a mensagem de erro aqui
+            if not cached:
+                output_filename_new = self._generate_unique_filename(output_filename)
+                success, output_path, pdf_info = compressor.compress(filepath, os.path.join(download_folder, output_filename_new), quality)
+                
+                if not success:
+                    return {'status': 'error', 'message': output_path}  # output_path contém a mensagem de erro aqui
+                
+                self._store_cached(cache_key, output_path)
             
             compression_info = self._get_compression_info(filepath, output_path)
+            compression_info.update(pdf_info)  # engine e estatísticas por imagem
             self._cleanup_original(filepath)
             
             return {
                 'status': 'success',
                 'message': f"PDF comprimido com qualidade {quality}!",
                 'download_url': f"/downloads/{os.path.basename(output_path)}",
-                'compression_info': compression_info
+                'compression_info': compression_info,
+                'cached': cached
             }
+        elif action == 'compress_mp4_target':
+            return self._handle_target_size(filepath, file_ext, download_folder, progress_callback, options or {})
         else:  # MP4
             crf = int(action.split('_')[2])
-            output_filename = f"{base_name}_compressed.mp4"
-            output_path = compressor.compress(filepath, os.path.join(download_folder, output_filename), crf=crf)
+            profile = COMPRESSION_PROFILES[file_ext]
+            output_filename = f"{base_name}_compressed.{profile['extension']}"
+            cache_key, output_path = self._fetch_cached(filepath, 'compress', {'profile': profile, 'crf': crf},
+                                                        output_filename, download_folder)
+            cached = output_path is not None
+            
+            if not cached:
+                encoder = self.segmented_encoder if profile.get('segmented') else self.ffmpeg_pipeline
+                success, output_path = encoder.run(
+                    filepath, profile, output_filename, download_folder, progress_callback, crf=crf
+                )
+                
+                if not success:
+                    return {'status': 'error', 'message': 'Falha na compressão', 'details': output_path}
+                
+                self._store_cached(cache_key, output_path)
+            
             self._cleanup_original(filepath)
             
             return {
                 'status': 'success',
                 'message': f"Arquivo comprimido com CRF {crf}!",
-                'download_url': f"/downloads/{os.path.basename(output_path)}"
+                'download_url': f"/downloads/{os.path.basename(output_path)}",
+                'cached': cached
             }
     
-    def _handle_pdf_split(self, filepath: str, action: str, download_folder: str) -> Dict[str, Any]:
-        """Lida com divisão de PDFs (implementação futura)"""
-        # TODO: Implementar lógica de divisão de PDFs
-        return {'status': 'error', 'message': 'Funcionalidade de divisão de PDFs ainda não implementada'}
+    def _handle_target_size(self, filepath: str, file_ext: str, download_folder: str,
+                            progress_callback=None, options=None) -> Dict[str, Any]:
+        """
+        Compressão de MP4 para caber num tamanho (options['target_mb']) ou
+        bitrate total (options['target_kbps']), em duas passadas
+        """
+        profile = COMPRESSION_PROFILES[file_ext]
+        try:
+            target_mb = float(options['target_mb']) if options.get('target_mb') else None
+            target_kbps = int(options['target_kbps']) if options.get('target_kbps') else None
+            plan = self.two_pass_encoder.plan(
+                filepath, profile,
+                target_bytes=int(target_mb * 1024 * 1024) if target_mb else None,
+                target_kbps=target_kbps
+            )
+        except (ValueError, TargetSizeError) as e:
+            return {'status': 'error', 'message': 'Tamanho alvo inválido', 'details': str(e)}
+
+        base_name = os.path.splitext(os.path.basename(filepath))[0]
+        output_filename = f"{base_name}_compressed.{profile['extension']}"
+        bitrates = {'video_kbps': plan['video_kbps'], 'audio_kbps': plan['audio_kbps']}
+        cache_key, output_path = self._fetch_cached(filepath, 'compress', {'profile': profile, 'bitrates': bitrates},
+                                                    output_filename, download_folder)
+        cached = output_path is not None
+
+        if not cached:
+            success, output_path = self.two_pass_encoder.run(
+                filepath, profile, plan, output_filename, download_folder, progress_callback
+            )
+
+            if not success:
+                return {'status': 'error', 'message': 'Falha na compressão', 'details': output_path}
+
+            self._store_cached(cache_key, output_path)
+
+        achieved = os.path.getsize(output_path)
+        compression_info = self._get_compression_info(filepath, output_path)
+        compression_info.update({
+            'target_size': f"{plan['target_size'] / (1024 * 1024):.2f} MB",
+            'predicted_size': f"{plan['predicted_size'] / (1024 * 1024):.2f} MB",
+            'achieved_size': f"{achieved / (1024 * 1024):.2f} MB",
+            'within_target': achieved <= plan['target_size'],
+            'video_bitrate': f"{plan['video_kbps']} kbps",
+            'audio_bitrate': f"{plan['audio_kbps']} kbps"
+        })
+        self._cleanup_original(filepath)
+
+        return {
+            'status': 'success',
+            'message': f"Arquivo comprimido para {compression_info['achieved_size']} "
+                       f"(alvo {compression_info['target_size']})!",
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'compression_info': compression_info,
+            'cached': cached
+        }
     
-    def _handle_pdf_merge(self, filepath: str, action: str, download_folder: str) -> Dict[str, Any]:
-        """Lida com junção de PDFs (implementação futura)"""
-        # TODO: Implementar lógica de junção de PDFs
-        return {'status': 'error', 'message': 'Funcionalidade de junção de PDFs ainda não implementada'}
+    def _handle_pdf_split(self, filepath: str, action: str, download_folder: str,
+                          progress_callback=None, options=None) -> Dict[str, Any]:
+        """
+        Lida com divisão de PDFs
+
+        Ações: split_pdf_range (options['ranges'], ex.: "1-3,7,10-"),
+        split_pdf_every (options['every'] páginas por parte) e split_pdf_single
+        """
+        options = options or {}
+        try:
+            total_pages = self.pdf_splitter.count_pages(filepath)
+            if action == 'split_pdf_single':
+                parts = every_n_pages(1, total_pages)
+            elif action == 'split_pdf_every':
+                parts = every_n_pages(int(options.get('every') or 0), total_pages)
+            else:
+                parts = parse_page_ranges(options.get('ranges', ''), total_pages)
+        except ValueError as e:
+            return {'status': 'error', 'message': 'Intervalo de páginas inválido', 'details': str(e)}
+
+        base_name = os.path.splitext(os.path.basename(filepath))[0]
+        if len(parts) == 1:
+            output_filename = f"{base_name}_p{parts[0][0]}-{parts[0][1]}.pdf"
+        else:
+            output_filename = f"{base_name}_split.zip"
+
+        cache_key, output_path = self._fetch_cached(filepath, 'split', {'parts': parts},
+                                                    output_filename, download_folder)
+        cached = output_path is not None
+
+        if not cached:
+            output_path = os.path.join(download_folder, self._generate_unique_filename(output_filename))
+            success, output_path = self.pdf_splitter.split(filepath, parts, output_path, progress_callback)
+
+            if not success:
+                return {'status': 'error', 'message': 'Falha na divisão do PDF', 'details': output_path}
+
+            self._store_cached(cache_key, output_path)
+
+        self._cleanup_original(filepath)
+
+        return {
+            'status': 'success',
+            'message': f"PDF dividido em {len(parts)} parte(s)!",
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'cached': cached
+        }
+    
+    def _handle_pdf_merge(self, filepath: str, action: str, download_folder: str,
+                          progress_callback=None, options=None) -> Dict[str, Any]:
+        """
+        Lida com junção de PDFs
+
+        options['files'] traz a lista ordenada de PDFs enviados; o arquivo da
+        ação entra no início se não estiver na lista
+        """
+        options = options or {}
+        upload_folder = os.path.dirname(filepath)
+        names = list(options.get('files') or [])
+        if os.path.basename(filepath) not in names:
+            names.insert(0, os.path.basename(filepath))
+
+        filepaths = []
+        for name in names:
+            safe_name = secure_filename(name)
+            path = os.path.join(upload_folder, safe_name)
+            if not safe_name.lower().endswith('.pdf') or not os.path.exists(path):
+                return {'status': 'error', 'message': 'Arquivo não encontrado para junção', 'details': name}
+            filepaths.append(path)
+
+        if len(filepaths) < 2:
+            return {'status': 'error', 'message': 'Selecione ao menos dois PDFs para juntar'}
+
+        base_name = os.path.splitext(os.path.basename(filepaths[0]))[0]
+        output_filename = f"{base_name}_merged.pdf"
+
+        # A chave do cache inclui o conteúdo e a ordem de todos os documentos
+        sources = [upload_digests.get(path) or self.result_cache.file_digest(path) for path in filepaths[1:]]
+        cache_key, output_path = self._fetch_cached(filepaths[0], 'merge', {'sources': sources},
+                                                    output_filename, download_folder)
+        cached = output_path is not None
+        merge_info = {}
+
+        if not cached:
+            output_path = os.path.join(download_folder, self._generate_unique_filename(output_filename))
+            success, output_path, merge_info = self.pdf_merger.merge(filepaths, output_path, progress_callback)
+
+            if not success:
+                return {'status': 'error', 'message': 'Falha na junção dos PDFs', 'details': output_path}
+
+            self._store_cached(cache_key, output_path)
+
+        for path in set(filepaths):
+            self._cleanup_original(path)
+
+        return {
+            'status': 'success',
+            'message': f"{len(filepaths)} PDFs juntados com sucesso!",
+            'download_url': f"/downloads/{os.path.basename(output_path)}",
+            'merge_info': merge_info,
+            'cached': cached
+        }
+    
+    def rasterize_pdf(self, filepath: str, image_format: str = 'jpg', dpi: int = 150,
+                      ranges: str = '') -> Tuple[str, Iterator[bytes], int]:
+        """
+        Converte páginas do PDF em imagens, entregando um ZIP em fluxo
+
+        Os parâmetros são validados aqui (ValueError/RasterizeError) antes de
+        qualquer byte sair; as páginas entram no ZIP conforme ficam prontas.
+        Uma falha do Ghostscript antes da primeira página sai do iterador como
+        RasterizeError; depois dela, vira a entrada ERRO.txt no fim do ZIP.
+
+        Returns:
+            Tuple (nome do ZIP, iterador com os bytes do ZIP, bytes estimados das imagens temporárias)
+        """
+        self.pdf_rasterizer.check(image_format, dpi)
+        total_pages = self.pdf_splitter.count_pages(filepath)
+        parts = parse_page_ranges(ranges, total_pages) if ranges else [(1, total_pages)]
+        pages = sorted({page for first, last in parts for page in range(first, last + 1)})
+
+        base_name = os.path.splitext(os.path.basename(filepath))[0]
+        return (
+            f"{base_name}_{image_format}.zip",
+            self._stream_raster_zip(filepath, pages, image_format, dpi, base_name),
+            self.pdf_rasterizer.estimate_size(len(pages), image_format, dpi)
+        )
+
+    def _stream_raster_zip(self, filepath: str, pages, image_format: str, dpi: int, base_name: str) -> Iterator[bytes]:
+        archive = ZipStream()
+        extension = RASTER_DEVICES[image_format][1]
+        width = len(str(pages[-1]))
+        added = 0
+        try:
+            for page, image_path in self.pdf_rasterizer.render(filepath, pages, image_format, dpi,
+                                                               Config.DOWNLOAD_CONVERT_FOLDER):
+                yield from archive.add_file(image_path, f"{base_name}_p{page:0{width}d}.{extension}")
+                os.remove(image_path)
+                added += 1
+        except RasterizeError as e:
+            if not added:
+                raise  # Nenhum byte enviado ainda: quem chama responde com o erro
+            # A resposta (200) já começou: o erro vai no ZIP em vez de truncá-lo em silêncio
+            message = f"Conversão interrompida após {added} de {len(pages)} páginas: {e}\n"
+            yield archive.add_bytes(message.encode('utf-8'), 'ERRO.txt')
+        yield archive.close()
+
+    def _fetch_cached(self, filepath: str, action: str, params: Dict[str, Any],
+                      output_filename: str, download_folder: str):
+        """
+        Procura um resultado anterior para o mesmo conteúdo, ação e parâmetros
+
+        Returns:
+            Tuple (cache_key, output_path | None se não houver resultado em cache)
+        """
+        try:
+            # Usa o digest calculado durante o upload; só relê o arquivo se não houver
+            content_digest = upload_digests.get(filepath) or self.result_cache.file_digest(filepath)
+            cache_key = self.result_cache.make_key(content_digest, action, params)
+            output_path = os.path.join(download_folder, self._generate_unique_filename(output_filename))
+            extension = os.path.splitext(output_filename)[1]
+
+            if self.result_cache.fetch(cache_key, extension, output_path):
+                return cache_key, output_path
+            return cache_key, None
+        except Exception as e:
+            print(f"AVISO: Falha ao consultar o cache de resultados: {str(e)}")
+            return None, None
+    
+    def _store_cached(self, cache_key: Optional[str], output_path: str):
+        """Guarda o resultado no cache (falhas no cache não interrompem o processamento)"""
+        if not cache_key:
+            return
+        try:
+            self.result_cache.store(cache_key, os.path.splitext(output_path)[1], output_path)
+        except Exception as e:
+            print(f"AVISO: Falha ao gravar no cache de resultados: {str(e)}")
     
     def _get_pdf_quality(self, action: str) -> int:
         """Extrai a qualidade da ação de compressão de PDF"""
@@ -253,7 +728,7 @@ class FileProcessor:
             return 25
         return 50  # padrão
     
-    def _get_compression_info(self, original_path: str, compressed_path: str) -> Dict[str, str]:
+    def _get_compression_info(self, original_path: str, compressed_path: str) -> Dict[str, Any]:
         """Gera informações sobre a compressão"""
         original_size = os.path.getsize(original_path) / (1024 * 1024)  # MB
         compressed_size = os.path.getsize(compressed_path) / (1024 * 1024)
@@ -269,15 +744,40 @@ class FileProcessor:
         """Remove o arquivo original após processamento"""
         try:
             os.remove(filepath)
+            upload_digests.discard(filepath)
         except Exception as e:
             print(f"AVISO: Não foi possível remover o original {filepath}: {str(e)}")
 
-# Instância global do processador
-file_processor = FileProcessor()
+# Instância global do processador, criada no primeiro uso: os workers do pool de
+# imagens de PDF importam este módulo (via main) e não precisam dos conversores
+_file_processor: Optional[FileProcessor] = None
+_file_processor_lock = threading.Lock()
+
+def get_file_processor() -> FileProcessor:
+    global _file_processor
+    with _file_processor_lock:
+        if _file_processor is None:
+            _file_processor = FileProcessor()
+        return _file_processor
 
 # Funções de interface legada (para compatibilidade)
 def get_file_summary(filepath):
-    return file_processor.get_file_summary(filepath)
+    return get_file_processor().get_file_summary(filepath)
+
+def rasterize_pdf(filepath, image_format='jpg', dpi=150, ranges=''):
+    return get_file_processor().rasterize_pdf(filepath, image_format, dpi, ranges)
+
+def estimate_output_size(filepath, action, options=None, input_size=None):
+    return get_file_processor().estimate_output_size(filepath, action, options, input_size)
+
+def is_streamable(filename):
+    return get_file_processor().is_streamable(filename)
+
+def convert_stream(stream, filename, download_folder, input_size=None, progress_callback=None):
+    return get_file_processor().convert_stream(stream, filename, download_folder, input_size, progress_callback)
+
+def release_cache_space(nbytes):
+    return get_file_processor().release_cache_space(nbytes)
 
-def handle_file_action(filepath, action, download_folder):
-    return file_processor.handle_file_action(filepath, action, download_folder)
\ No newline at end of file
+def handle_file_action(filepath, action, download_folder, progress_callback=None, options=None):
+    return get_file_processor().handle_file_action(filepath, action, download_folder, progress_callback, options)
\ No newline at end of file
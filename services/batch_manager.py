@@ -0,0 +1,112 @@
+import threading
+import time
+import uuid
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from services.job_queue import JobQueue
+
+
+class BatchManager:
+    """
+    Agrupa os jobs de um lote (vários arquivos, uma ação)
+
+    Cada item é um job independente na fila compartilhada: a falha de um item
+    fica no status dele e não interrompe os demais. Itens recusados antes de
+    entrar na fila (tipo não permitido, sem espaço) já nascem com o resultado
+    de erro.
+    """
+
+    def __init__(self, job_queue: JobQueue, retention: int = 3600):
+        self.job_queue = job_queue
+        self.retention = retention
+        self.batches: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def create(self, action: str, items: List[Dict[str, Any]]) -> str:
+        """
+        Registra um lote
+
+        Args:
+            items: Dicts com 'name' (nome enviado), 'job_id' (ou None) e 'result' (erro, se recusado)
+        """
+        batch_id = uuid.uuid4().hex
+        with self.lock:
+            self._prune()
+            self.batches[batch_id] = {
+                'batch_id': batch_id,
+                'action': action,
+                'created': time.time(),
+                'items': items
+            }
+        return batch_id
+
+    def get(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Estado do lote com o status de cada item"""
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return None
+
+        items = []
+        counts = {'queued': 0, 'running': 0, 'success': 0, 'error': 0}
+        for index, item in enumerate(batch['items']):
+            state, progress, result = self._item_state(item)
+            if state == 'done':
+                counts['success' if result and result.get('status') == 'success' else 'error'] += 1
+            else:
+                counts[state] += 1
+            items.append({
+                'index': index,
+                'name': item['name'],
+                'job_id': item['job_id'],
+                'state': state,
+                'progress': progress,
+                'result': result
+            })
+
+        return {
+            'batch_id': batch_id,
+            'action': batch['action'],
+            'state': 'done' if counts['queued'] + counts['running'] == 0 else 'running',
+            'counts': counts,
+            'items': items
+        }
+
+    def iter_finished(self, batch_id: str) -> Iterator[Tuple[int, Dict[str, Any], Dict[str, Any]]]:
+        """
+        Produz (índice, item, resultado) à medida que os itens terminam
+
+        Os recusados na entrada saem primeiro; os demais na ordem de conclusão.
+        """
+        with self.lock:
+            batch = self.batches.get(batch_id)
+        if batch is None:
+            return
+
+        positions = {}
+        for index, item in enumerate(batch['items']):
+            if item['job_id'] is None:
+                yield index, item, item['result']
+            else:
+                positions[item['job_id']] = index
+
+        seen = set()
+        while len(seen) < len(positions):
+            for job in self.job_queue.wait_for_finished(list(positions), seen):
+                seen.add(job['job_id'])
+                index = positions[job['job_id']]
+                result = job['result'] or {'status': 'error', 'message': 'Status do item expirou'}
+                yield index, batch['items'][index], result
+
+    def _item_state(self, item: Dict[str, Any]) -> Tuple[str, Any, Optional[Dict[str, Any]]]:
+        if item['job_id'] is None:
+            return 'done', None, item['result']
+        job = self.job_queue.get(item['job_id'])
+        if job is None:
+            return 'done', None, {'status': 'error', 'message': 'Status do item expirou'}
+        return job['state'], job['progress'], job['result']
+
+    def _prune(self):
+        """Descarta lotes mais antigos que o período de retenção"""
+        limit = time.time() - self.retention
+        for batch_id in [batch_id for batch_id, batch in self.batches.items() if batch['created'] < limit]:
+            del self.batches[batch_id]
@@ -0,0 +1,192 @@
+import json
+import os
+import re
+import threading
+import uuid
+from pathlib import Path
+from typing import Any, BinaryIO, Dict, Optional, Tuple
+
+from werkzeug.utils import secure_filename
+
+from services.content_hash import UploadDigestStore
+
+
+class ChunkedUploadError(Exception):
+    """Erro de upload em partes com o status HTTP correspondente"""
+
+    def __init__(self, message: str, status_code: int = 400, offset: Optional[int] = None):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.offset = offset
+
+
+class ChunkedUploadManager:
+    """Recebe uploads em partes gravando direto no arquivo de destino, com suporte a retomada"""
+
+    UPLOAD_ID_PATTERN = re.compile(r'^[0-9a-f]{32}$')
+
+    def __init__(self, upload_folder: Path, partial_folder: Path, max_size: int, digests: UploadDigestStore,
+                 buffer_size: int = 1024 * 1024):
+        self.upload_folder = Path(upload_folder)
+        self.partial_folder = Path(partial_folder)
+        self.max_size = max_size
+        self.digests = digests
+        self.buffer_size = buffer_size
+        self.locks: Dict[str, threading.Lock] = {}
+        self.locks_guard = threading.Lock()
+        # Hash incremental por upload: (hasher, bytes já incluídos no hash)
+        self.hashers: Dict[str, Tuple[Any, int]] = {}
+
+    def _meta_path(self, upload_id: str) -> Path:
+        return self.partial_folder / f"{upload_id}.json"
+
+    def _part_path(self, upload_id: str) -> Path:
+        return self.partial_folder / f"{upload_id}.part"
+
+    def _lock_for(self, upload_id: str) -> threading.Lock:
+        with self.locks_guard:
+            return self.locks.setdefault(upload_id, threading.Lock())
+
+    def _load(self, upload_id: str) -> Dict[str, Any]:
+        """Carrega os metadados do upload (persistidos em disco para sobreviver a reinícios)"""
+        if not self.UPLOAD_ID_PATTERN.match(upload_id or ''):
+            raise ChunkedUploadError('Upload não encontrado', 404)
+
+        try:
+            with open(self._meta_path(upload_id), 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except FileNotFoundError:
+            raise ChunkedUploadError('Upload não encontrado', 404)
+
+    def init(self, filename: str, size: int) -> Dict[str, Any]:
+        """Registra um novo upload e cria o arquivo parcial vazio"""
+        filename = secure_filename(filename or '')
+        if not filename:
+            raise ChunkedUploadError('Nome de arquivo inválido')
+
+        if size < 0:
+            raise ChunkedUploadError('Tamanho de arquivo inválido')
+
+        if size > self.max_size:
+            limit_gb = self.max_size / (1024 * 1024 * 1024)
+            raise ChunkedUploadError(f'O arquivo excede o tamanho máximo permitido de {limit_gb:g}GB.', 413)
+
+        upload_id = uuid.uuid4().hex
+        meta = {'upload_id': upload_id, 'filename': filename, 'size': size}
+
+        self._part_path(upload_id).touch()
+        with open(self._meta_path(upload_id), 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+
+        with self.locks_guard:
+            self.hashers[upload_id] = (self.digests.new_hasher(), 0)
+
+        return self.status(upload_id)
+
+    def status(self, upload_id: str) -> Dict[str, Any]:
+        """Retorna o offset atual, usado pelo cliente para retomar o envio"""
+        meta = self._load(upload_id)
+        offset = os.path.getsize(self._part_path(upload_id))
+        return {
+            'upload_id': upload_id,
+            'filename': meta['filename'],
+            'size': meta['size'],
+            'offset': offset,
+            'complete': offset == meta['size']
+        }
+
+    def write_chunk(self, upload_id: str, offset: int, content_length: Optional[int], stream: BinaryIO) -> Dict[str, Any]:
+        """
+        Grava uma parte do arquivo a partir do offset informado
+
+        A validação de tamanho é feita com o Content-Length antes de qualquer
+        byte ser gravado. Se a conexão cair no meio da parte, os bytes já
+        recebidos ficam no arquivo parcial e o cliente retoma do novo offset.
+        """
+        meta = self._load(upload_id)
+
+        if content_length is None:
+            raise ChunkedUploadError('Content-Length obrigatório', 411)
+
+        with self._lock_for(upload_id):
+            part_path = self._part_path(upload_id)
+            current = os.path.getsize(part_path)
+
+            if offset != current:
+                raise ChunkedUploadError('Offset não corresponde ao recebido pelo servidor', 409, offset=current)
+
+            if offset + content_length > meta['size']:
+                raise ChunkedUploadError('A parte excede o tamanho declarado do arquivo', 413, offset=current)
+
+            # O hash acompanha a escrita enquanto as partes chegam em sequência;
+            # sem o estado (ex.: após reinício) o digest é calculado na finalização
+            hasher, hashed = self.hashers.get(upload_id, (None, 0))
+            if hashed != offset:
+                hasher = None
+
+            remaining = content_length
+            with open(part_path, 'r+b') as f:
+                f.seek(offset)
+                try:
+                    while remaining > 0:
+                        chunk = stream.read(min(self.buffer_size, remaining))
+                        if not chunk:
+                            break
+                        f.write(chunk)
+                        if hasher:
+                            hasher.update(chunk)
+                        remaining -= len(chunk)
+                except Exception:
+                    # Conexão interrompida: mantém o que já foi gravado para retomada
+                    pass
+
+            if hasher:
+                self.hashers[upload_id] = (hasher, offset + content_length - remaining)
+            else:
+                self.hashers.pop(upload_id, None)
+
+        return self.status(upload_id)
+
+    def abandon(self, upload_id: str):
+        """Descarta um upload incompleto (chamado quando o arquivo parcial expira)"""
+        with self.locks_guard:
+            self.hashers.pop(upload_id, None)
+            self.locks.pop(upload_id, None)
+        for path in (self._part_path(upload_id), self._meta_path(upload_id)):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def finalize(self, upload_id: str) -> Dict[str, Any]:
+        """
+        Move o arquivo completo para a pasta de uploads
+
+        Returns:
+            Dict com filepath, digest e duplicate (se virou hard link de um upload idêntico)
+        """
+        meta = self._load(upload_id)
+
+        with self._lock_for(upload_id):
+            part_path = self._part_path(upload_id)
+            current = os.path.getsize(part_path)
+
+            if current != meta['size']:
+                raise ChunkedUploadError('Upload incompleto', 409, offset=current)
+
+            hasher, hashed = self.hashers.pop(upload_id, (None, 0))
+            if hasher and hashed == current:
+                digest = hasher.hexdigest()
+            else:
+                digest = self.digests.file_digest(part_path)
+
+            filepath = self.upload_folder / meta['filename']
+            os.replace(part_path, filepath)
+            os.remove(self._meta_path(upload_id))
+            duplicate = self.digests.dedupe(filepath, digest)
+
+        with self.locks_guard:
+            self.locks.pop(upload_id, None)
+
+        return {'filepath': filepath, 'digest': digest, 'duplicate': duplicate}
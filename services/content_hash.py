@@ -0,0 +1,118 @@
+import hashlib
+import os
+import threading
+from pathlib import Path
+from typing import BinaryIO, Dict, Optional
+
+
+class UploadDigestStore:
+    """Calcula o hash dos uploads durante a escrita e guarda o digest ao lado do arquivo"""
+
+    SUFFIX = '.blake2b'
+
+    def __init__(self, buffer_size: int = 1024 * 1024):
+        self.buffer_size = buffer_size
+        self.index: Dict[str, str] = {}  # digest -> caminho do upload
+        self.lock = threading.Lock()
+
+    def new_hasher(self):
+        return hashlib.blake2b(digest_size=32)
+
+    def _sidecar(self, filepath) -> Path:
+        filepath = Path(filepath)
+        return filepath.with_name(filepath.name + self.SUFFIX)
+
+    def save_stream(self, stream: BinaryIO, filepath) -> str:
+        """Grava o stream no destino calculando o digest na mesma passada"""
+        hasher = self.new_hasher()
+
+        # Grava em arquivo temporário: o destino pode ser um hard link de outro upload
+        temp_path = f"{filepath}.uploading"
+        with open(temp_path, 'wb') as f:
+            for chunk in iter(lambda: stream.read(self.buffer_size), b''):
+                hasher.update(chunk)
+                f.write(chunk)
+        os.replace(temp_path, filepath)
+
+        # O registro no índice fica para o dedupe, que compara com os uploads anteriores
+        digest = hasher.hexdigest()
+        self._sidecar(filepath).write_text(digest, encoding='ascii')
+        return digest
+
+    def file_digest(self, filepath) -> str:
+        """Calcula o digest lendo o arquivo (usado só quando não há digest gravado)"""
+        hasher = self.new_hasher()
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.buffer_size), b''):
+                hasher.update(chunk)
+        return hasher.hexdigest()
+
+    def record(self, filepath, digest: str):
+        """Grava o digest no arquivo auxiliar e registra no índice de deduplicação"""
+        self._sidecar(filepath).write_text(digest, encoding='ascii')
+        with self.lock:
+            self.index[digest] = str(filepath)
+
+    def get(self, filepath) -> Optional[str]:
+        """Retorna o digest gravado, ignorando-o se o arquivo foi alterado depois"""
+        sidecar = self._sidecar(filepath)
+        try:
+            if os.path.getmtime(sidecar) < os.path.getmtime(filepath):
+                return None
+            return sidecar.read_text(encoding='ascii').strip() or None
+        except OSError:
+            return None
+
+    def dedupe(self, filepath, digest: str) -> bool:
+        """
+        Substitui o upload por um hard link de um upload idêntico já existente
+
+        Returns:
+            True se o arquivo foi deduplicado
+        """
+        filepath = str(filepath)
+        with self.lock:
+            existing = self.index.get(digest)
+
+        # O upload indexado pode ter sido sobrescrito com outro conteúdo
+        if not existing or existing == filepath or self.get(existing) != digest:
+            self.record(filepath, digest)
+            return False
+
+        try:
+            if os.path.getsize(existing) != os.path.getsize(filepath) or os.path.samefile(existing, filepath):
+                return False
+
+            temp_path = filepath + '.link'
+            os.link(existing, temp_path)
+            os.replace(temp_path, filepath)
+        except OSError:
+            return False
+
+        self.record(filepath, digest)
+        return True
+
+    def discard(self, filepath):
+        """Remove o digest de um upload apagado"""
+        filepath = str(filepath)
+        with self.lock:
+            for digest, path in list(self.index.items()):
+                if path == filepath:
+                    del self.index[digest]
+        try:
+            os.remove(self._sidecar(filepath))
+        except OSError:
+            pass
+
+    def load_index(self, folder):
+        """Reconstrói o índice a partir dos digests gravados (após reinício)"""
+        for sidecar in Path(folder).glob(f"*{self.SUFFIX}"):
+            filepath = sidecar.with_name(sidecar.name[:-len(self.SUFFIX)])
+            digest = self.get(filepath)
+            if digest:
+                with self.lock:
+                    self.index[digest] = str(filepath)
+
+
+# Instância compartilhada entre o upload e o processamento
+upload_digests = UploadDigestStore()
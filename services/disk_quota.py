@@ -0,0 +1,150 @@
+import itertools
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+
+class DiskQuotaError(Exception):
+    """
+    Sem espaço para aceitar o upload ou iniciar o job
+
+    status_code 429 quando o espaço está só reservado por uploads/jobs em
+    andamento (libera em instantes); 503 quando falta capacidade de fato e é
+    preciso esperar arquivos vencerem.
+    """
+
+    def __init__(self, message: str, status_code: int, retry_after: int):
+        super().__init__(message)
+        self.message = message
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+class DiskQuota:
+    """
+    Contabiliza o espaço das pastas de upload e resultados
+
+    O espaço disponível é o menor entre a cota (max_bytes menos o ocupado nas
+    pastas) e o livre no disco menos uma margem de segurança, descontadas as
+    reservas dos uploads e jobs em andamento. O ocupado é recalculado no
+    máximo a cada usage_ttl segundos. Antes de recusar, os evictors são
+    chamados em ordem (ex.: remover o que já venceu, reduzir o cache).
+    """
+
+    def __init__(self, folders: List[Path], max_bytes: int, min_free_bytes: int, usage_ttl: float = 5,
+                 retry_after: int = 30, max_retry_after: int = 3600,
+                 next_expiry: Optional[Callable[[], Optional[float]]] = None):
+        self.folders = [Path(folder) for folder in folders]
+        self.max_bytes = max_bytes
+        self.min_free_bytes = min_free_bytes
+        self.usage_ttl = usage_ttl
+        self.retry_after = retry_after
+        self.max_retry_after = max_retry_after
+        # Segundos até o próximo arquivo vencer, para o Retry-After do 503
+        self.next_expiry = next_expiry
+
+        self.evictors: List[Callable[[int], None]] = []
+        self.reservations: Dict[int, int] = {}
+        self.reservation_ids = itertools.count(1)
+        self.lock = threading.Lock()
+        self.usage_cache: Optional[int] = None
+        self.usage_time = 0.0
+
+    def add_evictor(self, evictor: Callable[[int], None]):
+        """Registra uma forma de liberar espaço; recebe os bytes que faltam"""
+        self.evictors.append(evictor)
+
+    def usage(self) -> int:
+        """Bytes ocupados nas pastas (hard links contados uma vez)"""
+        with self.lock:
+            if self.usage_cache is not None and time.time() - self.usage_time < self.usage_ttl:
+                return self.usage_cache
+
+        total = 0
+        seen = set()
+        for folder in self.folders:
+            for root, _, files in os.walk(folder):
+                for name in files:
+                    try:
+                        stats = os.stat(os.path.join(root, name))
+                    except OSError:
+                        continue  # Removido durante a varredura
+                    if (stats.st_dev, stats.st_ino) not in seen:
+                        seen.add((stats.st_dev, stats.st_ino))
+                        total += stats.st_size
+
+        with self.lock:
+            self.usage_cache = total
+            self.usage_time = time.time()
+        return total
+
+    def invalidate(self):
+        """Força o recálculo do ocupado (ex.: após gravar ou remover arquivos)"""
+        with self.lock:
+            self.usage_cache = None
+
+    def _capacity(self) -> int:
+        """Espaço disponível sem considerar as reservas"""
+        free = min(shutil.disk_usage(folder).free for folder in self.folders if folder.exists())
+        return min(self.max_bytes - self.usage(), free - self.min_free_bytes)
+
+    def reserve(self, nbytes: int) -> int:
+        """
+        Reserva espaço para um upload ou a saída estimada de um job
+
+        Returns:
+            Identificador da reserva, a ser passado para release
+
+        Raises:
+            DiskQuotaError: se não couber mesmo após os evictors
+        """
+        nbytes = max(0, int(nbytes))
+        capacity = self._capacity()
+
+        if capacity - self._reserved() < nbytes:
+            for evictor in self.evictors:
+                try:
+                    evictor(nbytes - capacity + self._reserved())
+                except Exception as e:
+                    print(f"AVISO: Falha ao liberar espaço: {str(e)}")
+                self.invalidate()
+                capacity = self._capacity()
+                if capacity - self._reserved() >= nbytes:
+                    break
+
+        with self.lock:
+            reserved = sum(self.reservations.values())
+            if capacity - reserved >= nbytes:
+                reservation_id = next(self.reservation_ids)
+                self.reservations[reservation_id] = nbytes
+                return reservation_id
+
+        if capacity >= nbytes:
+            # Cabe assim que os uploads/jobs em andamento terminarem
+            raise DiskQuotaError('Espaço temporariamente reservado por outros processamentos', 429,
+                                 self.retry_after)
+
+        raise DiskQuotaError('Espaço em disco esgotado', 503, self._expiry_retry_after())
+
+    def check(self, nbytes: int):
+        """Confirma que nbytes cabem agora, sem manter reserva (ex.: upload em partes)"""
+        self.release(self.reserve(nbytes))
+
+    def release(self, reservation_id: Optional[int]):
+        """Devolve a reserva; o arquivo gravado passa a contar no ocupado"""
+        with self.lock:
+            self.reservations.pop(reservation_id, None)
+            self.usage_cache = None
+
+    def _reserved(self) -> int:
+        with self.lock:
+            return sum(self.reservations.values())
+
+    def _expiry_retry_after(self) -> int:
+        seconds = self.next_expiry() if self.next_expiry else None
+        if seconds is None:
+            return self.max_retry_after
+        return int(min(self.max_retry_after, max(self.retry_after, seconds)))
@@ -0,0 +1,81 @@
+import mimetypes
+import os
+from pathlib import Path
+from typing import Optional
+from urllib.parse import quote
+
+from flask import Response, send_file
+
+# Tipos que a tabela do sistema pode não conhecer
+EXTRA_MIMETYPES = {
+    '.mkv': 'video/x-matroska',
+    '.webm': 'video/webm',
+    '.ts': 'video/mp2t',
+    '.m3u8': 'application/vnd.apple.mpegurl',
+    '.m4s': 'video/iso.segment',
+    '.mp3': 'audio/mpeg',
+    '.zip': 'application/zip'
+}
+
+
+class DownloadServer:
+    """
+    Entrega os arquivos processados
+
+    Sem offload, usa send_file com respostas condicionais: Range (206/416),
+    If-Range, ETag/If-None-Match e Last-Modified, e o arquivo vai pelo
+    wsgi.file_wrapper (sendfile no gunicorn/uWSGI). Com offload, só devolve o
+    cabeçalho para o proxy da frente (nginx: X-Accel-Redirect; Apache/lighttpd:
+    X-Sendfile), que envia o arquivo e trata Range por conta própria.
+    """
+
+    OFFLOAD_MODES = (None, 'x-accel', 'x-sendfile')
+
+    def __init__(self, offload: Optional[str] = None, accel_prefix: str = '/protected'):
+        if offload not in self.OFFLOAD_MODES:
+            raise ValueError(f"Modo de offload inválido: {offload}")
+        self.offload = offload
+        self.accel_prefix = accel_prefix.rstrip('/')
+
+    def content_type(self, filename: str) -> str:
+        extension = os.path.splitext(filename)[1].lower()
+        if extension in EXTRA_MIMETYPES:
+            return EXTRA_MIMETYPES[extension]
+        return mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+    def send(self, filepath: Path, location: str, download_name: Optional[str] = None,
+             as_attachment: bool = True) -> Response:
+        """
+        Args:
+            filepath: Arquivo a enviar
+            location: Subcaminho interno do proxy para a pasta do arquivo (ex.: 'compressed')
+            download_name: Nome sugerido ao cliente (padrão: nome do arquivo)
+            as_attachment: False para conteúdo consumido pelo navegador (ex.: playlists e segmentos HLS)
+        """
+        filepath = Path(filepath)
+        download_name = download_name or filepath.name
+        mimetype = self.content_type(download_name)
+
+        if self.offload is None:
+            response = send_file(
+                filepath,
+                mimetype=mimetype,
+                as_attachment=as_attachment,
+                download_name=download_name,
+                conditional=True,
+                etag=True
+            )
+            # Anuncia retomada também na resposta completa, não só nas parciais
+            response.headers['Accept-Ranges'] = 'bytes'
+            return response
+
+        response = Response(mimetype=mimetype)
+        if as_attachment:
+            response.headers['Content-Disposition'] = f"attachment; filename*=UTF-8''{quote(download_name)}"
+
+        if self.offload == 'x-accel':
+            response.headers['X-Accel-Redirect'] = f"{self.accel_prefix}/{location}/{quote(filepath.name)}"
+        else:
+            response.headers['X-Sendfile'] = str(filepath.resolve())
+
+        return response
@@ -0,0 +1,199 @@
+import subprocess
+import threading
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+from config.config import Config
+from services.ffmpeg_scheduler import FFmpegScheduler
+from services.media_probe import MediaProbe, media_probe
+
+ProgressCallback = Callable[[Dict[str, Any]], None]
+
+
+class FFmpegError(RuntimeError):
+    """Falha na execução do FFmpeg, com as últimas linhas do stderr"""
+
+    def __init__(self, message: str, stderr: str = ''):
+        super().__init__(message)
+        self.stderr = stderr
+
+
+class _StdinFeed:
+    """Copia um fluxo binário (ex.: corpo da requisição) para o stdin do FFmpeg em blocos"""
+
+    def __init__(self, stream, expected: Optional[int], chunk_size: int):
+        self.stream = stream
+        self.expected = expected
+        self.chunk_size = chunk_size
+        self.sent = 0
+        self.error: Optional[str] = None
+
+    def pump(self, process: subprocess.Popen):
+        pipe = process.stdin.buffer
+        try:
+            for chunk in iter(lambda: self.stream.read(self.chunk_size), b''):
+                pipe.write(chunk)
+                self.sent += len(chunk)
+            if self.expected is not None and self.sent < self.expected:
+                self.error = f"Entrada interrompida após {self.sent} de {self.expected} bytes"
+        except BrokenPipeError:
+            pass  # O FFmpeg encerrou antes; o erro vem pelo código de saída
+        except Exception as e:
+            self.error = f"Falha ao ler a entrada: {str(e)}"
+        finally:
+            try:
+                pipe.close()
+            except OSError:
+                pass
+            if self.error:
+                # Entrada incompleta não pode virar um resultado truncado com sucesso
+                process.kill()
+
+
+class FFmpegRunner:
+    """Executa o FFmpeg lendo o progresso de `-progress pipe:1` linha a linha, com memória limitada"""
+
+    def __init__(self, ffmpeg_path: str = 'ffmpeg', prober: Optional[MediaProbe] = None, stderr_lines: int = 50,
+                 scheduler: Optional[FFmpegScheduler] = None, stdin_chunk_size: int = 1024 * 1024):
+        self.ffmpeg_path = ffmpeg_path
+        self.stdin_chunk_size = stdin_chunk_size
+        # Consultas do ffprobe em cache, compartilhadas com o resumo do upload e o remux
+        self.prober = prober or media_probe
+        self.stderr_lines = stderr_lines
+        self.scheduler = scheduler
+
+    def probe(self, input_path: str) -> Dict[str, Optional[float]]:
+        """Obtém duração (segundos) e taxa de quadros do arquivo pelo probe em cache"""
+        data = self.prober.probe(input_path)
+        return {'duration': self.prober.duration(data), 'fps': self.prober.fps(data)}
+
+    def run(self, command: List[str], input_path: Optional[str] = None,
+            progress_callback: Optional[ProgressCallback] = None, stdin=None,
+            stdin_size: Optional[int] = None) -> None:
+        """
+        Executa um comando FFmpeg reportando o progresso
+
+        Args:
+            command: argv completo, começando pelo executável do ffmpeg
+            input_path: Arquivo de entrada usado para obter a duração total
+            progress_callback: Recebe dicts com percent, out_time, speed, fps e eta
+            stdin: Fluxo binário enviado ao FFmpeg enquanto é lido (comando com '-i pipe:0')
+            stdin_size: Bytes esperados em stdin; menos que isso é entrada interrompida. Sem
+                duração conhecida, o percentual passa a ser pelos bytes já enviados
+        """
+        media = self.probe(input_path) if input_path and progress_callback else {'duration': None, 'fps': None}
+        feed = _StdinFeed(stdin, stdin_size, self.stdin_chunk_size) if stdin is not None else None
+
+        argv = [command[0], '-hide_banner', '-nostats', '-progress', 'pipe:1'] + list(command[1:])
+
+        if not self.scheduler:
+            self._execute(argv, media, progress_callback, feed)
+            return
+
+        # Aguarda vaga no limite global e roda com o orçamento de threads do scheduler
+        with self.scheduler.slot(self.scheduler.requested_threads(argv)) as threads:
+            self._execute(self.scheduler.apply(argv, threads), media, progress_callback, feed)
+
+    def _execute(self, argv: List[str], media: Dict[str, Optional[float]],
+                 progress_callback: Optional[ProgressCallback], feed: Optional[_StdinFeed] = None):
+        process = subprocess.Popen(
+            argv,
+            stdin=subprocess.PIPE if feed else subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True,
+            bufsize=1
+        )
+
+        # Guarda só as últimas linhas do stderr para não crescer sem limite
+        stderr_tail = deque(maxlen=self.stderr_lines)
+        stderr_reader = threading.Thread(target=self._drain, args=(process.stderr, stderr_tail), daemon=True)
+        stderr_reader.start()
+
+        feeder = None
+        if feed:
+            feeder = threading.Thread(target=feed.pump, args=(process,), daemon=True)
+            feeder.start()
+
+        block: Dict[str, str] = {}
+        for line in process.stdout:
+            key, sep, value = line.strip().partition('=')
+            if not sep:
+                continue
+            block[key] = value
+            if key == 'progress':
+                if progress_callback:
+                    progress_callback(self._build_progress(block, media, feed))
+                block = {}
+
+        process.wait()
+        stderr_reader.join()
+        if feeder:
+            feeder.join()
+            if feed.error:
+                raise FFmpegError(f"Erro FFmpeg: {feed.error}")
+
+        if process.returncode != 0:
+            stderr = '\n'.join(stderr_tail)
+            last_line = stderr_tail[-1] if stderr_tail else f"código de saída {process.returncode}"
+            raise FFmpegError(f"Erro FFmpeg: {last_line}", stderr)
+
+    def _drain(self, stream, tail: deque):
+        for line in stream:
+            line = line.rstrip()
+            if line:
+                tail.append(line)
+
+    def _build_progress(self, block: Dict[str, str], media: Dict[str, Optional[float]],
+                        feed: Optional[_StdinFeed] = None) -> Dict[str, Any]:
+        """Calcula percentual e ETA a partir de um bloco key=value do -progress"""
+        duration = media.get('duration')
+        fps = self._to_float(block.get('fps'))
+        speed = self._to_float(block.get('speed', '').rstrip('x'))
+
+        # out_time_us é o campo preciso; out_time_ms também vem em microssegundos
+        out_time_us = self._to_float(block.get('out_time_us')) or self._to_float(block.get('out_time_ms'))
+        out_time = out_time_us / 1_000_000 if out_time_us else None
+
+        # Sem out_time (ex.: N/A no início), estima pela contagem de quadros
+        frame = self._to_float(block.get('frame'))
+        if not out_time and frame and media.get('fps'):
+            out_time = frame / media['fps']
+
+        done = block.get('progress') == 'end'
+        percent = None
+        eta = None
+        if duration and out_time is not None:
+            percent = 100.0 if done else min(99.9, out_time / duration * 100)
+            if speed:
+                eta = max(0.0, (duration - out_time) / speed)
+        elif done:
+            percent = 100.0
+        elif feed and feed.expected:
+            # Entrada por pipe: a duração só é conhecida no fim, usa os bytes já enviados
+            percent = min(99.9, feed.sent / feed.expected * 100)
+
+        return {
+            'percent': round(percent, 1) if percent is not None else None,
+            'out_time': out_time,
+            'duration': duration,
+            'speed': speed,
+            'fps': fps,
+            'eta': round(eta, 1) if eta is not None else None,
+            'done': done
+        }
+
+    def _to_float(self, value: Optional[str]) -> Optional[float]:
+        try:
+            return float(value)
+        except (TypeError, ValueError):
+            return None
+
+
+# Instância compartilhada pelos conversores e compressores
+ffmpeg_runner = FFmpegRunner(scheduler=FFmpegScheduler(
+    cores=Config.FFMPEG_CORES,
+    max_concurrent=Config.FFMPEG_MAX_CONCURRENT,
+    nice=Config.FFMPEG_NICE,
+    ionice_class=Config.FFMPEG_IONICE_CLASS,
+    ionice_level=Config.FFMPEG_IONICE_LEVEL
+), stdin_chunk_size=Config.UPLOAD_BUFFER_SIZE)
@@ -0,0 +1,108 @@
+import os
+import platform
+import threading
+from contextlib import contextmanager
+from shutil import which
+from typing import List, Optional
+
+
+class FFmpegScheduler:
+    """
+    Distribui os núcleos da máquina entre os processos FFmpeg em execução
+
+    Cada execução recebe um orçamento de threads proporcional aos núcleos
+    ainda livres, roda com prioridade reduzida (nice/ionice) e respeita um
+    limite global de processos simultâneos.
+    """
+
+    def __init__(self, cores: Optional[int] = None, max_concurrent: Optional[int] = None,
+                 nice: int = 10, ionice_class: int = 2, ionice_level: int = 7):
+        self.cores = cores or self._host_cores()
+        self.max_concurrent = max_concurrent or max(1, self.cores // 2)
+        self.nice = nice
+        self.ionice_class = ionice_class
+        self.ionice_level = ionice_level
+
+        self.min_threads = max(1, self.cores // self.max_concurrent)
+
+        self.slots = threading.BoundedSemaphore(self.max_concurrent)
+        self.lock = threading.Lock()
+        self.running = 0
+        self.allocated = 0
+
+        self.nice_path = which('nice') if platform.system() != 'Windows' else None
+        self.ionice_path = which('ionice') if platform.system() == 'Linux' else None
+
+    def _host_cores(self) -> int:
+        try:
+            return len(os.sched_getaffinity(0))
+        except AttributeError:
+            return os.cpu_count() or 1
+
+    def free_cores(self) -> int:
+        """Núcleos ainda não reservados por processos FFmpeg em execução"""
+        with self.lock:
+            return max(1, self.cores - self.allocated)
+
+    def stats(self):
+        with self.lock:
+            return {
+                'cores': self.cores,
+                'max_concurrent': self.max_concurrent,
+                'running': self.running,
+                'allocated_threads': self.allocated
+            }
+
+    @contextmanager
+    def slot(self, requested_threads: Optional[int] = None):
+        """
+        Reserva uma vaga de execução e devolve o orçamento de threads
+
+        Bloqueia enquanto o limite global de processos simultâneos estiver atingido.
+        """
+        self.slots.acquire()
+        with self.lock:
+            self.running += 1
+            # Divisão justa entre os processos ativos (no máximo metade da máquina por
+            # processo), limitada ao que ainda está livre, mas nunca abaixo do mínimo
+            # garantido, para que quem chega depois não fique com uma única thread
+            fair_share = max(1, self.cores // max(self.running, 2))
+            budget = max(self.min_threads, min(fair_share, self.cores - self.allocated))
+            if requested_threads:
+                budget = min(budget, requested_threads)
+            self.allocated += budget
+        try:
+            yield budget
+        finally:
+            with self.lock:
+                self.running -= 1
+                self.allocated -= budget
+            self.slots.release()
+
+    def apply(self, command: List[str], threads: int) -> List[str]:
+        """Define -threads do comando e prefixa nice/ionice quando disponíveis"""
+        command = list(command)
+
+        if '-threads' in command:
+            index = command.index('-threads')
+            command[index + 1] = str(threads)
+        else:
+            # -threads é opção de saída: precisa vir antes do arquivo de saída (último argumento)
+            command[-1:-1] = ['-threads', str(threads)]
+
+        prefix = []
+        if self.ionice_path:
+            prefix += [self.ionice_path, '-c', str(self.ionice_class), '-n', str(self.ionice_level)]
+        if self.nice_path and self.nice:
+            prefix += [self.nice_path, '-n', str(self.nice)]
+
+        return prefix + command
+
+    def requested_threads(self, command: List[str]) -> Optional[int]:
+        """Lê o -threads fixado pelo perfil, usado como teto do orçamento"""
+        if '-threads' in command:
+            try:
+                return int(command[command.index('-threads') + 1])
+            except (IndexError, ValueError):
+                return None
+        return None
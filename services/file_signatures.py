@@ -0,0 +1,212 @@
+"""
+Identificação do container real pelo cabeçalho do arquivo (magic numbers)
+
+As assinaturas ficam num índice montado uma vez na importação:
+deslocamento -> primeiro byte -> assinaturas (mais longas primeiro). Assim
+cada arquivo custa uma leitura de HEADER_SIZE bytes e poucas comparações,
+independentemente da extensão informada. Containers que compartilham o
+prefixo (ISO BMFF, RIFF, EBML, ZIP) são refinados pela marca/subtipo, e o
+MPEG-TS, que não tem prefixo fixo, é reconhecido pelo byte de sincronismo
+repetido a cada pacote.
+"""
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Suficiente para três pacotes de M2TS (192 bytes, sincronismo no byte 4)
+HEADER_SIZE = 512
+
+# (deslocamento, assinatura, container)
+SIGNATURES: List[Tuple[int, bytes, str]] = [
+    # Documentos e imagens
+    (0, b'%PDF-', 'pdf'),
+    (0, b'\x89PNG\r\n\x1a\n', 'png'),
+    (0, b'\xff\xd8\xff', 'jpeg'),
+    (0, b'PK\x03\x04', 'zip'),
+    (0, b'\xd0\xcf\x11\xe0\xa1\xb1\x1a\xe1', 'cfb'),  # Compound File (AAF, Office antigo)
+
+    # Áudio
+    (0, b'ID3', 'mp3'),
+    (0, b'\xff\xfb', 'mp3'),  # Quadro MPEG-1 Layer III
+    (0, b'\xff\xfa', 'mp3'),
+    (0, b'\xff\xf3', 'mp3'),  # MPEG-2 Layer III
+    (0, b'\xff\xf2', 'mp3'),
+    (0, b'\xff\xe3', 'mp3'),  # MPEG-2.5 Layer III
+
+    # Containers de vídeo
+    (0, b'RIFF', 'riff'),
+    (0, b'\x1a\x45\xdf\xa3', 'ebml'),
+    (0, b'FLV\x01', 'flv'),
+    (0, b'\x00\x00\x01\xba', 'mpeg-ps'),
+    (0, b'\x00\x00\x01\xb3', 'mpeg-video'),
+    (0, b'\x00\x00\x01\xb0', 'cavs'),
+    (0, b'\x00\x00\x00\x01\x40\x01', 'hevc'),  # Annex B começando pelo VPS
+    (0, b'.RMF', 'realmedia'),
+    (0, b'FWS', 'swf'),
+    (0, b'CWS', 'swf'),
+    (0, b'ZWS', 'swf'),
+    (0, b'OggS', 'ogg'),
+    (0, b'\x30\x26\xb2\x75\x8e\x66\xcf\x11', 'asf'),
+    (0, b'\xb7\xd8\x00\x20\x37\x49\xda\x11', 'wtv'),
+    (0, b'\x06\x0e\x2b\x34\x02\x05\x01\x01', 'mxf'),
+    (0, b'\x1f\x07\x00', 'dv'),
+    (4, b'ftyp', 'isobmff'),
+    # QuickTime antigo sem ftyp: o primeiro átomo já é de conteúdo
+    (4, b'moov', 'mov'),
+    (4, b'mdat', 'mov'),
+    (4, b'wide', 'mov'),
+    (4, b'free', 'mov'),
+    (4, b'skip', 'mov'),
+    (4, b'pnot', 'mov'),
+]
+
+# Marca principal do ftyp (ISO BMFF) -> container
+FTYP_BRANDS = {
+    b'qt  ': 'mov',
+    b'M4V ': 'm4v', b'M4VH': 'm4v', b'M4VP': 'm4v',
+    b'M4A ': 'm4a', b'M4B ': 'm4a',
+    b'f4v ': 'f4v',
+    b'heic': 'heif', b'heix': 'heif', b'mif1': 'heif', b'avif': 'heif',
+}
+FTYP_BRAND_PREFIXES = ((b'3g2', '3g2'), (b'3gp', '3gp'))
+
+RIFF_TYPES = {b'AVI ': 'avi', b'WAVE': 'wav'}
+
+# Containers aceitos para cada extensão
+EXTENSION_CONTAINERS: Dict[str, frozenset] = {
+    # Vídeo
+    '3g2': frozenset({'3g2', '3gp', 'mp4'}),
+    '3gp': frozenset({'3gp', '3g2', 'mp4'}),
+    'aaf': frozenset({'cfb', 'mxf'}),
+    'asf': frozenset({'asf'}),
+    'avchd': frozenset({'mpeg-ts', 'm2ts'}),
+    'avi': frozenset({'avi'}),
+    'cavs': frozenset({'cavs'}),
+    'divx': frozenset({'avi', 'matroska'}),
+    'dv': frozenset({'dv', 'avi', 'mov'}),
+    'f4v': frozenset({'f4v', 'mp4'}),
+    'flv': frozenset({'flv'}),
+    'hevc': frozenset({'hevc'}),
+    'm2ts': frozenset({'m2ts', 'mpeg-ts'}),
+    'm2v': frozenset({'mpeg-video', 'mpeg-ps'}),
+    'm4v': frozenset({'m4v', 'mp4'}),
+    'mjpeg': frozenset({'jpeg'}),
+    'mkv': frozenset({'matroska', 'webm'}),
+    'mod': frozenset({'mpeg-ps'}),
+    'mov': frozenset({'mov', 'mp4'}),
+    'mp4': frozenset({'mp4', 'mov', 'm4v', '3gp'}),
+    'mpeg': frozenset({'mpeg-ps', 'mpeg-video', 'mpeg-ts'}),
+    'mpeg-2': frozenset({'mpeg-ps', 'mpeg-video', 'mpeg-ts'}),
+    'mpg': frozenset({'mpeg-ps', 'mpeg-video', 'mpeg-ts'}),
+    'mts': frozenset({'m2ts', 'mpeg-ts'}),
+    'mxf': frozenset({'mxf'}),
+    'ogv': frozenset({'ogg'}),
+    'rm': frozenset({'realmedia'}),
+    'rmvb': frozenset({'realmedia'}),
+    'swf': frozenset({'swf'}),
+    'tod': frozenset({'mpeg-ps', 'mpeg-ts', 'm2ts'}),
+    'ts': frozenset({'mpeg-ts', 'm2ts'}),
+    'vob': frozenset({'mpeg-ps'}),
+    'webm': frozenset({'webm', 'matroska'}),
+    'wmv': frozenset({'asf'}),
+    'wtv': frozenset({'wtv'}),
+    'xvid': frozenset({'avi'}),
+    # Áudio
+    'mp3': frozenset({'mp3'}),
+    'wav': frozenset({'wav'}),
+    # Documentos e imagens (csv é texto e não tem assinatura)
+    'pdf': frozenset({'pdf'}),
+    'png': frozenset({'png'}),
+    'jpg': frozenset({'jpeg'}),
+    'jpeg': frozenset({'jpeg'}),
+    'docx': frozenset({'docx', 'ooxml'}),
+    'xlsx': frozenset({'xlsx', 'ooxml'}),
+}
+
+VIDEO_EXTENSIONS = frozenset({
+    '3g2', '3gp', 'aaf', 'asf', 'avchd', 'avi', 'cavs', 'divx', 'dv', 'f4v', 'flv', 'hevc', 'm2ts',
+    'm2v', 'm4v', 'mjpeg', 'mkv', 'mod', 'mov', 'mp4', 'mpeg', 'mpeg-2', 'mpg', 'mts', 'mxf', 'ogv',
+    'rm', 'rmvb', 'swf', 'tod', 'ts', 'vob', 'webm', 'wmv', 'wtv', 'xvid'
+})
+
+
+def _build_index(signatures: List[Tuple[int, bytes, str]]) -> Dict[int, Dict[int, List[Tuple[bytes, str]]]]:
+    """deslocamento -> primeiro byte -> [(assinatura, container)], mais longas primeiro"""
+    index: Dict[int, Dict[int, List[Tuple[bytes, str]]]] = {}
+    for offset, magic, container in sorted(signatures, key=lambda item: (item[0], -len(item[1]))):
+        index.setdefault(offset, {}).setdefault(magic[0], []).append((magic, container))
+    return index
+
+
+SIGNATURE_INDEX = _build_index(SIGNATURES)
+
+
+def _refine_isobmff(header: bytes) -> str:
+    brand = header[8:12]
+    if brand in FTYP_BRANDS:
+        return FTYP_BRANDS[brand]
+    for prefix, container in FTYP_BRAND_PREFIXES:
+        if brand.startswith(prefix):
+            return container
+    return 'mp4'  # isom, mp41, mp42, avc1, dash...
+
+
+def _refine_riff(header: bytes) -> str:
+    return RIFF_TYPES.get(header[8:12], 'riff')
+
+
+def _refine_ebml(header: bytes) -> str:
+    # O DocType fica no cabeçalho EBML, logo no início
+    return 'webm' if b'webm' in header[:64] else 'matroska'
+
+
+def _refine_zip(header: bytes) -> str:
+    # Office Open XML: o primeiro membro costuma ser [Content_Types].xml ou já a pasta do tipo
+    if b'word/' in header:
+        return 'docx'
+    if b'xl/' in header:
+        return 'xlsx'
+    if b'[Content_Types].xml' in header:
+        return 'ooxml'
+    return 'zip'
+
+
+REFINERS: Dict[str, Callable[[bytes], str]] = {
+    'isobmff': _refine_isobmff,
+    'riff': _refine_riff,
+    'ebml': _refine_ebml,
+    'zip': _refine_zip,
+}
+
+# (container, tamanho do pacote, deslocamento do byte de sincronismo)
+SYNC_PATTERNS = (('mpeg-ts', 188, 0), ('m2ts', 192, 4))
+TS_SYNC_BYTE = 0x47
+TS_SYNC_PACKETS = 3
+
+
+def detect_container(header: bytes) -> Optional[str]:
+    """Container identificado pelo cabeçalho ou None se nenhuma assinatura bater"""
+    for offset, buckets in SIGNATURE_INDEX.items():
+        if len(header) <= offset:
+            break
+        for magic, container in buckets.get(header[offset], ()):
+            if header.startswith(magic, offset):
+                refiner = REFINERS.get(container)
+                return refiner(header) if refiner else container
+
+    for container, packet_size, offset in SYNC_PATTERNS:
+        last = offset + packet_size * (TS_SYNC_PACKETS - 1)
+        if len(header) > last and all(
+            header[position] == TS_SYNC_BYTE for position in range(offset, last + 1, packet_size)
+        ):
+            return container
+
+    return None
+
+
+def read_header(filepath: str, size: int = HEADER_SIZE) -> bytes:
+    with open(filepath, 'rb') as f:
+        return f.read(size)
+
+
+def matches_extension(container: Optional[str], extension: str) -> bool:
+    """Se o container detectado é um dos esperados para a extensão"""
+    return container in EXTENSION_CONTAINERS.get(extension.lower(), ())
@@ -0,0 +1,159 @@
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class JobQueue:
+    """Fila de processamento assíncrono com pool limitado de workers"""
+
+    FINISHED_STATES = ('done',)
+
+    def __init__(self, max_workers: int = 2, max_pending: int = 20, retention: int = 3600,
+                 max_batch_pending: int = 1000):
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='job-worker')
+        self.max_pending = max_pending
+        # Itens de lote têm limite próprio para um lote grande não recusar os jobs avulsos
+        self.max_batch_pending = max_batch_pending
+        self.retention = retention
+        self.jobs: Dict[str, Dict[str, Any]] = {}
+        self.condition = threading.Condition()
+
+    def submit(self, func: Callable[..., Dict[str, Any]], *args, **kwargs) -> Optional[str]:
+        """
+        Enfileira uma função para execução em background
+
+        A função recebe o argumento nomeado `progress_callback`, que publica
+        o progresso no estado do job.
+
+        Returns:
+            O id do job ou None se a fila estiver cheia
+        """
+        with self.condition:
+            self._prune_finished()
+
+            if self._pending(batch=False) >= self.max_pending:
+                return None
+
+            job_id = self._create_job(batch=False)
+
+        self.executor.submit(self._run, job_id, func, args, kwargs)
+        return job_id
+
+    def submit_many(self, func: Callable[..., Dict[str, Any]],
+                    calls: List[Tuple[tuple, Dict[str, Any]]]) -> Optional[List[str]]:
+        """
+        Enfileira os itens de um lote de uma vez (todos ou nenhum)
+
+        Args:
+            calls: Lista de (args, kwargs) para cada chamada de func
+
+        Returns:
+            Os ids dos jobs, na ordem de calls, ou None se não couberem na fila de lotes
+        """
+        with self.condition:
+            self._prune_finished()
+
+            if self._pending(batch=True) + len(calls) > self.max_batch_pending:
+                return None
+
+            job_ids = [self._create_job(batch=True) for _ in calls]
+
+        for job_id, (args, kwargs) in zip(job_ids, calls):
+            self.executor.submit(self._run, job_id, func, args, kwargs)
+        return job_ids
+
+    def _pending(self, batch: bool) -> int:
+        return sum(
+            1 for job in self.jobs.values()
+            if job['batch'] == batch and job['state'] not in self.FINISHED_STATES
+        )
+
+    def _create_job(self, batch: bool) -> str:
+        job_id = uuid.uuid4().hex
+        self.jobs[job_id] = {
+            'job_id': job_id,
+            'state': 'queued',
+            'batch': batch,
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            'progress': None,
+            'result': None,
+            'version': 0
+        }
+        return job_id
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Retorna uma cópia do estado atual do job"""
+        with self.condition:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_update(self, job_id: str, last_version: int, timeout: float = 15) -> Optional[Dict[str, Any]]:
+        """Bloqueia até o job mudar de versão ou o timeout expirar"""
+        with self.condition:
+            self.condition.wait_for(
+                lambda: job_id not in self.jobs or self.jobs[job_id]['version'] != last_version,
+                timeout=timeout
+            )
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
+
+    def wait_for_finished(self, job_ids: List[str], seen: set, timeout: float = 15) -> List[Dict[str, Any]]:
+        """
+        Bloqueia até algum dos jobs terminar (fora os já vistos) ou o timeout expirar
+
+        Returns:
+            Cópias dos jobs finalizados ainda não vistos; jobs já descartados voltam como None no estado
+        """
+        def finished():
+            return [
+                job_id for job_id in job_ids
+                if job_id not in seen
+                and (job_id not in self.jobs or self.jobs[job_id]['state'] in self.FINISHED_STATES)
+            ]
+
+        with self.condition:
+            self.condition.wait_for(finished, timeout=timeout)
+            return [
+                dict(self.jobs[job_id]) if job_id in self.jobs else {'job_id': job_id, 'state': None, 'result': None}
+                for job_id in finished()
+            ]
+
+    def _update(self, job_id: str, **changes):
+        with self.condition:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return
+            job.update(changes)
+            job['version'] += 1
+            self.condition.notify_all()
+
+    def _run(self, job_id: str, func: Callable[..., Dict[str, Any]], args, kwargs):
+        self._update(job_id, state='running', started=time.time())
+
+        def progress_callback(progress: Dict[str, Any]):
+            self._update(job_id, progress=progress)
+
+        try:
+            result = func(*args, progress_callback=progress_callback, **kwargs)
+        except Exception as e:
+            result = {
+                'status': 'error',
+                'message': 'Erro interno no processamento',
+                'details': str(e),
+                'error_type': type(e).__name__
+            }
+        self._update(job_id, state='done', finished=time.time(), result=result)
+
+    def _prune_finished(self):
+        """Remove jobs finalizados há mais tempo que o período de retenção"""
+        limit = time.time() - self.retention
+        expired = [
+            job_id for job_id, job in self.jobs.items()
+            if job['state'] in self.FINISHED_STATES and job['finished'] < limit
+        ]
+        for job_id in expired:
+            del self.jobs[job_id]
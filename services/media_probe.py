@@ -0,0 +1,149 @@
+import json
+import os
+import subprocess
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+from config.config import Config
+
+
+class MediaProbe:
+    """
+    Consulta streams e container de um arquivo de mídia com ffprobe
+
+    Cada arquivo é consultado uma única vez: o resultado fica em cache pela
+    identidade do arquivo (caminho, tamanho e mtime), então o resumo do upload,
+    o planejamento do remux e o progresso do FFmpeg reaproveitam a mesma
+    chamada. Pedidos simultâneos do mesmo arquivo esperam a chamada em curso.
+    """
+
+    def __init__(self, ffprobe_path: str = 'ffprobe', max_entries: int = 256):
+        self.ffprobe_path = ffprobe_path
+        self.max_entries = max_entries
+        self.cache: 'OrderedDict[Tuple[str, int, int], Optional[Dict[str, Any]]]' = OrderedDict()
+        # Identidade -> evento da consulta em andamento
+        self.in_flight: Dict[Tuple[str, int, int], threading.Event] = {}
+        self.lock = threading.Lock()
+
+    def _identity(self, input_path: str) -> Optional[Tuple[str, int, int]]:
+        try:
+            stats = os.stat(input_path)
+        except OSError:
+            return None
+        return os.path.realpath(input_path), stats.st_size, stats.st_mtime_ns
+
+    def probe(self, input_path: str) -> Optional[Dict[str, Any]]:
+        """Retorna o JSON de `ffprobe -show_streams -show_format` ou None se o arquivo não puder ser lido"""
+        key = self._identity(input_path)
+        if key is None:
+            return None
+
+        while True:
+            with self.lock:
+                if key in self.cache:
+                    self.cache.move_to_end(key)
+                    return self.cache[key]
+                pending = self.in_flight.get(key)
+                if pending is None:
+                    pending = self.in_flight[key] = threading.Event()
+                    break
+            pending.wait()
+
+        try:
+            result = self._run_ffprobe(input_path)
+            with self.lock:
+                self.cache[key] = result
+                while len(self.cache) > self.max_entries:
+                    self.cache.popitem(last=False)
+            return result
+        finally:
+            with self.lock:
+                del self.in_flight[key]
+            pending.set()
+
+    def _run_ffprobe(self, input_path: str) -> Optional[Dict[str, Any]]:
+        cmd = [
+            self.ffprobe_path, '-v', 'error',
+            '-show_streams', '-show_format',
+            '-of', 'json',
+            str(input_path)
+        ]
+        try:
+            return json.loads(subprocess.check_output(cmd, stderr=subprocess.DEVNULL))
+        except (subprocess.CalledProcessError, OSError, ValueError):
+            return None
+
+    def streams(self, probe: Optional[Dict[str, Any]], codec_type: str) -> List[Dict[str, Any]]:
+        """Filtra os streams de um tipo, ignorando capas (attached_pic) nos streams de vídeo"""
+        if not probe:
+            return []
+        return [
+            stream for stream in probe.get('streams', [])
+            if stream.get('codec_type') == codec_type
+            and not stream.get('disposition', {}).get('attached_pic')
+        ]
+
+    def duration(self, probe: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Duração do container em segundos"""
+        return self._number((probe or {}).get('format', {}).get('duration'), float)
+
+    def fps(self, probe: Optional[Dict[str, Any]]) -> Optional[float]:
+        """Taxa de quadros média do primeiro stream de vídeo"""
+        for stream in self.streams(probe, 'video'):
+            return self.parse_rate(stream.get('avg_frame_rate'))
+        return None
+
+    def parse_rate(self, rate: Optional[str]) -> Optional[float]:
+        """Converte uma taxa no formato '30000/1001' em float"""
+        try:
+            num, den = (rate or '').split('/')
+            return float(num) / float(den) if float(den) else None
+        except ValueError:
+            return None
+
+    def summary(self, probe: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+        """Resumo para exibição: container, duração, bitrate e os principais dados de cada stream"""
+        if not probe:
+            return None
+
+        container = probe.get('format', {})
+        summary = {
+            'container': container.get('format_name'),
+            'duration': self.duration(probe),
+            'bitrate': self._number(container.get('bit_rate'), int),
+            'video': [],
+            'audio': [],
+            'subtitles': len(self.streams(probe, 'subtitle'))
+        }
+
+        for stream in self.streams(probe, 'video'):
+            summary['video'].append({
+                'codec': stream.get('codec_name'),
+                'profile': stream.get('profile'),
+                'width': stream.get('width'),
+                'height': stream.get('height'),
+                'fps': self.parse_rate(stream.get('avg_frame_rate')),
+                'pix_fmt': stream.get('pix_fmt'),
+                'bitrate': self._number(stream.get('bit_rate'), int)
+            })
+
+        for stream in self.streams(probe, 'audio'):
+            summary['audio'].append({
+                'codec': stream.get('codec_name'),
+                'sample_rate': self._number(stream.get('sample_rate'), int),
+                'channels': stream.get('channels'),
+                'bitrate': self._number(stream.get('bit_rate'), int),
+                'language': stream.get('tags', {}).get('language')
+            })
+
+        return summary
+
+    def _number(self, value, kind):
+        try:
+            return kind(value)
+        except (TypeError, ValueError):
+            return None
+
+
+# Instância compartilhada
+media_probe = MediaProbe(max_entries=Config.MEDIA_PROBE_CACHE_ENTRIES)
@@ -0,0 +1,131 @@
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict
+
+
+class ResultCache:
+    """
+    Cache em disco de resultados de conversão/compressão, endereçado pelo conteúdo da entrada
+
+    As entradas são hard links compartilhados com os arquivos entregues, então
+    o último uso (LRU) fica num índice próprio e não no mtime: tocar o inode
+    estenderia a retenção de todos os downloads ligados a ele.
+    """
+
+    INDEX_NAME = 'recency.json'
+
+    def __init__(self, cache_folder: Path, max_bytes: int, read_buffer_size: int = 1024 * 1024):
+        self.cache_folder = Path(cache_folder)
+        self.max_bytes = max_bytes
+        self.read_buffer_size = read_buffer_size
+        self.lock = threading.Lock()
+        self.recency: Dict[str, float] = {}
+        self._load_index()
+
+    def file_digest(self, filepath: str) -> str:
+        """Calcula o BLAKE2b do conteúdo do arquivo em blocos"""
+        digest = hashlib.blake2b(digest_size=32)
+        with open(filepath, 'rb') as f:
+            for chunk in iter(lambda: f.read(self.read_buffer_size), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+
+    def make_key(self, content_digest: str, action: str, params: Dict[str, Any]) -> str:
+        """Chave = hash do conteúdo + ação + parâmetros (perfil, CRF, qualidade...)"""
+        payload = json.dumps([content_digest, action, params], sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode('utf-8'), digest_size=32).hexdigest()
+
+    def _entry_path(self, key: str, extension: str) -> Path:
+        return self.cache_folder / key[:2] / f"{key}{extension}"
+
+    def fetch(self, key: str, extension: str, output_path: str) -> bool:
+        """Copia (hard link quando possível) o resultado em cache para output_path"""
+        entry = self._entry_path(key, extension)
+
+        with self.lock:
+            if not entry.exists():
+                return False
+
+            # Marca a entrada como recém-usada (LRU) só no índice
+            self.recency[entry.name] = time.time()
+            self._link_or_copy(entry, output_path)
+
+        return True
+
+    def store(self, key: str, extension: str, output_path: str):
+        """Adiciona um resultado ao cache e aplica a evicção por tamanho"""
+        entry = self._entry_path(key, extension)
+
+        with self.lock:
+            entry.parent.mkdir(parents=True, exist_ok=True)
+            temp_path = entry.with_name(entry.name + '.tmp')
+            self._link_or_copy(output_path, temp_path)
+            os.replace(temp_path, entry)
+            self.recency[entry.name] = time.time()
+            self._evict(self.max_bytes)
+            self._save_index()
+
+    def release_space(self, nbytes: int):
+        """Remove as entradas menos usadas até liberar nbytes (ex.: disco cheio)"""
+        with self.lock:
+            self._evict(max(0, self._total_bytes() - nbytes))
+            self._save_index()
+
+    def _total_bytes(self) -> int:
+        return sum(path.stat().st_size for path in self.cache_folder.glob('*/*') if not path.name.endswith('.tmp'))
+
+    def _load_index(self):
+        """Carrega o último uso de cada entrada (índice ausente/corrompido = ordem pelo mtime)"""
+        try:
+            with open(self.cache_folder / self.INDEX_NAME, 'r', encoding='utf-8') as f:
+                self.recency = {str(name): float(used) for name, used in json.load(f).items()}
+        except (OSError, ValueError, AttributeError):
+            self.recency = {}
+
+    def _save_index(self):
+        """Grava o índice de forma atômica (chamado com o lock)"""
+        index_path = self.cache_folder / self.INDEX_NAME
+        temp_path = index_path.with_name(index_path.name + '.tmp')
+        try:
+            self.cache_folder.mkdir(parents=True, exist_ok=True)
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.recency, f)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"AVISO: Não foi possível gravar o índice do cache: {str(e)}")
+
+    def _link_or_copy(self, source, destination):
+        """Hard link evita duplicar bytes em disco; cópia quando estiver em outro filesystem"""
+        if os.path.exists(destination):
+            os.remove(destination)
+        try:
+            os.link(source, destination)
+        except OSError:
+            shutil.copyfile(source, destination)
+
+    def _evict(self, max_bytes: int):
+        """Remove as entradas usadas há mais tempo até o cache caber em max_bytes"""
+        entries = []
+        total = 0
+        for path in self.cache_folder.glob('*/*'):
+            if path.name.endswith('.tmp'):
+                continue
+            stats = path.stat()
+            entries.append((self.recency.get(path.name, stats.st_mtime), stats.st_size, path))
+            total += stats.st_size
+
+        entries.sort()
+        for _, size, path in entries:
+            if total <= max_bytes:
+                break
+            try:
+                path.unlink()
+                self.recency.pop(path.name, None)
+                total -= size
+            except OSError as e:
+                print(f"AVISO: Não foi possível remover do cache {path}: {str(e)}")
@@ -0,0 +1,227 @@
+import heapq
+import os
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class RetentionManager:
+    """
+    Remove uploads e resultados expirados com uma única thread de varredura
+
+    Cada arquivo vence em max(mtime + TTL da pasta, prazo estendido) e nunca
+    enquanto estiver em uso (download em andamento ou job pendente). Os
+    vencimentos ficam num heap; ao sair do heap o prazo é recalculado, então
+    estender um prazo não exige remover a entrada antiga. Na inicialização e
+    periodicamente as pastas são varridas para adotar arquivos deixados por
+    uma execução anterior. Em pastas registradas com directories=True cada
+    resultado é uma subpasta (ex.: streaming HLS), que vence e é removida
+    inteira; o mtime dela muda a cada arquivo novo gravado dentro.
+    """
+
+    def __init__(self, sweep_interval: float = 60, scan_interval: float = 3600, batch_size: int = 200,
+                 download_grace: float = 600):
+        self.sweep_interval = sweep_interval
+        self.scan_interval = scan_interval
+        self.batch_size = batch_size
+        self.download_grace = download_grace
+
+        self.folders: Dict[Path, Dict[str, Any]] = {}
+        self.heap: List[Tuple[float, str]] = []
+        # Caminho -> {'hold_until', 'active', 'scheduled'}
+        self.entries: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+        self.wakeup = threading.Event()
+        self.thread: Optional[threading.Thread] = None
+        self.last_scan = 0.0
+
+    def add_folder(self, folder: Path, ttl: float, skip_suffixes: Tuple[str, ...] = (),
+                   on_delete: Optional[Callable[[Path], None]] = None, directories: bool = False):
+        """
+        Registra uma pasta gerenciada
+
+        Args:
+            skip_suffixes: Arquivos auxiliares que não vencem sozinhos (ex.: digests dos uploads)
+            on_delete: Chamado após remover um arquivo, para limpar os arquivos auxiliares
+            directories: As entradas controladas são subpastas, não arquivos
+        """
+        self.folders[Path(folder).resolve()] = {
+            'ttl': ttl,
+            'skip_suffixes': skip_suffixes,
+            'on_delete': on_delete,
+            'directories': directories
+        }
+
+    def start(self):
+        """Adota os arquivos existentes e inicia a thread de varredura"""
+        self.scan()
+        self.thread = threading.Thread(target=self._run, name='retention-sweeper', daemon=True)
+        self.thread.start()
+
+    def _spec(self, path: Path) -> Optional[Dict[str, Any]]:
+        return self.folders.get(path.parent.resolve())
+
+    def _entry(self, key: str) -> Dict[str, Any]:
+        return self.entries.setdefault(key, {'hold_until': 0.0, 'active': 0, 'scheduled': None})
+
+    def _schedule(self, key: str, due: float):
+        """Coloca no heap só se o novo vencimento for antes do já agendado"""
+        entry = self._entry(key)
+        if entry['scheduled'] is None or due < entry['scheduled']:
+            entry['scheduled'] = due
+            heapq.heappush(self.heap, (due, key))
+            self.wakeup.set()
+
+    def track(self, path, ttl: Optional[float] = None):
+        """Passa a controlar um arquivo; ttl estende o prazo além do TTL da pasta"""
+        path = Path(path)
+        spec = self._spec(path)
+        if spec is None:
+            return
+        try:
+            mtime = os.stat(path).st_mtime
+        except OSError:
+            return
+
+        key = str(path.resolve())
+        with self.lock:
+            entry = self._entry(key)
+            if ttl:
+                entry['hold_until'] = max(entry['hold_until'], time.time() + ttl)
+            self._schedule(key, max(mtime + spec['ttl'], entry['hold_until']))
+
+    def touch(self, path, seconds: Optional[float] = None):
+        """Estende o prazo (ex.: a cada requisição de download)"""
+        self.track(path, seconds or self.download_grace)
+
+    def acquire(self, path):
+        """Marca o arquivo em uso (ex.: job pendente): não é removido até o release correspondente"""
+        key = str(Path(path).resolve())
+        with self.lock:
+            self._entry(key)['active'] += 1
+
+    def release(self, path):
+        """Fim do uso; o arquivo ainda fica disponível por download_grace"""
+        path = Path(path)
+        key = str(path.resolve())
+        with self.lock:
+            entry = self._entry(key)
+            entry['active'] = max(0, entry['active'] - 1)
+            if not entry['active'] and entry['scheduled'] is None and not path.exists():
+                del self.entries[key]  # Arquivo já removido (ex.: original após o processamento)
+                return
+        self.track(path, self.download_grace)
+
+    def scan(self):
+        """Adota arquivos não controlados (ex.: deixados antes de um reinício), com vencimento pelo mtime"""
+        for folder, spec in self.folders.items():
+            try:
+                items = list(os.scandir(folder))
+            except OSError:
+                continue
+            for item in items:
+                is_entry = item.is_dir(follow_symlinks=False) if spec['directories'] \
+                    else item.is_file(follow_symlinks=False)
+                if not is_entry:
+                    continue
+                if spec['skip_suffixes'] and item.name.endswith(spec['skip_suffixes']):
+                    continue
+                with self.lock:
+                    known = item.path in self.entries
+                if not known:
+                    self.track(item.path)
+        self.last_scan = time.time()
+
+    def sweep(self) -> int:
+        """Remove um lote de arquivos vencidos; devolve quantos foram removidos"""
+        now = time.time()
+        due_keys = []
+        with self.lock:
+            while self.heap and self.heap[0][0] <= now and len(due_keys) < self.batch_size:
+                due, key = heapq.heappop(self.heap)
+                entry = self.entries.get(key)
+                if entry is None or entry['scheduled'] != due:
+                    continue  # Agendamento substituído por outro mais cedo
+                entry['scheduled'] = None
+                due_keys.append(key)
+
+        removed = []
+        for key in due_keys:
+            path = Path(key)
+            spec = self._spec(path)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                mtime = None
+
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is None:
+                    continue
+                if mtime is None or spec is None:
+                    if not entry['active']:
+                        del self.entries[key]  # Já removido por outro caminho
+                    continue
+
+                due = max(mtime + spec['ttl'], entry['hold_until'])
+                if entry['active']:
+                    due = max(due, now + self.download_grace)
+                if due > now:
+                    self._schedule(key, due)
+                    continue
+
+                # Remove sob o lock para não competir com um acquire simultâneo
+                del self.entries[key]
+                try:
+                    if spec['directories']:
+                        shutil.rmtree(path)
+                    else:
+                        os.remove(path)
+                except OSError:
+                    continue
+            removed.append((path, spec))
+
+        for path, spec in removed:
+            if spec['on_delete']:
+                try:
+                    spec['on_delete'](path)
+                except Exception as e:
+                    print(f"AVISO: Falha na limpeza após remover {path}: {str(e)}")
+
+        return len(removed)
+
+    def sweep_all(self) -> int:
+        """Remove agora tudo o que já venceu, em lotes (ex.: quando falta espaço)"""
+        total = 0
+        while True:
+            removed = self.sweep()
+            total += removed
+            if removed < self.batch_size:
+                return total
+
+    def next_due(self) -> Optional[float]:
+        """Segundos até o próximo vencimento agendado (None se não houver arquivos controlados)"""
+        with self.lock:
+            if not self.heap:
+                return None
+            return max(0.0, self.heap[0][0] - time.time())
+
+    def _run(self):
+        while True:
+            # Limpa antes de calcular o próximo vencimento para não perder um agendamento novo
+            self.wakeup.clear()
+            try:
+                self.sweep_all()
+                if time.time() - self.last_scan >= self.scan_interval:
+                    self.scan()
+            except Exception as e:
+                print(f"AVISO: Falha na varredura de retenção: {str(e)}")
+
+            with self.lock:
+                next_due = self.heap[0][0] if self.heap else None
+            timeout = self.sweep_interval
+            if next_due is not None:
+                timeout = min(timeout, max(0.0, next_due - time.time()))
+            self.wakeup.wait(timeout)
@@ -0,0 +1,61 @@
+import os
+import zipfile
+from typing import Iterator, List
+
+
+class _ChunkSink:
+    """Destino sem seek para o ZipFile: acumula os bytes até serem repassados ao cliente"""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def drain(self) -> bytes:
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+
+class ZipStream:
+    """
+    Monta um ZIP entregando os bytes à medida que as entradas são adicionadas
+
+    Como o destino não tem seek, o zipfile grava cada entrada com data
+    descriptor e nada precisa ser reescrito depois: o cliente recebe a
+    entrada enquanto ela é lida do disco e só o bloco atual fica em memória.
+    """
+
+    def __init__(self, compression: int = zipfile.ZIP_STORED, chunk_size: int = 1024 * 1024):
+        self.sink = _ChunkSink()
+        self.archive = zipfile.ZipFile(self.sink, 'w', compression, allowZip64=True)
+        self.chunk_size = chunk_size
+
+    def add_file(self, path: str, arcname: str) -> Iterator[bytes]:
+        """Adiciona um arquivo do disco, produzindo os bytes do ZIP em blocos"""
+        force_zip64 = os.path.getsize(path) >= zipfile.ZIP64_LIMIT
+        with open(path, 'rb') as source, self.archive.open(arcname, 'w', force_zip64=force_zip64) as entry:
+            for chunk in iter(lambda: source.read(self.chunk_size), b''):
+                entry.write(chunk)
+                data = self.sink.drain()
+                if data:
+                    yield data
+
+        data = self.sink.drain()
+        if data:
+            yield data
+
+    def add_bytes(self, data: bytes, arcname: str) -> bytes:
+        """Adiciona uma entrada pequena gerada em memória (ex.: relatório do lote)"""
+        self.archive.writestr(arcname, data)
+        return self.sink.drain()
+
+    def close(self) -> bytes:
+        """Finaliza o diretório central e devolve os últimos bytes"""
+        self.archive.close()
+        return self.sink.drain()
@@ -61,9 +61,31 @@ document.addEventListener('DOMContentLoaded', function() {
             <p><strong>Tipo:</strong> ${currentFile.summary.type}</p>
             <p><strong>Criado em:</strong> ${currentFile.summary.created}</p>
             <p><strong>Modificado em:</strong> ${currentFile.summary.modified}</p>
+            ${describeMedia(currentFile.summary.media)}
         `;
     };
 
+    const describeMedia = (media) => {
+        if (!media) return '';
+
+        const lines = [];
+        if (media.duration) {
+            lines.push(`<p><strong>Duração:</strong> ${new Date(media.duration * 1000).toISOString().substr(11, 8)}</p>`);
+        }
+        media.video.forEach(video => {
+            const fps = video.fps ? ` @ ${video.fps.toFixed(2)} fps` : '';
+            lines.push(`<p><strong>Vídeo:</strong> ${video.codec} ${video.width}x${video.height}${fps}</p>`);
+        });
+        media.audio.forEach(audio => {
+            const channels = audio.channels ? `, ${audio.channels} canais` : '';
+            lines.push(`<p><strong>Áudio:</strong> ${audio.codec} ${audio.sample_rate || ''} Hz${channels}</p>`);
+        });
+        if (media.bitrate) {
+            lines.push(`<p><strong>Bitrate:</strong> ${Math.round(media.bitrate / 1000)} kb/s</p>`);
+        }
+        return lines.join('');
+    };
+
     const createActionButton = (action, label, color = '#4CAF50' , isSubButton = false) => {
         const button = document.createElement('button');
         button.type = 'button';
@@ -127,11 +149,29 @@ document.addEventListener('DOMContentLoaded', function() {
                 newSubContainer.appendChild(createActionButton(
                     'split_pdf_range', 'Por intervalo', '#2196F3', true
                 ));
+                newSubContainer.appendChild(createActionButton(
+                    'split_pdf_every', 'A cada N páginas', '#2196F3', true
+                ));
                 newSubContainer.appendChild(createActionButton(
                     'split_pdf_single', 'Separar páginas', '#2196F3', true
                 ));
                 break;
                 
+            case 'merge_pdf':
+                newSubContainer.appendChild(createActionButton(
+                    'merge_pdf_files', 'Escolher outros PDFs', '#9C27B0', true
+                ));
+                break;
+
+            case 'rasterize_pdf':
+                newSubContainer.appendChild(createActionButton(
+                    'rasterize_pdf_jpg', 'JPG (150 DPI)', '#795548', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'rasterize_pdf_png', 'PNG (150 DPI)', '#795548', true
+                ));
+                break;
+
             case 'convert_to_mp4':
                 // Exemplo para vídeos - pode adicionar opções de qualidade
                 newSubContainer.appendChild(createActionButton(
@@ -144,10 +184,35 @@ document.addEventListener('DOMContentLoaded', function() {
             case 'convert_to_mp3':
                 // Exemplo para vídeos - pode adicionar opções de qualidade
                 newSubContainer.appendChild(createActionButton(
-                    'convert_to_mp3_fast', 'Conversão Rápida', '#FF9800', true
+                    'convert_to_mp3_fast', 'Conversão Rápida (128 kbps)', '#FF9800', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'convert_to_mp3_vbr2', 'Equilibrada (VBR)', '#FF9800', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'convert_to_mp3_hq', 'Alta Qualidade (VBR V0)', '#FF5722', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'convert_to_mp3_cbr320', '320 kbps', '#FF5722', true
+                ));
+                break;
+            case 'compress_mp4':
+                newSubContainer.appendChild(createActionButton(
+                    'compress_mp4_28', 'Boa qualidade (CRF 28)', '#4CAF50', true
                 ));
                 newSubContainer.appendChild(createActionButton(
-                    'convert_to_mp3_hq', 'Alta Qualidade', '#FF5722', true
+                    'compress_mp4_24', 'Melhor qualidade (CRF 24)', '#2196F3', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'compress_mp4_target', 'Caber em um tamanho (MB)', '#009688', true
+                ));
+                break;
+            case 'convert_to_hls':
+                newSubContainer.appendChild(createActionButton(
+                    'convert_to_hls_fmp4', 'HLS fMP4 (players atuais)', '#3F51B5', true
+                ));
+                newSubContainer.appendChild(createActionButton(
+                    'convert_to_hls_ts', 'HLS MPEG-TS (compatibilidade)', '#3F51B5', true
                 ));
                 break;
         }
@@ -192,14 +257,14 @@ document.addEventListener('DOMContentLoaded', function() {
                 actionButtons.appendChild(createActionButton(
                     'merge_pdf', 'Juntar PDFs', '#9C27B0'
                 ));
+                actionButtons.appendChild(createActionButton(
+                    'rasterize_pdf', 'PDF para JPG', '#795548'
+                ));
             }
             // Ações para MP4
             else if (summary?.type === 'mp4') {
                 actionButtons.appendChild(createActionButton(
-                    'compress_mp4_28', 'Comprimir (Boa qualidade)', '#4CAF50'
-                ));
-                actionButtons.appendChild(createActionButton(
-                    'compress_mp4_24', 'Comprimir (Melhor qualidade)', '#2196F3'
+                    'compress_mp4', 'Comprimir MP4', '#4CAF50'
                 ));
             }
             // Ações para WAV
@@ -215,6 +280,13 @@ document.addEventListener('DOMContentLoaded', function() {
                 ));
             }
 
+            // Streaming com várias qualidades (vídeos conversíveis e MP4)
+            if (summary?.streaming_options) {
+                actionButtons.appendChild(createActionButton(
+                    'convert_to_hls', 'Streaming HLS', '#3F51B5'
+                ));
+            }
+
             // Ações padrão
             defaultActions.forEach(item => {
                 actionButtons.appendChild(createActionButton(item.action, item.label));
@@ -225,46 +297,99 @@ document.addEventListener('DOMContentLoaded', function() {
         }
     };
 
+    // Abre o seletor de arquivos e resolve com os PDFs escolhidos (vazio se cancelar)
+    const selectPdfFiles = () => new Promise(resolve => {
+        const picker = document.createElement('input');
+        picker.type = 'file';
+        picker.accept = '.pdf,application/pdf';
+        picker.multiple = true;
+        picker.addEventListener('change', () => resolve(Array.from(picker.files)));
+        picker.addEventListener('cancel', () => resolve([]));
+        picker.click();
+    });
+
+    // Envia os arquivos em sequência, preservando a ordem, e resolve com os nomes no servidor
+    const uploadFiles = (files) => files.reduce((chain, file) => chain.then(names =>
+        uploadFile(file).then(data => {
+            if (data.status !== 'success') throw new Error(data.message);
+            return [...names, data.filename];
+        })
+    ), Promise.resolve([]));
+
+    // Parâmetros extras pedidos ao usuário antes de enviar a ação (null cancela)
+    const askActionOptions = (action) => {
+        if (action === 'merge_pdf_files') {
+            return selectPdfFiles().then(files => {
+                if (!files.length) return null;
+                actionResult.textContent = 'Enviando PDFs...';
+                actionResult.className = 'processing';
+                return uploadFiles(files).then(names => ({ files: [currentFile.filename, ...names] }));
+            });
+        }
+        if (action === 'split_pdf_range') {
+            const ranges = window.prompt('Intervalos de páginas (ex.: 1-3,7,10-)');
+            return ranges ? { ranges } : null;
+        }
+        if (action === 'compress_mp4_target') {
+            const targetMb = window.prompt('Tamanho máximo do vídeo em MB', '25');
+            return targetMb ? { target_mb: targetMb } : null;
+        }
+        if (action === 'split_pdf_every') {
+            const every = window.prompt('Páginas por parte', '1');
+            return every ? { every } : null;
+        }
+        return {};
+    };
+
+    // O ZIP de imagens é baixado direto, enquanto as páginas são renderizadas
+    const downloadRasterized = (imageFormat) => {
+        const pages = window.prompt('Páginas (ex.: 1-3,7,10-); vazio para todas', '');
+        if (pages === null) return;
+
+        const params = new URLSearchParams({ format: imageFormat, dpi: '150', pages });
+        window.location.href = `/rasterize/${encodeURIComponent(currentFile.filename)}?${params}`;
+    };
+
     const processAction = (action) => {
         if (!currentFile?.filename) {
             showError('Nenhum arquivo selecionado para processamento');
             return;
         }
 
-        actionResult.textContent = 'Processando...';
-        actionResult.className = 'processing';
+        if (action.startsWith('rasterize_pdf_')) {
+            downloadRasterized(action.split('_')[2]);
+            return;
+        }
 
-        fetch('/process', {
-            method: 'POST',
-            headers: {
-                'Content-Type': 'application/x-www-form-urlencoded',
-            },
-            body: `filename=${encodeURIComponent(currentFile.filename)}&action=${encodeURIComponent(action)}`
+        Promise.resolve(askActionOptions(action))
+        .then(options => {
+            if (options === null) return null;
+
+            // Listas viram campos repetidos (files=a.pdf&files=b.pdf)
+            const body = new URLSearchParams({ filename: currentFile.filename, action });
+            Object.entries(options).forEach(([key, value]) => {
+                [].concat(value).forEach(item => body.append(key, item));
+            });
+
+            actionResult.textContent = 'Processando...';
+            actionResult.className = 'processing';
+
+            return fetch('/process', {
+                method: 'POST',
+                headers: {
+                    'Content-Type': 'application/x-www-form-urlencoded',
+                },
+                body: body.toString()
+            })
+            .then(handleResponse);
         })
-        .then(handleResponse)
         .then(data => {
-            // Limpa classes anteriores
-            actionResult.className = '';
-            actionResult.classList.remove('hidden', 'success', 'error', 'warning');
-
-            // Aplica a classe com base no status retornado
-            if (data.status === 'success') {
-                actionResult.classList.add('success');
-            } else if (data.status === 'warning') {
-                actionResult.classList.add('warning');
+            if (!data) return;
+            if (data.status === 'queued' && data.job_id) {
+                actionResult.textContent = 'Na fila de processamento...';
+                watchJob(data);
             } else {
-                actionResult.classList.add('error');
-            }
-
-            actionResult.innerHTML = data.message;
-            
-            if (data.status === 'success' && data.download_url) {
-                const downloadLink = document.createElement('a');
-                downloadLink.href = data.download_url;
-                downloadLink.textContent = ' Baixar arquivo';
-                downloadLink.className = 'download-link';
-                actionResult.appendChild(document.createElement('br'));
-                actionResult.appendChild(downloadLink);
+                renderActionResult(data);
             }
         })
         .catch(error => {
@@ -274,6 +399,101 @@ document.addEventListener('DOMContentLoaded', function() {
         });
     };
 
+    const renderActionResult = (data) => {
+        // Limpa classes anteriores
+        actionResult.className = '';
+        actionResult.classList.remove('hidden', 'success', 'error', 'warning');
+
+        // Aplica a classe com base no status retornado
+        if (data.status === 'success') {
+            actionResult.classList.add('success');
+        } else if (data.status === 'warning') {
+            actionResult.classList.add('warning');
+        } else {
+            actionResult.classList.add('error');
+        }
+
+        actionResult.innerHTML = data.message;
+        
+        if (data.status === 'success' && data.download_url) {
+            const downloadLink = document.createElement('a');
+            downloadLink.href = data.download_url;
+            downloadLink.textContent = ' Baixar arquivo';
+            downloadLink.className = 'download-link';
+            actionResult.appendChild(document.createElement('br'));
+            actionResult.appendChild(downloadLink);
+        }
+
+        if (data.status === 'success' && data.manifest_url) {
+            actionResult.appendChild(document.createElement('br'));
+            actionResult.appendChild(createManifestLink(data.manifest_url, ' Playlist HLS'));
+        }
+    };
+
+    const createManifestLink = (url, label) => {
+        const manifestLink = document.createElement('a');
+        manifestLink.href = url;
+        manifestLink.textContent = label;
+        manifestLink.className = 'download-link';
+        manifestLink.target = '_blank';
+        return manifestLink;
+    };
+
+    const updateJobState = (job) => {
+        if (job.state === 'done') {
+            renderActionResult(job.result);
+            return true;
+        }
+        if (job.state !== 'running') {
+            actionResult.textContent = 'Na fila de processamento...';
+        } else if (job.progress && job.progress.percent !== null) {
+            const eta = job.progress.eta !== null ? ` - restam ~${Math.ceil(job.progress.eta)}s` : '';
+            actionResult.textContent = `Processando... ${job.progress.percent}%${eta}`;
+            // Streaming HLS: a reprodução já pode começar com os segmentos prontos
+            if (job.progress.manifest_url) {
+                actionResult.appendChild(document.createElement('br'));
+                actionResult.appendChild(createManifestLink(job.progress.manifest_url, ' Assistir enquanto processa'));
+            }
+        } else {
+            actionResult.textContent = 'Processando...';
+        }
+        return false;
+    };
+
+    // Acompanha o job pelo stream de eventos, com polling como alternativa
+    const watchJob = (job) => {
+        const pollJob = () => {
+            fetch(job.status_url)
+                .then(handleResponse)
+                .then(data => {
+                    if (!updateJobState(data)) {
+                        setTimeout(pollJob, 2000);
+                    }
+                })
+                .catch(error => {
+                    console.error('Error:', error);
+                    actionResult.className = 'error';
+                    actionResult.textContent = 'Erro na comunicação com o servidor';
+                });
+        };
+
+        if (!window.EventSource) {
+            pollJob();
+            return;
+        }
+
+        const events = new EventSource(job.events_url);
+        events.onmessage = (event) => {
+            if (updateJobState(JSON.parse(event.data))) {
+                events.close();
+            }
+        };
+        events.onerror = () => {
+            events.close();
+            pollJob();
+        };
+    };
+
     const resetFileInfo = () => {
         fileInfo.classList.add('hidden');
         fileSummary.innerHTML = '';
@@ -282,6 +502,49 @@ document.addEventListener('DOMContentLoaded', function() {
         actionResult.innerHTML = '';
     };
 
+    // Upload em partes para arquivos grandes, retomando do offset do servidor em caso de falha
+    const CHUNKED_UPLOAD_THRESHOLD = 32 * 1024 * 1024;
+    const CHUNK_SIZE = 8 * 1024 * 1024;
+    const MAX_CHUNK_RETRIES = 5;
+
+    const uploadInChunks = (file) => {
+        const sendFrom = (upload, offset, retries) => {
+            if (offset >= file.size) {
+                return fetch(`${upload.chunk_url}/finalize`, { method: 'POST' }).then(handleResponse);
+            }
+
+            const chunk = file.slice(offset, offset + CHUNK_SIZE);
+            return fetch(`${upload.chunk_url}?offset=${offset}`, { method: 'PUT', body: chunk })
+                .then(handleResponse)
+                .then(status => sendFrom(upload, status.offset, MAX_CHUNK_RETRIES))
+                .catch(error => {
+                    if (retries <= 0) throw error;
+                    // Consulta o offset confirmado pelo servidor e retoma a partir dele
+                    return fetch(upload.chunk_url)
+                        .then(handleResponse)
+                        .then(status => sendFrom(upload, status.offset, retries - 1));
+                });
+        };
+
+        return fetch('/uploads', {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ filename: file.name, size: file.size })
+        })
+        .then(handleResponse)
+        .then(upload => sendFrom(upload, 0, MAX_CHUNK_RETRIES));
+    };
+
+    // Envia um arquivo pelo caminho adequado ao tamanho
+    const uploadFile = (file) => {
+        if (file.size > CHUNKED_UPLOAD_THRESHOLD) {
+            return uploadInChunks(file);
+        }
+        const formData = new FormData();
+        formData.append('file', file);
+        return fetch('/upload', { method: 'POST', body: formData }).then(handleResponse);
+    };
+
     // Event Listener principal
     uploadForm.addEventListener('submit', function(e) {
         // limpa tudo antes de processar um novo arquivo
@@ -301,11 +564,7 @@ document.addEventListener('DOMContentLoaded', function() {
         submitButton.textContent = 'Processando...';
         submitButton.disabled = true;
 
-        fetch('/upload', {
-            method: 'POST',
-            body: new FormData(uploadForm)
-        })
-        .then(handleResponse)
+        uploadFile(file)
         .then(data => {
             if (data.status === 'success') {
                 currentFile = {
@@ -0,0 +1,71 @@
+import pytest
+
+from dividers.pdf_to_split import PageRangeError, every_n_pages, parse_page_ranges
+
+
+@pytest.mark.parametrize('spec, expected', [
+    ('7', [(7, 7)]),
+    ('1-3', [(1, 3)]),
+    ('1-3,7,9-10', [(1, 3), (7, 7), (9, 10)]),
+    ('4-', [(4, 10)]),
+    ('-5', [(1, 5)]),
+    ('-', [(1, 10)]),
+    (' 2 - 4 , 6 ', [(2, 4), (6, 6)]),
+    ('1-10', [(1, 10)]),
+    ('10', [(10, 10)]),
+    ('10-', [(10, 10)]),
+])
+def test_parse_page_ranges(spec, expected):
+    assert parse_page_ranges(spec, 10) == expected
+
+
+def test_parse_page_ranges_keeps_overlaps_and_order():
+    # Cada item vira uma parte, mesmo repetindo páginas de outra
+    assert parse_page_ranges('5-8,1-6,6', 10) == [(5, 8), (1, 6), (6, 6)]
+
+
+def test_parse_page_ranges_ignores_empty_items():
+    assert parse_page_ranges(',1-2,,3,', 10) == [(1, 2), (3, 3)]
+
+
+@pytest.mark.parametrize('spec', ['', None, ' ', ',', ' , '])
+def test_parse_page_ranges_rejects_empty_spec(spec):
+    with pytest.raises(PageRangeError, match='Nenhum intervalo'):
+        parse_page_ranges(spec, 10)
+
+
+@pytest.mark.parametrize('spec', ['5-3', '0', '0-2', '11', '9-11', '11-', '3-0'])
+def test_parse_page_ranges_rejects_out_of_document(spec):
+    with pytest.raises(PageRangeError, match='fora do documento'):
+        parse_page_ranges(spec, 10)
+
+
+@pytest.mark.parametrize('spec', ['a', '1-2-3', '1;2', '1.5', '--2', '+3', '1-x'])
+def test_parse_page_ranges_rejects_malformed_items(spec):
+    with pytest.raises(PageRangeError, match='Intervalo inválido'):
+        parse_page_ranges(spec, 10)
+
+
+def test_page_range_error_is_value_error():
+    # As rotas tratam ValueError como parâmetro inválido (400)
+    with pytest.raises(ValueError):
+        parse_page_ranges('3-1', 10)
+
+
+@pytest.mark.parametrize('every, total, expected', [
+    (3, 10, [(1, 3), (4, 6), (7, 9), (10, 10)]),
+    (5, 10, [(1, 5), (6, 10)]),
+    (1, 3, [(1, 1), (2, 2), (3, 3)]),
+    (20, 10, [(1, 10)]),
+    (10, 10, [(1, 10)]),
+    (2, 1, [(1, 1)]),
+    (4, 0, []),
+])
+def test_every_n_pages(every, total, expected):
+    assert every_n_pages(every, total) == expected
+
+
+@pytest.mark.parametrize('every', [0, -1])
+def test_every_n_pages_rejects_non_positive(every):
+    with pytest.raises(PageRangeError):
+        every_n_pages(every, 10)
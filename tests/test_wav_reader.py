@@ -0,0 +1,213 @@
+import random
+import struct
+import wave
+
+import pytest
+
+from converters.wav_reader import (WAVE_FORMAT_EXTENSIBLE, WAVE_FORMAT_IEEE_FLOAT, WAVE_FORMAT_PCM,
+                                   WavFormatError, WavReader)
+
+# GUID do subformato KSDATAFORMAT_SUBTYPE_* sem os dois primeiros bytes (o código do formato)
+SUBFORMAT_GUID_TAIL = b'\x00\x00\x00\x00\x10\x00\x80\x00\x00\xaa\x00\x38\x9b\x71'
+
+
+def write_wave(path, sample_width, channels=2, frames=1000, sample_rate=44100, seed=0):
+    """Grava um WAV com amostras aleatórias pelo módulo wave e devolve os bytes do PCM"""
+    generator = random.Random(seed)
+    data = bytes(generator.getrandbits(8) for _ in range(frames * channels * sample_width))
+    with wave.open(str(path), 'wb') as output:
+        output.setnchannels(channels)
+        output.setsampwidth(sample_width)
+        output.setframerate(sample_rate)
+        output.writeframes(data)
+    with wave.open(str(path), 'rb') as source:
+        return source.readframes(source.getnframes())
+
+
+def write_raw(path, fmt, data, before_data=(), data_size=None):
+    """Monta o RIFF à mão: chunk fmt (corpo pronto), chunks extras e data"""
+    chunks = [b'fmt ' + struct.pack('<I', len(fmt)) + fmt + b'\x00' * (len(fmt) & 1)]
+    for chunk_id, body in before_data:
+        chunks.append(chunk_id + struct.pack('<I', len(body)) + body + b'\x00' * (len(body) & 1))
+    chunks.append(b'data' + struct.pack('<I', len(data) if data_size is None else data_size) + data)
+    body = b'WAVE' + b''.join(chunks)
+    path.write_bytes(b'RIFF' + struct.pack('<I', len(body)) + body)
+
+
+def fmt_body(format_tag, channels, sample_rate, bits):
+    block_align = channels * bits // 8
+    return struct.pack('<HHIIHH', format_tag, channels, sample_rate, sample_rate * block_align, block_align, bits)
+
+
+def extensible_fmt_body(subformat, channels, sample_rate, bits):
+    base = fmt_body(WAVE_FORMAT_EXTENSIBLE, channels, sample_rate, bits)
+    return base + struct.pack('<HHI', 22, bits, 0) + struct.pack('<H', subformat) + SUBFORMAT_GUID_TAIL
+
+
+def expected_pcm16(data, width):
+    """Conversão amostra a amostra: desloca o valor com sinal para 16 bits"""
+    output = bytearray()
+    for offset in range(0, len(data), width):
+        value = int.from_bytes(data[offset:offset + width], 'little', signed=True) >> (8 * (width - 2))
+        output += value.to_bytes(2, 'little', signed=True)
+    return bytes(output)
+
+
+def read_chunks(reader, frames_per_chunk):
+    # Cada memoryview só vale até o próximo item: copia na hora
+    return [bytes(chunk) for chunk in reader.chunks(frames_per_chunk)]
+
+
+@pytest.mark.parametrize('sample_width, ffmpeg_format', [(1, 'u8'), (2, 's16le'), (3, 's24le'), (4, 's32le')])
+def test_header_and_chunks_match_wave_module(tmp_path, sample_width, ffmpeg_format):
+    path = tmp_path / 'audio.wav'
+    frames = write_wave(path, sample_width, channels=2, frames=1001, sample_rate=22050)
+
+    with WavReader(str(path)) as reader:
+        assert reader.format_tag == WAVE_FORMAT_PCM
+        assert reader.channels == 2
+        assert reader.sample_rate == 22050
+        assert reader.bits_per_sample == sample_width * 8
+        assert reader.frames == 1001
+        assert reader.duration == pytest.approx(1001 / 22050)
+        assert reader.ffmpeg_format == ffmpeg_format
+        assert reader.is_integer_pcm == (sample_width >= 2)
+
+        chunks = read_chunks(reader, 100)
+        assert b''.join(chunks) == frames
+        assert [len(chunk) for chunk in chunks] == [100 * reader.block_align] * 10 + [reader.block_align]
+
+
+@pytest.mark.parametrize('sample_width', [2, 3, 4])
+@pytest.mark.parametrize('channels', [1, 2])
+def test_pcm16_chunks_keep_most_significant_bytes(tmp_path, sample_width, channels):
+    path = tmp_path / 'audio.wav'
+    frames = write_wave(path, sample_width, channels=channels, frames=777, seed=sample_width)
+
+    with WavReader(str(path)) as reader:
+        converted = list(reader.pcm16_chunks(64))
+
+    assert b''.join(converted) == expected_pcm16(frames, sample_width)
+    assert all(len(chunk) == 64 * channels * 2 for chunk in converted[:-1])
+
+
+def test_pcm16_chunks_reject_8_bit(tmp_path):
+    path = tmp_path / 'audio.wav'
+    write_wave(path, 1)
+
+    with WavReader(str(path)) as reader:
+        with pytest.raises(WavFormatError):
+            list(reader.pcm16_chunks())
+
+
+def test_float_pcm_is_read_but_not_integer(tmp_path):
+    path = tmp_path / 'float.wav'
+    data = struct.pack('<8f', *(i / 8 for i in range(8)))
+    write_raw(path, fmt_body(WAVE_FORMAT_IEEE_FLOAT, 2, 48000, 32), data)
+
+    with WavReader(str(path)) as reader:
+        assert reader.ffmpeg_format == 'f32le'
+        assert not reader.is_integer_pcm
+        assert reader.frames == 4
+        assert b''.join(read_chunks(reader, 3)) == data
+        with pytest.raises(WavFormatError):
+            list(reader.pcm16_chunks())
+
+
+@pytest.mark.parametrize('subformat, bits, ffmpeg_format', [
+    (WAVE_FORMAT_PCM, 24, 's24le'),
+    (WAVE_FORMAT_PCM, 16, 's16le'),
+    (WAVE_FORMAT_IEEE_FLOAT, 32, 'f32le'),
+])
+def test_extensible_header_uses_subformat(tmp_path, subformat, bits, ffmpeg_format):
+    path = tmp_path / 'extensible.wav'
+    data = bytes(range(256))[:(bits // 8) * 2 * 10]
+    write_raw(path, extensible_fmt_body(subformat, 2, 44100, bits), data)
+
+    with WavReader(str(path)) as reader:
+        assert reader.format_tag == subformat
+        assert reader.ffmpeg_format == ffmpeg_format
+        assert reader.frames == 10
+        if subformat == WAVE_FORMAT_PCM:
+            assert b''.join(reader.pcm16_chunks(4)) == expected_pcm16(data, bits // 8)
+
+
+def test_unsupported_format_is_rejected(tmp_path):
+    path = tmp_path / 'adpcm.wav'
+    write_raw(path, fmt_body(0x0002, 1, 8000, 4), b'\x00' * 64)
+
+    with pytest.raises(WavFormatError, match='não suportado'):
+        WavReader(str(path))
+
+
+def test_extensible_with_unsupported_subformat_is_rejected(tmp_path):
+    path = tmp_path / 'alaw.wav'
+    write_raw(path, extensible_fmt_body(0x0006, 1, 8000, 8), b'\x00' * 64)
+
+    with pytest.raises(WavFormatError):
+        WavReader(str(path))
+
+
+def test_skips_odd_sized_chunks_before_data(tmp_path):
+    path = tmp_path / 'list.wav'
+    data = struct.pack('<6h', 1, -1, 300, -300, 32767, -32768)
+    write_raw(path, fmt_body(WAVE_FORMAT_PCM, 2, 44100, 16), data, before_data=[(b'LIST', b'abc')])
+
+    with WavReader(str(path)) as reader:
+        assert reader.frames == 3
+        assert b''.join(reader.pcm16_chunks()) == data
+
+
+@pytest.mark.parametrize('data_size', [0, 0xFFFFFFFF])
+def test_streaming_data_size_reads_to_end_of_file(tmp_path, data_size):
+    path = tmp_path / 'stream.wav'
+    data = struct.pack('<8h', *range(8))
+    write_raw(path, fmt_body(WAVE_FORMAT_PCM, 2, 44100, 16), data, data_size=data_size)
+
+    with WavReader(str(path)) as reader:
+        assert reader.frames == 4
+        assert b''.join(read_chunks(reader, 10)) == data
+
+
+def test_data_size_is_capped_by_file_length(tmp_path):
+    path = tmp_path / 'truncated.wav'
+    data = struct.pack('<5h', *range(5))  # Meio quadro estéreo no fim é descartado
+    write_raw(path, fmt_body(WAVE_FORMAT_PCM, 2, 44100, 16), data, data_size=1000)
+
+    with WavReader(str(path)) as reader:
+        assert reader.frames == 2
+        assert b''.join(read_chunks(reader, 10)) == data[:8]
+
+
+@pytest.mark.parametrize('content', [
+    b'',
+    b'RIFF\x00\x00\x00\x00AVI ',
+    b'RIFF\x04\x00\x00\x00WAVE',
+])
+def test_invalid_files_are_rejected(tmp_path, content):
+    path = tmp_path / 'invalid.wav'
+    path.write_bytes(content)
+
+    with pytest.raises(WavFormatError):
+        WavReader(str(path))
+
+
+def test_inconsistent_block_align_is_rejected(tmp_path):
+    path = tmp_path / 'inconsistent.wav'
+    fmt = struct.pack('<HHIIHH', WAVE_FORMAT_PCM, 2, 44100, 44100 * 4, 3, 16)
+    write_raw(path, fmt, b'\x00' * 12)
+
+    with pytest.raises(WavFormatError, match='inconsistente'):
+        WavReader(str(path))
+
+
+def test_close_with_iterator_in_progress(tmp_path):
+    path = tmp_path / 'audio.wav'
+    write_wave(path, 2, frames=500)
+
+    reader = WavReader(str(path))
+    iterator = reader.chunks(100)
+    next(iterator)
+    # O memoryview aberto não pode impedir o fechamento do mmap (BufferError)
+    reader.close()
+    assert reader.map.closed